@@ -0,0 +1,237 @@
+"""Benchmark of the request and notification paths of the client.
+
+Messages are fed straight to the client, as if read from the server, so
+only the cost of the client is measured:
+
+* ``request``: building and encoding requests in
+  :meth:`DartAnalysisServer.request`.
+* ``roundtrip``: a request, the parsing of its response, the dispatch to
+  the event loop and the future being resolved.
+* ``notification``: parsing notifications, decoding them into spec objects
+  and calling the subscribed callback through the event loop.
+
+For each benchmark, messages per second, the percentiles of the latency of
+each message and the peak memory allocated are reported. With ``--json``
+the results are also written in a file, which can be given to later runs as
+``--baseline`` to report the benchmarks that got slower::
+
+    python -m benchmarks.bench_client --json before.json
+    python -m benchmarks.bench_client --baseline before.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from benchmarks import payloads
+from das.api import DartAnalysisServer
+from das.codec import get_codec
+
+
+class Benchmark:
+    """One client path, driven with messages of a given shape."""
+
+    def __init__(self, name, kind, event=None, body=None):
+        self.name = name
+        self.kind = kind
+        self.event = event
+        self.body = body
+
+    async def run(self, server, count):
+        """Drive the path ``count`` times, returning each latency."""
+        return await getattr(self, '_run_' + self.kind)(server, count)
+
+    async def _run_request(self, server, count):
+        latencies = []
+        for offset in range(count):
+            # Different offsets, or the requests would be coalesced.
+            params = {'file': payloads.FILE, 'offset': offset}
+            started = time.perf_counter()
+            server.request('analysis.getHover', params)
+            latencies.append(time.perf_counter() - started)
+        # Nothing will answer these requests.
+        server._request_callbacks.clear()
+        server._in_flight.clear()
+        return latencies
+
+    async def _run_roundtrip(self, server, count):
+        codec = server.codec
+        result = self.body['result']
+        latencies = []
+        for _ in range(count):
+            started = time.perf_counter()
+            future = server.request('analysis.getNavigation',
+                                    {'file': payloads.FILE, 'offset': 1,
+                                     'length': 1})
+            request_id, = server._request_callbacks
+            line = codec.dumps(payloads.response(request_id, result))
+            server._handle_message(line)
+            await future
+            latencies.append(time.perf_counter() - started)
+        return latencies
+
+    async def _run_notification(self, server, count):
+        line = server.codec.dumps(self.body)
+        key = next(iter(self.body['params']))
+        loop = asyncio.get_running_loop()
+        latencies = []
+        done = None
+
+        def on_notification(event, params):
+            # Decoding happens on first access, as in real callbacks.
+            params[key]
+            latencies.append(time.perf_counter() - started)
+            done.set_result(None)
+
+        subscription = server.notification(self.event,
+                                           callback=on_notification)
+        try:
+            for _ in range(count):
+                done = loop.create_future()
+                started = time.perf_counter()
+                server._handle_message(line)
+                await done
+        finally:
+            subscription.cancel()
+        return latencies
+
+
+def benchmarks():
+    navigation = payloads.navigation(5000)
+    return [
+        Benchmark('request', 'request'),
+        Benchmark('notification navigation 100', 'notification',
+                  'analysis.navigation',
+                  payloads.notification('analysis.navigation',
+                                        payloads.navigation(100))),
+        Benchmark('roundtrip navigation 5000', 'roundtrip',
+                  body=payloads.response('0', navigation)),
+        Benchmark('notification navigation 5000', 'notification',
+                  'analysis.navigation',
+                  payloads.notification('analysis.navigation', navigation)),
+        Benchmark('notification highlights 10000', 'notification',
+                  'analysis.highlights',
+                  payloads.notification('analysis.highlights',
+                                        payloads.highlights(10000))),
+        Benchmark('notification completion 2000', 'notification',
+                  'completion.results',
+                  payloads.notification('completion.results',
+                                        payloads.completion_results(2000))),
+    ]
+
+
+def create_server(loop, codec):
+    server = DartAnalysisServer('dart', 'das', loop, codec=codec)
+    # The server is never started: requests are dropped and messages are
+    # given to it directly.
+    server._process = True
+    server._write = lambda data: None
+    return server
+
+
+def percentile(ordered, percent):
+    index = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+    return ordered[index]
+
+
+def measure(benchmark, count, codec):
+    loop = asyncio.new_event_loop()
+    try:
+        server = create_server(loop, codec)
+        # Warm up, so caches of decoders and codecs are filled.
+        loop.run_until_complete(benchmark.run(server, min(count, 10)))
+
+        started = time.perf_counter()
+        latencies = loop.run_until_complete(benchmark.run(server, count))
+        elapsed = time.perf_counter() - started
+
+        tracemalloc.start()
+        loop.run_until_complete(benchmark.run(server, min(count, 10)))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    finally:
+        loop.close()
+
+    latencies.sort()
+    return {
+        'name': benchmark.name,
+        'messages': count,
+        'messages_per_second': count / elapsed,
+        'p50': percentile(latencies, 50),
+        'p90': percentile(latencies, 90),
+        'p99': percentile(latencies, 99),
+        'max': latencies[-1],
+        'peak_memory': peak,
+    }
+
+
+def regressions(results, baseline, threshold):
+    previous = {result['name']: result for result in baseline['results']}
+    for result in results:
+        before = previous.get(result['name'])
+        if before is None:
+            continue
+        ratio = before['messages_per_second'] / result['messages_per_second']
+        if ratio > 1 + threshold:
+            yield result['name'], ratio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=100,
+                        help='messages for each benchmark')
+    parser.add_argument('--codec', help='codec to use, the fastest if not '
+                        'given')
+    parser.add_argument('--filter', default='',
+                        help='only run benchmarks with this in their name')
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--baseline',
+                        help='results of a previous run to compare with')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='slowdown reported as a regression')
+    args = parser.parse_args()
+
+    codec = get_codec(args.codec)
+    print('{:<32} {:>10} {:>9} {:>9} {:>9} {:>10}'.format(
+        'benchmark', 'msg/s', 'p50', 'p90', 'p99', 'peak'))
+    results = []
+    for benchmark in benchmarks():
+        if args.filter not in benchmark.name:
+            continue
+        result = measure(benchmark, args.count, codec)
+        results.append(result)
+        print('{name:<32} {messages_per_second:>10.0f} '
+              '{p50_ms:>7.3f}ms {p90_ms:>7.3f}ms {p99_ms:>7.3f}ms '
+              '{peak_kib:>8.0f}KiB'.format(
+                  p50_ms=result['p50'] * 1000, p90_ms=result['p90'] * 1000,
+                  p99_ms=result['p99'] * 1000,
+                  peak_kib=result['peak_memory'] / 1024, **result))
+
+    if args.json:
+        report = {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'codec': codec.name,
+            'count': args.count,
+            'time': time.time(),
+            'results': results,
+        }
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        slower = list(regressions(results, baseline, args.threshold))
+        for name, ratio in slower:
+            print('{}: {:.0%} slower than the baseline'.format(
+                name, ratio - 1))
+        if slower:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Benchmark of the wire protocol codecs.
+
+Measures the cost of decoding ``analysis.navigation`` notifications with
+every installed codec. By default synthetic payloads of a few sizes are
+used. Messages captured from a real analysis server, one JSON message per
+line, can be given instead::
+
+    python -m benchmarks.bench_codec [--repeat N] [captured.jsonl ...]
+"""
+import argparse
+import json
+import time
+
+from benchmarks import payloads
+from das.codec import available_codecs, get_codec
+
+
+def synthetic_messages():
+    for regions in (100, 1000, 10000, 50000):
+        params = payloads.navigation(regions)
+        body = payloads.notification('analysis.navigation', params)
+        yield ('{} regions'.format(regions),
+               json.dumps(body).encode('utf-8'))
+
+
+def captured_messages(paths):
+    for path in paths:
+        with open(path, 'rb') as f:
+            for number, line in enumerate(f, 1):
+                if b'"analysis.navigation"' in line:
+                    yield '{}:{}'.format(path, number), line.rstrip(b'\n')
+
+
+def bench(codec, data, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        codec.loads(data)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('paths', nargs='*',
+                        help='files with captured messages')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    codecs = [get_codec(name) for name in available_codecs()]
+    if args.paths:
+        messages = captured_messages(args.paths)
+    else:
+        messages = synthetic_messages()
+
+    header = '{:<30} {:>10}'.format('payload', 'size')
+    header += ''.join(' {:>12}'.format(codec.name) for codec in codecs)
+    print(header)
+    for name, data in messages:
+        line = '{:<30} {:>10}'.format(name, len(data))
+        for codec in codecs:
+            seconds = bench(codec, data, args.repeat)
+            line += ' {:>10.3f}ms'.format(seconds * 1000)
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""Synthetic payloads shaped like the ones sent by the analysis server.
+
+The shapes follow the spec types. Sizes are chosen by the caller, and the
+content is generated from a fixed seed so runs are comparable.
+"""
+import random
+
+
+FILE = '/project/lib/src/widgets/editable_text.dart'
+
+
+def _files(rng, count):
+    return ['/project/lib/src/{}/file_{}.dart'.format(
+        rng.choice(['widgets', 'rendering', 'services', 'painting']), i)
+        for i in range(count)]
+
+
+def navigation(regions=5000, seed=0):
+    """Params of an ``analysis.navigation`` notification."""
+    rng = random.Random(seed)
+    files = _files(rng, max(1, regions // 50))
+    targets = []
+    for i in range(max(1, regions // 3)):
+        targets.append({
+            'kind': rng.choice(['CLASS', 'METHOD', 'FIELD', 'GETTER',
+                                'LOCAL_VARIABLE', 'PARAMETER']),
+            'fileIndex': rng.randrange(len(files)),
+            'offset': rng.randrange(100000),
+            'length': rng.randrange(1, 30),
+            'startLine': rng.randrange(1, 3000),
+            'startColumn': rng.randrange(1, 80),
+        })
+    offset = 0
+    navigation_regions = []
+    for i in range(regions):
+        offset += rng.randrange(1, 40)
+        navigation_regions.append({
+            'offset': offset,
+            'length': rng.randrange(1, 30),
+            'targets': [rng.randrange(len(targets))],
+        })
+    return {
+        'file': FILE,
+        'regions': navigation_regions,
+        'targets': targets,
+        'files': files,
+    }
+
+
+def highlights(regions=10000, seed=0):
+    """Params of an ``analysis.highlights`` notification."""
+    rng = random.Random(seed)
+    offset = 0
+    highlight_regions = []
+    for i in range(regions):
+        offset += rng.randrange(1, 20)
+        highlight_regions.append({
+            'type': rng.choice(['IDENTIFIER_DEFAULT', 'KEYWORD', 'CLASS',
+                                'INSTANCE_METHOD_REFERENCE', 'LITERAL_STRING',
+                                'LOCAL_VARIABLE_REFERENCE', 'COMMENT_BLOCK']),
+            'offset': offset,
+            'length': rng.randrange(1, 30),
+        })
+    return {'file': FILE, 'regions': highlight_regions}
+
+
+def completion_results(suggestions=2000, seed=0):
+    """Params of a ``completion.results`` notification."""
+    rng = random.Random(seed)
+    results = []
+    for i in range(suggestions):
+        name = 'member{}'.format(i)
+        kind = rng.choice(['METHOD', 'GETTER', 'FIELD', 'CLASS'])
+        results.append({
+            'kind': 'INVOCATION',
+            'relevance': rng.choice([500, 1000, 1056, 1100]),
+            'completion': name,
+            'selectionOffset': len(name),
+            'selectionLength': 0,
+            'isDeprecated': False,
+            'isPotential': False,
+            'declaringType': 'State',
+            'element': {
+                'kind': kind,
+                'name': name,
+                'location': {
+                    'file': FILE,
+                    'offset': rng.randrange(100000),
+                    'length': len(name),
+                    'startLine': rng.randrange(1, 3000),
+                    'startColumn': 3,
+                },
+                'flags': 0,
+                'returnType': 'Widget',
+            },
+            'returnType': 'Widget',
+        })
+    return {
+        'id': '1',
+        'replacementOffset': 1200,
+        'replacementLength': 0,
+        'results': results,
+        'isLast': True,
+    }
+
+
+def notification(event, params):
+    """Wrap params into a notification message body."""
+    return {'event': event, 'params': params}
+
+
+def response(request_id, result):
+    """Wrap a result into a response message body."""
+    return {'id': request_id, 'result': result}
@@ -0,0 +1,6 @@
+import sys
+
+from das.batch import main
+
+
+sys.exit(main())
@@ -1,39 +1,1313 @@
 from das.server import DartAnalysisServer
+from das.spec import SpecObject
 
 
 DartAnalysisServer.api_version = [1, 9, 0]
 
 
+class AnalysisErrorSeverity:
+    """An enumeration of the possible severities of analysis errors.
+    """
+    INFO = 'INFO'
+    WARNING = 'WARNING'
+    ERROR = 'ERROR'
+
+
+class AnalysisErrorType:
+    """An enumeration of the possible types of analysis errors.
+    """
+    CHECKED_MODE_COMPILE_TIME_ERROR = 'CHECKED_MODE_COMPILE_TIME_ERROR'
+    COMPILE_TIME_ERROR = 'COMPILE_TIME_ERROR'
+    HINT = 'HINT'
+    LINT = 'LINT'
+    STATIC_TYPE_WARNING = 'STATIC_TYPE_WARNING'
+    STATIC_WARNING = 'STATIC_WARNING'
+    SYNTACTIC_ERROR = 'SYNTACTIC_ERROR'
+    TODO = 'TODO'
+
+
+class AnalysisService:
+    """An enumeration of the services provided by the analysis domain that
+    are related to a specific list of files.
+    """
+    FOLDING = 'FOLDING'
+    HIGHLIGHTS = 'HIGHLIGHTS'
+    INVALIDATE = 'INVALIDATE'
+    NAVIGATION = 'NAVIGATION'
+    OCCURRENCES = 'OCCURRENCES'
+    OUTLINE = 'OUTLINE'
+    OVERRIDES = 'OVERRIDES'
+
+
+class CompletionSuggestionKind:
+    """An enumeration of the kinds of elements that can be included in a
+    completion suggestion.
+    """
+    ARGUMENT_LIST = 'ARGUMENT_LIST'
+    IMPORT = 'IMPORT'
+    IDENTIFIER = 'IDENTIFIER'
+    INVOCATION = 'INVOCATION'
+    KEYWORD = 'KEYWORD'
+    NAMED_ARGUMENT = 'NAMED_ARGUMENT'
+    OPTIONAL_ARGUMENT = 'OPTIONAL_ARGUMENT'
+    PARAMETER = 'PARAMETER'
+
+
+class ElementKind:
+    """An enumeration of the kinds of elements.
+    """
+    CLASS = 'CLASS'
+    CLASS_TYPE_ALIAS = 'CLASS_TYPE_ALIAS'
+    COMPILATION_UNIT = 'COMPILATION_UNIT'
+    CONSTRUCTOR = 'CONSTRUCTOR'
+    ENUM = 'ENUM'
+    ENUM_CONSTANT = 'ENUM_CONSTANT'
+    FIELD = 'FIELD'
+    FUNCTION = 'FUNCTION'
+    FUNCTION_TYPE_ALIAS = 'FUNCTION_TYPE_ALIAS'
+    GETTER = 'GETTER'
+    LABEL = 'LABEL'
+    LIBRARY = 'LIBRARY'
+    LOCAL_VARIABLE = 'LOCAL_VARIABLE'
+    METHOD = 'METHOD'
+    PARAMETER = 'PARAMETER'
+    PREFIX = 'PREFIX'
+    SETTER = 'SETTER'
+    TOP_LEVEL_VARIABLE = 'TOP_LEVEL_VARIABLE'
+    TYPE_PARAMETER = 'TYPE_PARAMETER'
+    UNIT_TEST_GROUP = 'UNIT_TEST_GROUP'
+    UNIT_TEST_TEST = 'UNIT_TEST_TEST'
+    UNKNOWN = 'UNKNOWN'
+
+
+class ExecutableKind:
+    """An enumeration of the kinds of executable files.
+    """
+    CLIENT = 'CLIENT'
+    EITHER = 'EITHER'
+    NOT_EXECUTABLE = 'NOT_EXECUTABLE'
+    SERVER = 'SERVER'
+
+
+class ExecutionService:
+    """An enumeration of the services provided by the execution domain.
+    """
+    LAUNCH_DATA = 'LAUNCH_DATA'
+
+
+class FoldingKind:
+    """An enumeration of the kinds of folding regions.
+    """
+    COMMENT = 'COMMENT'
+    CLASS_MEMBER = 'CLASS_MEMBER'
+    DIRECTIVES = 'DIRECTIVES'
+    DOCUMENTATION_COMMENT = 'DOCUMENTATION_COMMENT'
+    TOP_LEVEL_DECLARATION = 'TOP_LEVEL_DECLARATION'
+
+
+class GeneralAnalysisService:
+    """An enumeration of the services provided by the analysis domain that
+    are general in nature (that is, are not specific to some list of
+    files).
+    """
+    ANALYZED_FILES = 'ANALYZED_FILES'
+
+
+class HighlightRegionType:
+    """An enumeration of the kinds of highlighting that can be applied to
+    files.
+    """
+    ANNOTATION = 'ANNOTATION'
+    BUILT_IN = 'BUILT_IN'
+    CLASS = 'CLASS'
+    COMMENT_BLOCK = 'COMMENT_BLOCK'
+    COMMENT_DOCUMENTATION = 'COMMENT_DOCUMENTATION'
+    COMMENT_END_OF_LINE = 'COMMENT_END_OF_LINE'
+    CONSTRUCTOR = 'CONSTRUCTOR'
+    DIRECTIVE = 'DIRECTIVE'
+    DYNAMIC_TYPE = 'DYNAMIC_TYPE'
+    DYNAMIC_LOCAL_VARIABLE_DECLARATION = 'DYNAMIC_LOCAL_VARIABLE_DECLARATION'
+    DYNAMIC_LOCAL_VARIABLE_REFERENCE = 'DYNAMIC_LOCAL_VARIABLE_REFERENCE'
+    DYNAMIC_PARAMETER_DECLARATION = 'DYNAMIC_PARAMETER_DECLARATION'
+    DYNAMIC_PARAMETER_REFERENCE = 'DYNAMIC_PARAMETER_REFERENCE'
+    ENUM = 'ENUM'
+    ENUM_CONSTANT = 'ENUM_CONSTANT'
+    FIELD = 'FIELD'
+    FIELD_STATIC = 'FIELD_STATIC'
+    FUNCTION = 'FUNCTION'
+    FUNCTION_DECLARATION = 'FUNCTION_DECLARATION'
+    FUNCTION_TYPE_ALIAS = 'FUNCTION_TYPE_ALIAS'
+    GETTER_DECLARATION = 'GETTER_DECLARATION'
+    IDENTIFIER_DEFAULT = 'IDENTIFIER_DEFAULT'
+    IMPORT_PREFIX = 'IMPORT_PREFIX'
+    INSTANCE_FIELD_DECLARATION = 'INSTANCE_FIELD_DECLARATION'
+    INSTANCE_FIELD_REFERENCE = 'INSTANCE_FIELD_REFERENCE'
+    INSTANCE_GETTER_DECLARATION = 'INSTANCE_GETTER_DECLARATION'
+    INSTANCE_GETTER_REFERENCE = 'INSTANCE_GETTER_REFERENCE'
+    INSTANCE_METHOD_DECLARATION = 'INSTANCE_METHOD_DECLARATION'
+    INSTANCE_METHOD_REFERENCE = 'INSTANCE_METHOD_REFERENCE'
+    INSTANCE_SETTER_DECLARATION = 'INSTANCE_SETTER_DECLARATION'
+    INSTANCE_SETTER_REFERENCE = 'INSTANCE_SETTER_REFERENCE'
+    INVALID_STRING_ESCAPE = 'INVALID_STRING_ESCAPE'
+    KEYWORD = 'KEYWORD'
+    LABEL = 'LABEL'
+    LIBRARY_NAME = 'LIBRARY_NAME'
+    LITERAL_BOOLEAN = 'LITERAL_BOOLEAN'
+    LITERAL_DOUBLE = 'LITERAL_DOUBLE'
+    LITERAL_INTEGER = 'LITERAL_INTEGER'
+    LITERAL_LIST = 'LITERAL_LIST'
+    LITERAL_MAP = 'LITERAL_MAP'
+    LITERAL_STRING = 'LITERAL_STRING'
+    LOCAL_FUNCTION_DECLARATION = 'LOCAL_FUNCTION_DECLARATION'
+    LOCAL_FUNCTION_REFERENCE = 'LOCAL_FUNCTION_REFERENCE'
+    LOCAL_VARIABLE = 'LOCAL_VARIABLE'
+    LOCAL_VARIABLE_DECLARATION = 'LOCAL_VARIABLE_DECLARATION'
+    LOCAL_VARIABLE_REFERENCE = 'LOCAL_VARIABLE_REFERENCE'
+    METHOD = 'METHOD'
+    METHOD_DECLARATION = 'METHOD_DECLARATION'
+    METHOD_DECLARATION_STATIC = 'METHOD_DECLARATION_STATIC'
+    METHOD_STATIC = 'METHOD_STATIC'
+    PARAMETER = 'PARAMETER'
+    SETTER_DECLARATION = 'SETTER_DECLARATION'
+    TOP_LEVEL_VARIABLE = 'TOP_LEVEL_VARIABLE'
+    PARAMETER_DECLARATION = 'PARAMETER_DECLARATION'
+    PARAMETER_REFERENCE = 'PARAMETER_REFERENCE'
+    STATIC_FIELD_DECLARATION = 'STATIC_FIELD_DECLARATION'
+    STATIC_GETTER_DECLARATION = 'STATIC_GETTER_DECLARATION'
+    STATIC_GETTER_REFERENCE = 'STATIC_GETTER_REFERENCE'
+    STATIC_METHOD_DECLARATION = 'STATIC_METHOD_DECLARATION'
+    STATIC_METHOD_REFERENCE = 'STATIC_METHOD_REFERENCE'
+    STATIC_SETTER_DECLARATION = 'STATIC_SETTER_DECLARATION'
+    STATIC_SETTER_REFERENCE = 'STATIC_SETTER_REFERENCE'
+    TOP_LEVEL_FUNCTION_DECLARATION = 'TOP_LEVEL_FUNCTION_DECLARATION'
+    TOP_LEVEL_FUNCTION_REFERENCE = 'TOP_LEVEL_FUNCTION_REFERENCE'
+    TOP_LEVEL_GETTER_DECLARATION = 'TOP_LEVEL_GETTER_DECLARATION'
+    TOP_LEVEL_GETTER_REFERENCE = 'TOP_LEVEL_GETTER_REFERENCE'
+    TOP_LEVEL_SETTER_DECLARATION = 'TOP_LEVEL_SETTER_DECLARATION'
+    TOP_LEVEL_SETTER_REFERENCE = 'TOP_LEVEL_SETTER_REFERENCE'
+    TOP_LEVEL_VARIABLE_DECLARATION = 'TOP_LEVEL_VARIABLE_DECLARATION'
+    TYPE_NAME_DYNAMIC = 'TYPE_NAME_DYNAMIC'
+    TYPE_PARAMETER = 'TYPE_PARAMETER'
+    UNRESOLVED_INSTANCE_MEMBER_REFERENCE = (
+        'UNRESOLVED_INSTANCE_MEMBER_REFERENCE')
+    VALID_STRING_ESCAPE = 'VALID_STRING_ESCAPE'
+
+
+class LinkedEditSuggestionKind:
+    """An enumeration of the kind of values that can be suggested for a
+    linked edit.
+    """
+    METHOD = 'METHOD'
+    PARAMETER = 'PARAMETER'
+    TYPE = 'TYPE'
+    VARIABLE = 'VARIABLE'
+
+
+class RefactoringKind:
+    """An enumeration of the kinds of refactorings that can be created.
+    """
+    CONVERT_GETTER_TO_METHOD = 'CONVERT_GETTER_TO_METHOD'
+    CONVERT_METHOD_TO_GETTER = 'CONVERT_METHOD_TO_GETTER'
+    EXTRACT_LOCAL_VARIABLE = 'EXTRACT_LOCAL_VARIABLE'
+    EXTRACT_METHOD = 'EXTRACT_METHOD'
+    INLINE_LOCAL_VARIABLE = 'INLINE_LOCAL_VARIABLE'
+    INLINE_METHOD = 'INLINE_METHOD'
+    MOVE_FILE = 'MOVE_FILE'
+    RENAME = 'RENAME'
+    SORT_MEMBERS = 'SORT_MEMBERS'
+
+
+class RefactoringMethodParameterKind:
+    """An enumeration of the kinds of parameters.
+    """
+    REQUIRED = 'REQUIRED'
+    POSITIONAL = 'POSITIONAL'
+    NAMED = 'NAMED'
+
+
+class RefactoringProblemSeverity:
+    """An enumeration of the severities of problems that can be returned
+    by the refactoring requests.
+    """
+    INFO = 'INFO'
+    WARNING = 'WARNING'
+    ERROR = 'ERROR'
+    FATAL = 'FATAL'
+
+
+class RequestErrorCode:
+    """An enumeration of the types of errors that can occur in the
+    execution of the server.
+    """
+    CONTENT_MODIFIED = 'CONTENT_MODIFIED'
+    FILE_NOT_ANALYZED = 'FILE_NOT_ANALYZED'
+    FORMAT_INVALID_FILE = 'FORMAT_INVALID_FILE'
+    FORMAT_WITH_ERRORS = 'FORMAT_WITH_ERRORS'
+    GET_ERRORS_INVALID_FILE = 'GET_ERRORS_INVALID_FILE'
+    GET_NAVIGATION_INVALID_FILE = 'GET_NAVIGATION_INVALID_FILE'
+    INVALID_ANALYSIS_ROOT = 'INVALID_ANALYSIS_ROOT'
+    INVALID_EXECUTION_CONTEXT = 'INVALID_EXECUTION_CONTEXT'
+    INVALID_OVERLAY_CHANGE = 'INVALID_OVERLAY_CHANGE'
+    INVALID_PARAMETER = 'INVALID_PARAMETER'
+    INVALID_REQUEST = 'INVALID_REQUEST'
+    NO_INDEX_GENERATED = 'NO_INDEX_GENERATED'
+    ORGANIZE_DIRECTIVES_ERROR = 'ORGANIZE_DIRECTIVES_ERROR'
+    REFACTORING_REQUEST_CANCELLED = 'REFACTORING_REQUEST_CANCELLED'
+    SERVER_ALREADY_STARTED = 'SERVER_ALREADY_STARTED'
+    SERVER_ERROR = 'SERVER_ERROR'
+    SORT_MEMBERS_INVALID_FILE = 'SORT_MEMBERS_INVALID_FILE'
+    SORT_MEMBERS_PARSE_ERRORS = 'SORT_MEMBERS_PARSE_ERRORS'
+    UNANALYZED_PRIORITY_FILES = 'UNANALYZED_PRIORITY_FILES'
+    UNKNOWN_REQUEST = 'UNKNOWN_REQUEST'
+    UNKNOWN_SOURCE = 'UNKNOWN_SOURCE'
+    UNSUPPORTED_FEATURE = 'UNSUPPORTED_FEATURE'
+
+
+class SearchResultKind:
+    """An enumeration of the kinds of search results returned by the
+    search domain.
+    """
+    DECLARATION = 'DECLARATION'
+    INVOCATION = 'INVOCATION'
+    READ = 'READ'
+    READ_WRITE = 'READ_WRITE'
+    REFERENCE = 'REFERENCE'
+    UNKNOWN = 'UNKNOWN'
+    WRITE = 'WRITE'
+
+
+class ServerService:
+    """An enumeration of the services provided by the server domain.
+    """
+    STATUS = 'STATUS'
+
+
+class AddContentOverlay(SpecObject):
+    """A directive to begin overlaying the contents of a file. The
+    supplied content will be used for analysis in place of the file
+    contents in the filesystem.
+
+    If this directive is used on a file that already has a file content
+    overlay, the old overlay is discarded and replaced with the new one.
+
+    :ivar type:
+    :vartype type: str
+
+    :ivar content: The new content of the file.
+    :vartype content: str
+    """
+    __slots__ = ('type', 'content')
+    _fields = (
+        ('type', 'type', 'str'),
+        ('content', 'content', 'str'),
+    )
+    _defaults = {'type': 'add'}
+
+
+class AnalysisError(SpecObject):
+    """An indication of an error, warning, or hint that was produced by
+    the analysis.
+
+    :ivar severity: The severity of the error.
+    :vartype severity: AnalysisErrorSeverity
+
+    :ivar type: The type of the error.
+    :vartype type: AnalysisErrorType
+
+    :ivar location: The location associated with the error.
+    :vartype location: Location
+
+    :ivar message: The message to be displayed for this error. The message
+        should indicate what is wrong with the code and why it is wrong.
+    :vartype message: str
+
+    :ivar correction: The correction message to be displayed for this
+        error. The correction message should indicate how the user can fix
+        the error. The field is omitted if there is no correction message
+        associated with the error code.
+    :vartype correction: str
+    """
+    __slots__ = ('severity', 'type', 'location', 'message', 'correction')
+    _fields = (
+        ('severity', 'severity', 'AnalysisErrorSeverity'),
+        ('type', 'type', 'AnalysisErrorType'),
+        ('location', 'location', 'Location'),
+        ('message', 'message', 'str'),
+        ('correction', 'correction', 'str'),
+    )
+
+
+class AnalysisErrorFixes(SpecObject):
+    """A list of fixes associated with a specific error
+
+    :ivar error: The error with which the fixes are associated.
+    :vartype error: AnalysisError
+
+    :ivar fixes: The fixes associated with the error.
+    :vartype fixes: [SourceChange]
+    """
+    __slots__ = ('error', 'fixes')
+    _fields = (
+        ('error', 'error', 'AnalysisError'),
+        ('fixes', 'fixes', '[SourceChange]'),
+    )
+
+
+class AnalysisOptions(SpecObject):
+    """A set of options controlling what kind of analysis is to be
+    performed. If the value of a field is omitted the value of the option
+    will not be changed.
+
+    :ivar enable_async: Deprecated : this feature is always enabled. True
+        if the client wants to enable support for the proposed async
+        feature.
+    :vartype enable_async: bool
+
+    :ivar enable_deferred_loading: Deprecated : this feature is always
+        enabled. True if the client wants to enable support for the
+        proposed deferred loading feature.
+    :vartype enable_deferred_loading: bool
+
+    :ivar enable_enums: Deprecated : this feature is always enabled. True
+        if the client wants to enable support for the proposed enum
+        feature.
+    :vartype enable_enums: bool
+
+    :ivar enable_null_aware_operators: Deprecated : this feature is always
+        enabled. True if the client wants to enable support for the
+        proposed "null aware operators" feature.
+    :vartype enable_null_aware_operators: bool
+
+    :ivar generate_dart2js_hints: True if hints that are specific to
+        dart2js should be generated. This option is ignored if
+        generateHints is false.
+    :vartype generate_dart2js_hints: bool
+
+    :ivar generate_hints: True if hints should be generated as part of
+        generating errors and warnings.
+    :vartype generate_hints: bool
+
+    :ivar generate_lints: True if lints should be generated as part of
+        generating errors and warnings.
+    :vartype generate_lints: bool
+    """
+    __slots__ = ('enable_async', 'enable_deferred_loading', 'enable_enums',
+                 'enable_null_aware_operators', 'generate_dart2js_hints',
+                 'generate_hints', 'generate_lints')
+    _fields = (
+        ('enableAsync', 'enable_async', 'bool'),
+        ('enableDeferredLoading', 'enable_deferred_loading', 'bool'),
+        ('enableEnums', 'enable_enums', 'bool'),
+        ('enableNullAwareOperators', 'enable_null_aware_operators', 'bool'),
+        ('generateDart2jsHints', 'generate_dart2js_hints', 'bool'),
+        ('generateHints', 'generate_hints', 'bool'),
+        ('generateLints', 'generate_lints', 'bool'),
+    )
+
+
+class AnalysisStatus(SpecObject):
+    """An indication of the current state of analysis.
+
+    :ivar is_analyzing: True if analysis is currently being performed.
+    :vartype is_analyzing: bool
+
+    :ivar analysis_target: The name of the current target of analysis.
+        This field is omitted if analyzing is false.
+    :vartype analysis_target: str
+    """
+    __slots__ = ('is_analyzing', 'analysis_target')
+    _fields = (
+        ('isAnalyzing', 'is_analyzing', 'bool'),
+        ('analysisTarget', 'analysis_target', 'str'),
+    )
+
+
+class ChangeContentOverlay(SpecObject):
+    """A directive to modify an existing file content overlay. One or more
+    ranges of text are deleted from the old file content overlay and
+    replaced with new text.
+
+    The edits are applied in the order in which they occur in the list.
+    This means that the offset of each edit must be correct under the
+    assumption that all previous edits have been applied.
+
+    It is an error to use this overlay on a file that does not yet have a
+    file content overlay or that has had its overlay removed via
+    RemoveContentOverlay .
+
+    If any of the edits cannot be applied due to its offset or length
+    being out of range, an INVALID_OVERLAY_CHANGE error will be reported.
+
+    :ivar type:
+    :vartype type: str
+
+    :ivar edits: The edits to be applied to the file.
+    :vartype edits: [SourceEdit]
+    """
+    __slots__ = ('type', 'edits')
+    _fields = (
+        ('type', 'type', 'str'),
+        ('edits', 'edits', '[SourceEdit]'),
+    )
+    _defaults = {'type': 'change'}
+
+
+class CompletionSuggestion(SpecObject):
+    """A suggestion for how to complete partially entered text. Many of
+    the fields are optional, depending on the kind of element being
+    suggested.
+
+    :ivar kind: The kind of element being suggested.
+    :vartype kind: CompletionSuggestionKind
+
+    :ivar relevance: The relevance of this completion suggestion where a
+        higher number indicates a higher relevance.
+    :vartype relevance: int
+
+    :ivar completion: The identifier to be inserted if the suggestion is
+        selected. If the suggestion is for a method or function, the
+        client might want to additionally insert a template for the
+        parameters. The information required in order to do so is
+        contained in other fields.
+    :vartype completion: str
+
+    :ivar selection_offset: The offset, relative to the beginning of the
+        completion, of where the selection should be placed after
+        insertion.
+    :vartype selection_offset: int
+
+    :ivar selection_length: The number of characters that should be
+        selected after insertion.
+    :vartype selection_length: int
+
+    :ivar is_deprecated: True if the suggested element is deprecated.
+    :vartype is_deprecated: bool
+
+    :ivar is_potential: True if the element is not known to be valid for
+        the target. This happens if the type of the target is dynamic.
+    :vartype is_potential: bool
+
+    :ivar doc_summary: An abbreviated version of the Dartdoc associated
+        with the element being suggested, This field is omitted if there
+        is no Dartdoc associated with the element.
+    :vartype doc_summary: str
+
+    :ivar doc_complete: The Dartdoc associated with the element being
+        suggested, This field is omitted if there is no Dartdoc associated
+        with the element.
+    :vartype doc_complete: str
+
+    :ivar declaring_type: The class that declares the element being
+        suggested. This field is omitted if the suggested element is not a
+        member of a class.
+    :vartype declaring_type: str
+
+    :ivar element: Information about the element reference being
+        suggested.
+    :vartype element: Element
+
+    :ivar return_type: The return type of the getter, function or method
+        or the type of the field being suggested. This field is omitted if
+        the suggested element is not a getter, function or method.
+    :vartype return_type: str
+
+    :ivar parameter_names: The names of the parameters of the function or
+        method being suggested. This field is omitted if the suggested
+        element is not a setter, function or method.
+    :vartype parameter_names: [str]
+
+    :ivar parameter_types: The types of the parameters of the function or
+        method being suggested. This field is omitted if the
+        parameterNames field is omitted.
+    :vartype parameter_types: [str]
+
+    :ivar required_parameter_count: The number of required parameters for
+        the function or method being suggested. This field is omitted if
+        the parameterNames field is omitted.
+    :vartype required_parameter_count: int
+
+    :ivar has_named_parameters: True if the function or method being
+        suggested has at least one named parameter. This field is omitted
+        if the parameterNames field is omitted.
+    :vartype has_named_parameters: bool
+
+    :ivar parameter_name: The name of the optional parameter being
+        suggested. This field is omitted if the suggestion is not the
+        addition of an optional argument within an argument list.
+    :vartype parameter_name: str
+
+    :ivar parameter_type: The type of the options parameter being
+        suggested. This field is omitted if the parameterName field is
+        omitted.
+    :vartype parameter_type: str
+
+    :ivar import_uri: The import to be added if the suggestion is out of
+        scope and needs an import to be added to be in scope.
+    :vartype import_uri: str
+    """
+    __slots__ = ('kind', 'relevance', 'completion', 'selection_offset',
+                 'selection_length', 'is_deprecated', 'is_potential',
+                 'doc_summary', 'doc_complete', 'declaring_type', 'element',
+                 'return_type', 'parameter_names', 'parameter_types',
+                 'required_parameter_count', 'has_named_parameters',
+                 'parameter_name', 'parameter_type', 'import_uri')
+    _fields = (
+        ('kind', 'kind', 'CompletionSuggestionKind'),
+        ('relevance', 'relevance', 'int'),
+        ('completion', 'completion', 'str'),
+        ('selectionOffset', 'selection_offset', 'int'),
+        ('selectionLength', 'selection_length', 'int'),
+        ('isDeprecated', 'is_deprecated', 'bool'),
+        ('isPotential', 'is_potential', 'bool'),
+        ('docSummary', 'doc_summary', 'str'),
+        ('docComplete', 'doc_complete', 'str'),
+        ('declaringType', 'declaring_type', 'str'),
+        ('element', 'element', 'Element'),
+        ('returnType', 'return_type', 'str'),
+        ('parameterNames', 'parameter_names', '[str]'),
+        ('parameterTypes', 'parameter_types', '[str]'),
+        ('requiredParameterCount', 'required_parameter_count', 'int'),
+        ('hasNamedParameters', 'has_named_parameters', 'bool'),
+        ('parameterName', 'parameter_name', 'str'),
+        ('parameterType', 'parameter_type', 'str'),
+        ('importUri', 'import_uri', 'str'),
+    )
+
+
+class Element(SpecObject):
+    """Information about an element (something that can be declared in
+    code).
+
+    :ivar kind: The kind of the element.
+    :vartype kind: ElementKind
+
+    :ivar name: The name of the element. This is typically used as the
+        label in the outline.
+    :vartype name: str
+
+    :ivar location: The location of the name in the declaration of the
+        element.
+    :vartype location: Location
+
+    :ivar flags: A bit-map containing the following flags:
+    :vartype flags: int
+
+    :ivar parameters: The parameter list for the element. If the element
+        is not a method or function this field will not be defined. If the
+        element doesn't have parameters (e.g. getter), this field will not
+        be defined. If the element has zero parameters, this field will
+        have a value of "()".
+    :vartype parameters: str
+
+    :ivar return_type: The return type of the element. If the element is
+        not a method or function this field will not be defined. If the
+        element does not have a declared return type, this field will
+        contain an empty string.
+    :vartype return_type: str
+
+    :ivar type_parameters: The type parameter list for the element. If the
+        element doesn't have type parameters, this field will not be
+        defined.
+    :vartype type_parameters: str
+    """
+    __slots__ = ('kind', 'name', 'location', 'flags', 'parameters',
+                 'return_type', 'type_parameters')
+    _fields = (
+        ('kind', 'kind', 'ElementKind'),
+        ('name', 'name', 'str'),
+        ('location', 'location', 'Location'),
+        ('flags', 'flags', 'int'),
+        ('parameters', 'parameters', 'str'),
+        ('returnType', 'return_type', 'str'),
+        ('typeParameters', 'type_parameters', 'str'),
+    )
+
+
+class ExecutableFile(SpecObject):
+    """A description of an executable file.
+
+    :ivar file: The path of the executable file.
+    :vartype file: FilePath
+
+    :ivar kind: The kind of the executable file.
+    :vartype kind: ExecutableKind
+    """
+    __slots__ = ('file', 'kind')
+    _fields = (
+        ('file', 'file', 'FilePath'),
+        ('kind', 'kind', 'ExecutableKind'),
+    )
+
+
+class FoldingRegion(SpecObject):
+    """A description of a region that can be folded.
+
+    :ivar kind: The kind of the region.
+    :vartype kind: FoldingKind
+
+    :ivar offset: The offset of the region to be folded.
+    :vartype offset: int
+
+    :ivar length: The length of the region to be folded.
+    :vartype length: int
+    """
+    __slots__ = ('kind', 'offset', 'length')
+    _fields = (
+        ('kind', 'kind', 'FoldingKind'),
+        ('offset', 'offset', 'int'),
+        ('length', 'length', 'int'),
+    )
+
+
+class HighlightRegion(SpecObject):
+    """A description of a region that could have special highlighting
+    associated with it.
+
+    :ivar type: The type of highlight associated with the region.
+    :vartype type: HighlightRegionType
+
+    :ivar offset: The offset of the region to be highlighted.
+    :vartype offset: int
+
+    :ivar length: The length of the region to be highlighted.
+    :vartype length: int
+    """
+    __slots__ = ('type', 'offset', 'length')
+    _fields = (
+        ('type', 'type', 'HighlightRegionType'),
+        ('offset', 'offset', 'int'),
+        ('length', 'length', 'int'),
+    )
+
+
+class HoverInformation(SpecObject):
+    """The hover information associated with a specific location.
+
+    :ivar offset: The offset of the range of characters that encompases
+        the cursor position and has the same hover information as the
+        cursor position.
+    :vartype offset: int
+
+    :ivar length: The length of the range of characters that encompases
+        the cursor position and has the same hover information as the
+        cursor position.
+    :vartype length: int
+
+    :ivar containing_library_path: The path to the defining compilation
+        unit of the library in which the referenced element is declared.
+        This data is omitted if there is no referenced element, or if the
+        element is declared inside an HTML file.
+    :vartype containing_library_path: str
+
+    :ivar containing_library_name: The name of the library in which the
+        referenced element is declared. This data is omitted if there is
+        no referenced element, or if the element is declared inside an
+        HTML file.
+    :vartype containing_library_name: str
+
+    :ivar containing_class_description: A human-readable description of
+        the class declaring the element being referenced. This data is
+        omitted if there is no referenced element, or if the element is
+        not a class member.
+    :vartype containing_class_description: str
+
+    :ivar dartdoc: The dartdoc associated with the referenced element.
+        Other than the removal of the comment delimiters, including
+        leading asterisks in the case of a block comment, the dartdoc is
+        unprocessed markdown. This data is omitted if there is no
+        referenced element, or if the element has no dartdoc.
+    :vartype dartdoc: str
+
+    :ivar element_description: A human-readable description of the element
+        being referenced. This data is omitted if there is no referenced
+        element.
+    :vartype element_description: str
+
+    :ivar element_kind: A human-readable description of the kind of
+        element being referenced (such as “class” or “function type
+        alias”). This data is omitted if there is no referenced element.
+    :vartype element_kind: str
+
+    :ivar parameter: A human-readable description of the parameter
+        corresponding to the expression being hovered over. This data is
+        omitted if the location is not in an argument to a function.
+    :vartype parameter: str
+
+    :ivar propagated_type: The name of the propagated type of the
+        expression. This data is omitted if the location does not
+        correspond to an expression or if there is no propagated type
+        information.
+    :vartype propagated_type: str
+
+    :ivar static_type: The name of the static type of the expression. This
+        data is omitted if the location does not correspond to an
+        expression.
+    :vartype static_type: str
+    """
+    __slots__ = ('offset', 'length', 'containing_library_path',
+                 'containing_library_name', 'containing_class_description',
+                 'dartdoc', 'element_description', 'element_kind', 'parameter',
+                 'propagated_type', 'static_type')
+    _fields = (
+        ('offset', 'offset', 'int'),
+        ('length', 'length', 'int'),
+        ('containingLibraryPath', 'containing_library_path', 'str'),
+        ('containingLibraryName', 'containing_library_name', 'str'),
+        ('containingClassDescription', 'containing_class_description', 'str'),
+        ('dartdoc', 'dartdoc', 'str'),
+        ('elementDescription', 'element_description', 'str'),
+        ('elementKind', 'element_kind', 'str'),
+        ('parameter', 'parameter', 'str'),
+        ('propagatedType', 'propagated_type', 'str'),
+        ('staticType', 'static_type', 'str'),
+    )
+
+
+class LinkedEditGroup(SpecObject):
+    """A collection of positions that should be linked (edited
+    simultaneously) for the purposes of updating code after a source
+    change. For example, if a set of edits introduced a new variable name,
+    the group would contain all of the positions of the variable name so
+    that if the client wanted to let the user edit the variable name after
+    the operation, all occurrences of the name could be edited
+    simultaneously.
+
+    :ivar positions: The positions of the regions that should be edited
+        simultaneously.
+    :vartype positions: [Position]
+
+    :ivar length: The length of the regions that should be edited
+        simultaneously.
+    :vartype length: int
+
+    :ivar suggestions: Pre-computed suggestions for what every region
+        might want to be changed to.
+    :vartype suggestions: [LinkedEditSuggestion]
+    """
+    __slots__ = ('positions', 'length', 'suggestions')
+    _fields = (
+        ('positions', 'positions', '[Position]'),
+        ('length', 'length', 'int'),
+        ('suggestions', 'suggestions', '[LinkedEditSuggestion]'),
+    )
+
+
+class LinkedEditSuggestion(SpecObject):
+    """A suggestion of a value that could be used to replace all of the
+    linked edit regions in a LinkedEditGroup.
+
+    :ivar value: The value that could be used to replace all of the linked
+        edit regions.
+    :vartype value: str
+
+    :ivar kind: The kind of value being proposed.
+    :vartype kind: LinkedEditSuggestionKind
+    """
+    __slots__ = ('value', 'kind')
+    _fields = (
+        ('value', 'value', 'str'),
+        ('kind', 'kind', 'LinkedEditSuggestionKind'),
+    )
+
+
+class Location(SpecObject):
+    """A location (character range) within a file.
+
+    :ivar file: The file containing the range.
+    :vartype file: FilePath
+
+    :ivar offset: The offset of the range.
+    :vartype offset: int
+
+    :ivar length: The length of the range.
+    :vartype length: int
+
+    :ivar start_line: The one-based index of the line containing the first
+        character of the range.
+    :vartype start_line: int
+
+    :ivar start_column: The one-based index of the column containing the
+        first character of the range.
+    :vartype start_column: int
+    """
+    __slots__ = ('file', 'offset', 'length', 'start_line', 'start_column')
+    _fields = (
+        ('file', 'file', 'FilePath'),
+        ('offset', 'offset', 'int'),
+        ('length', 'length', 'int'),
+        ('startLine', 'start_line', 'int'),
+        ('startColumn', 'start_column', 'int'),
+    )
+
+
+class NavigationRegion(SpecObject):
+    """A description of a region from which the user can navigate to the
+    declaration of an element.
+
+    :ivar offset: The offset of the region from which the user can
+        navigate.
+    :vartype offset: int
+
+    :ivar length: The length of the region from which the user can
+        navigate.
+    :vartype length: int
+
+    :ivar targets: The indexes of the targets (in the enclosing navigation
+        response) to which the given region is bound. By opening the
+        target, clients can implement one form of navigation.
+    :vartype targets: [int]
+    """
+    __slots__ = ('offset', 'length', 'targets')
+    _fields = (
+        ('offset', 'offset', 'int'),
+        ('length', 'length', 'int'),
+        ('targets', 'targets', '[int]'),
+    )
+
+
+class NavigationTarget(SpecObject):
+    """A description of a target to which the user can navigate.
+
+    :ivar kind: The kind of the element.
+    :vartype kind: ElementKind
+
+    :ivar file_index: The index of the file (in the enclosing navigation
+        response) to navigate to.
+    :vartype file_index: int
+
+    :ivar offset: The offset of the region from which the user can
+        navigate.
+    :vartype offset: int
+
+    :ivar length: The length of the region from which the user can
+        navigate.
+    :vartype length: int
+
+    :ivar start_line: The one-based index of the line containing the first
+        character of the region.
+    :vartype start_line: int
+
+    :ivar start_column: The one-based index of the column containing the
+        first character of the region.
+    :vartype start_column: int
+    """
+    __slots__ = ('kind', 'file_index', 'offset', 'length', 'start_line',
+                 'start_column')
+    _fields = (
+        ('kind', 'kind', 'ElementKind'),
+        ('fileIndex', 'file_index', 'int'),
+        ('offset', 'offset', 'int'),
+        ('length', 'length', 'int'),
+        ('startLine', 'start_line', 'int'),
+        ('startColumn', 'start_column', 'int'),
+    )
+
+
+class Occurrences(SpecObject):
+    """A description of the references to a single element within a single
+    file.
+
+    :ivar element: The element that was referenced.
+    :vartype element: Element
+
+    :ivar offsets: The offsets of the name of the referenced element
+        within the file.
+    :vartype offsets: [int]
+
+    :ivar length: The length of the name of the referenced element.
+    :vartype length: int
+    """
+    __slots__ = ('element', 'offsets', 'length')
+    _fields = (
+        ('element', 'element', 'Element'),
+        ('offsets', 'offsets', '[int]'),
+        ('length', 'length', 'int'),
+    )
+
+
+class Outline(SpecObject):
+    """An node in the outline structure of a file.
+
+    :ivar element: A description of the element represented by this node.
+    :vartype element: Element
+
+    :ivar offset: The offset of the first character of the element. This
+        is different than the offset in the Element, which if the offset
+        of the name of the element. It can be used, for example, to map
+        locations in the file back to an outline.
+    :vartype offset: int
+
+    :ivar length: The length of the element.
+    :vartype length: int
+
+    :ivar children: The children of the node. The field will be omitted if
+        the node has no children.
+    :vartype children: [Outline]
+    """
+    __slots__ = ('element', 'offset', 'length', 'children')
+    _fields = (
+        ('element', 'element', 'Element'),
+        ('offset', 'offset', 'int'),
+        ('length', 'length', 'int'),
+        ('children', 'children', '[Outline]'),
+    )
+
+
+class Override(SpecObject):
+    """A description of a member that overrides an inherited member.
+
+    :ivar offset: The offset of the name of the overriding member.
+    :vartype offset: int
+
+    :ivar length: The length of the name of the overriding member.
+    :vartype length: int
+
+    :ivar superclass_member: The member inherited from a superclass that
+        is overridden by the overriding member. The field is omitted if
+        there is no superclass member, in which case there must be at
+        least one interface member.
+    :vartype superclass_member: OverriddenMember
+
+    :ivar interface_members: The members inherited from interfaces that
+        are overridden by the overriding member. The field is omitted if
+        there are no interface members, in which case there must be a
+        superclass member.
+    :vartype interface_members: [OverriddenMember]
+    """
+    __slots__ = ('offset', 'length', 'superclass_member', 'interface_members')
+    _fields = (
+        ('offset', 'offset', 'int'),
+        ('length', 'length', 'int'),
+        ('superclassMember', 'superclass_member', 'OverriddenMember'),
+        ('interfaceMembers', 'interface_members', '[OverriddenMember]'),
+    )
+
+
+class OverriddenMember(SpecObject):
+    """A description of a member that is being overridden.
+
+    :ivar element: The element that is being overridden.
+    :vartype element: Element
+
+    :ivar class_name: The name of the class in which the member is
+        defined.
+    :vartype class_name: str
+    """
+    __slots__ = ('element', 'class_name')
+    _fields = (
+        ('element', 'element', 'Element'),
+        ('className', 'class_name', 'str'),
+    )
+
+
+class Position(SpecObject):
+    """A position within a file.
+
+    :ivar file: The file containing the position.
+    :vartype file: FilePath
+
+    :ivar offset: The offset of the position.
+    :vartype offset: int
+    """
+    __slots__ = ('file', 'offset')
+    _fields = (
+        ('file', 'file', 'FilePath'),
+        ('offset', 'offset', 'int'),
+    )
+
+
+class PubStatus(SpecObject):
+    """An indication of the current state of pub execution.
+
+    :ivar is_listing_package_dirs: True if the server is currently running
+        pub to produce a list of package directories.
+    :vartype is_listing_package_dirs: bool
+    """
+    __slots__ = ('is_listing_package_dirs',)
+    _fields = (
+        ('isListingPackageDirs', 'is_listing_package_dirs', 'bool'),
+    )
+
+
+class RefactoringMethodParameter(SpecObject):
+    """A description of a parameter in a method refactoring.
+
+    :ivar id: The unique identifier of the parameter. Clients may omit
+        this field for the parameters they want to add.
+    :vartype id: str
+
+    :ivar kind: The kind of the parameter.
+    :vartype kind: RefactoringMethodParameterKind
+
+    :ivar type: The type that should be given to the parameter, or the
+        return type of the parameter's function type.
+    :vartype type: str
+
+    :ivar name: The name that should be given to the parameter.
+    :vartype name: str
+
+    :ivar parameters: The parameter list of the parameter's function type.
+        If the parameter is not of a function type, this field will not be
+        defined. If the function type has zero parameters, this field will
+        have a value of "()".
+    :vartype parameters: str
+    """
+    __slots__ = ('id', 'kind', 'type', 'name', 'parameters')
+    _fields = (
+        ('id', 'id', 'str'),
+        ('kind', 'kind', 'RefactoringMethodParameterKind'),
+        ('type', 'type', 'str'),
+        ('name', 'name', 'str'),
+        ('parameters', 'parameters', 'str'),
+    )
+
+
+class RefactoringProblem(SpecObject):
+    """A description of a problem related to a refactoring.
+
+    :ivar severity: The severity of the problem being represented.
+    :vartype severity: RefactoringProblemSeverity
+
+    :ivar message: A human-readable description of the problem being
+        represented.
+    :vartype message: str
+
+    :ivar location: The location of the problem being represented. This
+        field is omitted unless there is a specific location associated
+        with the problem (such as a location where an element being
+        renamed will be shadowed).
+    :vartype location: Location
+    """
+    __slots__ = ('severity', 'message', 'location')
+    _fields = (
+        ('severity', 'severity', 'RefactoringProblemSeverity'),
+        ('message', 'message', 'str'),
+        ('location', 'location', 'Location'),
+    )
+
+
+class RemoveContentOverlay(SpecObject):
+    """A directive to remove an existing file content overlay. After
+    processing this directive, the file contents will once again be read
+    from the file system.
+
+    If this directive is used on a file that doesn't currently have a
+    content overlay, it has no effect.
+
+    :ivar type:
+    :vartype type: str
+    """
+    __slots__ = ('type',)
+    _fields = (
+        ('type', 'type', 'str'),
+    )
+    _defaults = {'type': 'remove'}
+
+
+class SearchResult(SpecObject):
+    """A single result from a search request.
+
+    :ivar location: The location of the code that matched the search
+        criteria.
+    :vartype location: Location
+
+    :ivar kind: The kind of element that was found or the kind of
+        reference that was found.
+    :vartype kind: SearchResultKind
+
+    :ivar is_potential: True if the result is a potential match but cannot
+        be confirmed to be a match. For example, if all references to a
+        method m defined in some class were requested, and a reference to
+        a method m from an unknown class were found, it would be marked as
+        being a potential match.
+    :vartype is_potential: bool
+
+    :ivar path: The elements that contain the result, starting with the
+        most immediately enclosing ancestor and ending with the library.
+    :vartype path: [Element]
+    """
+    __slots__ = ('location', 'kind', 'is_potential', 'path')
+    _fields = (
+        ('location', 'location', 'Location'),
+        ('kind', 'kind', 'SearchResultKind'),
+        ('isPotential', 'is_potential', 'bool'),
+        ('path', 'path', '[Element]'),
+    )
+
+
+class SourceChange(SpecObject):
+    """A description of a set of edits that implement a single conceptual
+    change.
+
+    :ivar message: A human-readable description of the change to be
+        applied.
+    :vartype message: str
+
+    :ivar edits: A list of the edits used to effect the change, grouped by
+        file.
+    :vartype edits: [SourceFileEdit]
+
+    :ivar linked_edit_groups: A list of the linked editing groups used to
+        customize the changes that were made.
+    :vartype linked_edit_groups: [LinkedEditGroup]
+
+    :ivar selection: The position that should be selected after the edits
+        have been applied.
+    :vartype selection: Position
+    """
+    __slots__ = ('message', 'edits', 'linked_edit_groups', 'selection')
+    _fields = (
+        ('message', 'message', 'str'),
+        ('edits', 'edits', '[SourceFileEdit]'),
+        ('linkedEditGroups', 'linked_edit_groups', '[LinkedEditGroup]'),
+        ('selection', 'selection', 'Position'),
+    )
+
+
+class SourceEdit(SpecObject):
+    """A description of a single change to a single file.
+
+    :ivar offset: The offset of the region to be modified.
+    :vartype offset: int
+
+    :ivar length: The length of the region to be modified.
+    :vartype length: int
+
+    :ivar replacement: The code that is to replace the specified region in
+        the original code.
+    :vartype replacement: str
+
+    :ivar id: An identifier that uniquely identifies this source edit from
+        other edits in the same response. This field is omitted unless a
+        containing structure needs to be able to identify the edit for
+        some reason. For example, some refactoring operations can produce
+        edits that might not be appropriate (referred to as potential
+        edits). Such edits will have an id so that they can be referenced.
+        Edits in the same response that do not need to be referenced will
+        not have an id.
+    :vartype id: str
+    """
+    __slots__ = ('offset', 'length', 'replacement', 'id')
+    _fields = (
+        ('offset', 'offset', 'int'),
+        ('length', 'length', 'int'),
+        ('replacement', 'replacement', 'str'),
+        ('id', 'id', 'str'),
+    )
+
+
+class SourceFileEdit(SpecObject):
+    """A description of a set of changes to a single file.
+
+    :ivar file: The file containing the code to be modified.
+    :vartype file: FilePath
+
+    :ivar file_stamp: The modification stamp of the file at the moment
+        when the change was created, in milliseconds since the "Unix
+        epoch". Will be -1 if the file did not exist and should be
+        created. The client may use this field to make sure that the file
+        was not changed since then, so it is safe to apply the change.
+    :vartype file_stamp: long
+
+    :ivar edits: A list of the edits used to effect the change.
+    :vartype edits: [SourceEdit]
+    """
+    __slots__ = ('file', 'file_stamp', 'edits')
+    _fields = (
+        ('file', 'file', 'FilePath'),
+        ('fileStamp', 'file_stamp', 'long'),
+        ('edits', 'edits', '[SourceEdit]'),
+    )
+
+
+class TypeHierarchyItem(SpecObject):
+    """A representation of a class in a type hierarchy.
+
+    :ivar class_element: The class element represented by this item.
+    :vartype class_element: Element
+
+    :ivar display_name: The name to be displayed for the class. This field
+        will be omitted if the display name is the same as the name of the
+        element. The display name is different if there is additional type
+        information to be displayed, such as type arguments.
+    :vartype display_name: str
+
+    :ivar member_element: The member in the class corresponding to the
+        member on which the hierarchy was requested. This field will be
+        omitted if the hierarchy was not requested for a member or if the
+        class does not have a corresponding member.
+    :vartype member_element: Element
+
+    :ivar superclass: The index of the item representing the superclass of
+        this class. This field will be omitted if this item represents the
+        class Object.
+    :vartype superclass: int
+
+    :ivar interfaces: The indexes of the items representing the interfaces
+        implemented by this class. The list will be empty if there are no
+        implemented interfaces.
+    :vartype interfaces: [int]
+
+    :ivar mixins: The indexes of the items representing the mixins
+        referenced by this class. The list will be empty if there are no
+        classes mixed in to this class.
+    :vartype mixins: [int]
+
+    :ivar subclasses: The indexes of the items representing the subtypes
+        of this class. The list will be empty if there are no subtypes or
+        if this item represents a supertype of the pivot type.
+    :vartype subclasses: [int]
+    """
+    __slots__ = ('class_element', 'display_name', 'member_element',
+                 'superclass', 'interfaces', 'mixins', 'subclasses')
+    _fields = (
+        ('classElement', 'class_element', 'Element'),
+        ('displayName', 'display_name', 'str'),
+        ('memberElement', 'member_element', 'Element'),
+        ('superclass', 'superclass', 'int'),
+        ('interfaces', 'interfaces', '[int]'),
+        ('mixins', 'mixins', '[int]'),
+        ('subclasses', 'subclasses', '[int]'),
+    )
+
+
 @DartAnalysisServer.register_domain('server')
 class ServerDomain:
     """The server domain contains API’s related to the execution of the
     server.
     """
 
-    def get_version(self, *, callback=None, errback=None):
+    def get_version(self, *, callback=None, errback=None, **kwargs):
         """Return the version number of the analysis server.
 
         Callback arguments:
 
         :param version: The version number of the analysis server.
         :type version: str
+
+        :returns: A future resolved with a dict of the callback arguments.
         """
         method = 'server.getVersion'
         params = {}
-        self.server.request(method, params, callback=callback, errback=errback)
+        return self.server.request(method, params, callback=callback,
+                                   errback=errback, **kwargs)
 
-    def shutdown(self, *, callback=None, errback=None):
+    def shutdown(self, *, callback=None, errback=None, **kwargs):
         """Cleanly shutdown the analysis server. Requests that are received
         after this request will not be processed. Requests that were received
         before this request, but for which a response has not yet been sent,
         will not be responded to. No further responses or notifications will
         be sent after the response to this request has been sent.
+
+        :returns: A future resolved with a dict of the callback arguments.
         """
         method = 'server.shutdown'
         params = {}
-        self.server.request(method, params, callback=callback, errback=errback)
+        return self.server.request(method, params, callback=callback,
+                                   errback=errback, **kwargs)
 
-    def set_subscriptions(self, subscriptions, *, callback=None, errback=None):
+    def set_subscriptions(self, subscriptions, *, callback=None, errback=None,
+                          **kwargs):
         """Subscribe for services. All previous subscriptions are replaced by
         the given set of services.
 
@@ -43,10 +1317,13 @@ class ServerDomain:
 
         :param subscriptions: A list of the services being subscribed to.
         :type subscriptions: [ServerService]
+
+        :returns: A future resolved with a dict of the callback arguments.
         """
         method = 'server.setSubscriptions'
         params = {'subscriptions': subscriptions}
-        self.server.request(method, params, callback=callback, errback=errback)
+        return self.server.request(method, params, callback=callback,
+                                   errback=errback, **kwargs)
 
     def on_connected(self, *, callback):
         """Reports that the server is running. This notification is issued
@@ -60,9 +1337,11 @@ class ServerDomain:
 
         :param version: The version number of the analysis server.
         :type version: str
+
+        :returns: A subscription that can be cancelled.
         """
         event = 'server.connected'
-        self.server.notification(event, callback=callback)
+        return self.server.notification(event, callback=callback)
 
     def on_error(self, *, callback):
         """Reports that an unexpected error has occurred while executing the
@@ -88,9 +1367,11 @@ class ServerDomain:
         :param stack_trace: The stack trace associated with the generation of
             the error, used for debugging the server.
         :type stack_trace: str
+
+        :returns: A subscription that can be cancelled.
         """
         event = 'server.error'
-        self.server.notification(event, callback=callback)
+        return self.server.notification(event, callback=callback)
 
     def on_status(self, *, callback):
         """Reports the current status of the server. Parameters are omitted if
@@ -109,9 +1390,11 @@ class ServerDomain:
         :param pub: The current status of pub execution, indicating whether we
             are currently running pub.
         :type pub: PubStatus
+
+        :returns: A subscription that can be cancelled.
         """
         event = 'server.status'
-        self.server.notification(event, callback=callback)
+        return self.server.notification(event, callback=callback)
 
 
 @DartAnalysisServer.register_domain('analysis')
@@ -120,7 +1403,7 @@ class AnalysisDomain:
     files.
     """
 
-    def get_errors(self, file, *, callback=None, errback=None):
+    def get_errors(self, file, *, callback=None, errback=None, **kwargs):
         """Return the errors associated with the given file. If the errors for
         the given file have not yet been computed, or the most recently
         computed errors for the given file are out of date, then the response
@@ -149,12 +1432,16 @@ class AnalysisDomain:
 
         :param errors: The errors associated with the file.
         :type errors: [AnalysisError]
+
+        :returns: A future resolved with a dict of the callback arguments.
         """
         method = 'analysis.getErrors'
         params = {'file': file}
-        self.server.request(method, params, callback=callback, errback=errback)
+        return self.server.request(method, params, callback=callback,
+                                   errback=errback, **kwargs)
 
-    def get_hover(self, file, offset, *, callback=None, errback=None):
+    def get_hover(self, file, offset, *, callback=None, errback=None,
+                  **kwargs):
         """Return the hover information associate with the given location. If
         some or all of the hover information is not available at the time this
         request is processed the information will be omitted from the
@@ -175,12 +1462,16 @@ class AnalysisDomain:
             analyzed in multiple contexts in conflicting ways (such as a part
             that is included in multiple libraries).
         :type hovers: [HoverInformation]
+
+        :returns: A future resolved with a dict of the callback arguments.
         """
         method = 'analysis.getHover'
         params = {'file': file, 'offset': offset}
-        self.server.request(method, params, callback=callback, errback=errback)
+        return self.server.request(method, params, callback=callback,
+                                   errback=errback, **kwargs)
 
-    def get_library_dependencies(self, *, callback=None, errback=None):
+    def get_library_dependencies(self, *, callback=None, errback=None,
+                                 **kwargs):
         """Return library dependency information for use in client-side
         indexing and package URI resolution.
 
@@ -197,13 +1488,16 @@ class AnalysisDomain:
             maps which map package names to source directories for use in
             client-side package URI resolution.
         :type package_map: {str: {str: [FilePath]}}
+
+        :returns: A future resolved with a dict of the callback arguments.
         """
         method = 'analysis.getLibraryDependencies'
         params = {}
-        self.server.request(method, params, callback=callback, errback=errback)
+        return self.server.request(method, params, callback=callback,
+                                   errback=errback, **kwargs)
 
     def get_navigation(self, file, offset, length, *, callback=None,
-                       errback=None):
+                       errback=None, **kwargs):
         """Return the navigation information associated with the given region
         of the given file. If the navigation information for the given file
         has not yet been computed, or the most recently computed navigation
@@ -250,12 +1544,15 @@ class AnalysisDomain:
         :param regions: A list of the navigation regions within the requested
             region of the file.
         :type regions: [NavigationRegion]
+
+        :returns: A future resolved with a dict of the callback arguments.
         """
         method = 'analysis.getNavigation'
         params = {'file': file, 'length': length, 'offset': offset}
-        self.server.request(method, params, callback=callback, errback=errback)
+        return self.server.request(method, params, callback=callback,
+                                   errback=errback, **kwargs)
 
-    def reanalyze(self, roots, *, callback=None, errback=None):
+    def reanalyze(self, roots, *, callback=None, errback=None, **kwargs):
         """Force the re-analysis of everything contained in the specified
         analysis roots. This will cause all previously computed analysis
         results to be discarded and recomputed, and will cause all subscribed
@@ -269,13 +1566,16 @@ class AnalysisDomain:
 
         :param roots: A list of the analysis roots that are to be re-analyzed.
         :type roots: [FilePath]
+
+        :returns: A future resolved with a dict of the callback arguments.
         """
         method = 'analysis.reanalyze'
         params = {'roots': roots}
-        self.server.request(method, params, callback=callback, errback=errback)
+        return self.server.request(method, params, callback=callback,
+                                   errback=errback, **kwargs)
 
     def set_analysis_roots(self, included, excluded, package_roots, *,
-                           callback=None, errback=None):
+                           callback=None, errback=None, **kwargs):
         """Sets the root paths used to determine which files to analyze. The
         set of files to be analyzed are all of the files in one of the root
         paths that are not either explicitly or implicitly excluded. A file is
@@ -325,14 +1625,17 @@ class AnalysisDomain:
             indicates that the normal pubspec.yaml mechanism should always be
             used.
         :type package_roots: {FilePath: FilePath}
+
+        :returns: A future resolved with a dict of the callback arguments.
         """
         method = 'analysis.setAnalysisRoots'
         params = {'excluded': excluded, 'included': included,
                   'packageRoots': package_roots}
-        self.server.request(method, params, callback=callback, errback=errback)
+        return self.server.request(method, params, callback=callback,
+                                   errback=errback, **kwargs)
 
     def set_general_subscriptions(self, subscriptions, *, callback=None,
-                                  errback=None):
+                                  errback=None, **kwargs):
         """Subscribe for general services (that is, services that are not
         specific to individual files). All previous subscriptions are replaced
         by the given set of services.
@@ -343,12 +1646,16 @@ class AnalysisDomain:
 
         :param subscriptions: A list of the services being subscribed to.
         :type subscriptions: [GeneralAnalysisService]
+
+        :returns: A future resolved with a dict of the callback arguments.
         """
         method = 'analysis.setGeneralSubscriptions'
         params = {'subscriptions': subscriptions}
-        self.server.request(method, params, callback=callback, errback=errback)
+        return self.server.request(method, params, callback=callback,
+                                   errback=errback, **kwargs)
 
-    def set_priority_files(self, files, *, callback=None, errback=None):
+    def set_priority_files(self, files, *, callback=None, errback=None,
+                           **kwargs):
         """Set the priority files to the files in the given list. A priority
         file is a file that is given priority when scheduling which analysis
         work to do first. The list typically contains those files that are
@@ -369,12 +1676,16 @@ class AnalysisDomain:
 
         :param files: The files that are to be a priority for analysis.
         :type files: [FilePath]
+
+        :returns: A future resolved with a dict of the callback arguments.
         """
         method = 'analysis.setPriorityFiles'
         params = {'files': files}
-        self.server.request(method, params, callback=callback, errback=errback)
+        return self.server.request(method, params, callback=callback,
+                                   errback=errback, **kwargs)
 
-    def set_subscriptions(self, subscriptions, *, callback=None, errback=None):
+    def set_subscriptions(self, subscriptions, *, callback=None, errback=None,
+                          **kwargs):
         """Subscribe for services that are specific to individual files. All
         previous subscriptions are replaced by the current set of
         subscriptions. If a given service is not included as a key in the map
@@ -404,12 +1715,15 @@ class AnalysisDomain:
         :param subscriptions: A table mapping services to a list of the files
             being subscribed to the service.
         :type subscriptions: {AnalysisService: [FilePath]}
+
+        :returns: A future resolved with a dict of the callback arguments.
         """
         method = 'analysis.setSubscriptions'
         params = {'subscriptions': subscriptions}
-        self.server.request(method, params, callback=callback, errback=errback)
+        return self.server.request(method, params, callback=callback,
+                                   errback=errback, **kwargs)
 
-    def update_content(self, files, *, callback=None, errback=None):
+    def update_content(self, files, *, callback=None, errback=None, **kwargs):
         """Update the content of one or more files. Files that were previously
         updated but not included in this update remain unchanged. This
         effectively represents an overlay of the filesystem. The files whose
@@ -421,12 +1735,16 @@ class AnalysisDomain:
             description of the content change.
         :type files: {FilePath: (AddContentOverlay | ChangeContentOverlay |
             RemoveContentOverlay)}
+
+        :returns: A future resolved with a dict of the callback arguments.
         """
         method = 'analysis.updateContent'
         params = {'files': files}
-        self.server.request(method, params, callback=callback, errback=errback)
+        return self.server.request(method, params, callback=callback,
+                                   errback=errback, **kwargs)
 
-    def update_options(self, options, *, callback=None, errback=None):
+    def update_options(self, options, *, callback=None, errback=None,
+                       **kwargs):
         """Update the options controlling analysis based on the given set of
         options. Any options that are not included in the analysis options
         will not be changed. If there are options in the analysis options that
@@ -434,10 +1752,13 @@ class AnalysisDomain:
 
         :param options: The options that are to be used to control analysis.
         :type options: AnalysisOptions
+
+        :returns: A future resolved with a dict of the callback arguments.
         """
         method = 'analysis.updateOptions'
         params = {'options': options}
-        self.server.request(method, params, callback=callback, errback=errback)
+        return self.server.request(method, params, callback=callback,
+                                   errback=errback, **kwargs)
 
     def on_analyzed_files(self, *, callback):
         """Reports the paths of the files that are being analyzed.
@@ -451,11 +1772,13 @@ class AnalysisDomain:
         :param directories: A list of the paths of the files that are being
             analyzed.
         :type directories: [FilePath]
+
+        :returns: A subscription that can be cancelled.
         """
         event = 'analysis.analyzedFiles'
-        self.server.notification(event, callback=callback)
+        return self.server.notification(event, callback=callback)
 
-    def on_errors(self, *, callback):
+    def on_errors(self, *, callback, files=None):
         """Reports the errors associated with a given file. The set of errors
         included in the notification is always a complete list that supersedes
         any previously reported errors.
@@ -463,6 +1786,9 @@ class AnalysisDomain:
         It is only possible to unsubscribe from this notification by using the
         command-line flag --no-error-notification.
 
+        :param files: If given, only notifications about these files are
+            delivered to the callback.
+
         Callback arguments:
 
         :param file: The file containing the errors.
@@ -470,9 +1796,11 @@ class AnalysisDomain:
 
         :param errors: The errors contained in the file.
         :type errors: [AnalysisError]
+
+        :returns: A subscription that can be cancelled.
         """
         event = 'analysis.errors'
-        self.server.notification(event, callback=callback)
+        return self.server.notification(event, callback=callback, files=files)
 
     def on_flush_results(self, *, callback):
         """Reports that any analysis results that were previously associated
@@ -493,11 +1821,13 @@ class AnalysisDomain:
 
         :param files: The files that are no longer being analyzed.
         :type files: [FilePath]
+
+        :returns: A subscription that can be cancelled.
         """
         event = 'analysis.flushResults'
-        self.server.notification(event, callback=callback)
+        return self.server.notification(event, callback=callback)
 
-    def on_folding(self, *, callback):
+    def on_folding(self, *, callback, files=None):
         """Reports the folding regions associated with a given file. Folding
         regions can be nested, but will not be overlapping. Nesting occurs
         when a foldable element, such as a method, is nested inside another
@@ -507,6 +1837,9 @@ class AnalysisDomain:
         subscribe by including the value "FOLDING" in the list of services
         passed in an analysis.setSubscriptions request.
 
+        :param files: If given, only notifications about these files are
+            delivered to the callback.
+
         Callback arguments:
 
         :param file: The file containing the folding regions.
@@ -514,17 +1847,22 @@ class AnalysisDomain:
 
         :param regions: The folding regions contained in the file.
         :type regions: [FoldingRegion]
+
+        :returns: A subscription that can be cancelled.
         """
         event = 'analysis.folding'
-        self.server.notification(event, callback=callback)
+        return self.server.notification(event, callback=callback, files=files)
 
-    def on_highlights(self, *, callback):
+    def on_highlights(self, *, callback, files=None):
         """Reports the highlight regions associated with a given file.
 
         This notification is not subscribed to by default. Clients can
         subscribe by including the value "HIGHLIGHTS" in the list of services
         passed in an analysis.setSubscriptions request.
 
+        :param files: If given, only notifications about these files are
+            delivered to the callback.
+
         Callback arguments:
 
         :param file: The file containing the highlight regions.
@@ -537,11 +1875,13 @@ class AnalysisDomain:
             there is more than one meaning associated with a particular
             region.
         :type regions: [HighlightRegion]
+
+        :returns: A subscription that can be cancelled.
         """
         event = 'analysis.highlights'
-        self.server.notification(event, callback=callback)
+        return self.server.notification(event, callback=callback, files=files)
 
-    def on_invalidate(self, *, callback):
+    def on_invalidate(self, *, callback, files=None):
         """Reports that the navigation information associated with a region of
         a single file has become invalid and should be re-requested.
 
@@ -549,6 +1889,9 @@ class AnalysisDomain:
         subscribe by including the value "INVALIDATE" in the list of services
         passed in an analysis.setSubscriptions request.
 
+        :param files: If given, only notifications about these files are
+            delivered to the callback.
+
         Callback arguments:
 
         :param file: The file whose information has been invalidated.
@@ -564,17 +1907,22 @@ class AnalysisDomain:
             that follows the invalidated region in order to update it so that
             it doesn't need to be re-requested.
         :type delta: int
+
+        :returns: A subscription that can be cancelled.
         """
         event = 'analysis.invalidate'
-        self.server.notification(event, callback=callback)
+        return self.server.notification(event, callback=callback, files=files)
 
-    def on_navigation(self, *, callback):
+    def on_navigation(self, *, callback, files=None):
         """Reports the navigation targets associated with a given file.
 
         This notification is not subscribed to by default. Clients can
         subscribe by including the value "NAVIGATION" in the list of services
         passed in an analysis.setSubscriptions request.
 
+        :param files: If given, only notifications about these files are
+            delivered to the callback.
+
         Callback arguments:
 
         :param file: The file containing the navigation regions.
@@ -598,11 +1946,13 @@ class AnalysisDomain:
             the file. They are referenced by NavigationTarget s by their index
             in this array.
         :type files: [FilePath]
+
+        :returns: A subscription that can be cancelled.
         """
         event = 'analysis.navigation'
-        self.server.notification(event, callback=callback)
+        return self.server.notification(event, callback=callback, files=files)
 
-    def on_occurrences(self, *, callback):
+    def on_occurrences(self, *, callback, files=None):
         """Reports the occurrences of references to elements within a single
         file.
 
@@ -610,6 +1960,9 @@ class AnalysisDomain:
         subscribe by including the value "OCCURRENCES" in the list of services
         passed in an analysis.setSubscriptions request.
 
+        :param files: If given, only notifications about these files are
+            delivered to the callback.
+
         Callback arguments:
 
         :param file: The file in which the references occur.
@@ -618,17 +1971,22 @@ class AnalysisDomain:
         :param occurrences: The occurrences of references to elements within
             the file.
         :type occurrences: [Occurrences]
+
+        :returns: A subscription that can be cancelled.
         """
         event = 'analysis.occurrences'
-        self.server.notification(event, callback=callback)
+        return self.server.notification(event, callback=callback, files=files)
 
-    def on_outline(self, *, callback):
+    def on_outline(self, *, callback, files=None):
         """Reports the outline associated with a single file.
 
         This notification is not subscribed to by default. Clients can
         subscribe by including the value "OUTLINE" in the list of services
         passed in an analysis.setSubscriptions request.
 
+        :param files: If given, only notifications about these files are
+            delivered to the callback.
+
         Callback arguments:
 
         :param file: The file with which the outline is associated.
@@ -636,17 +1994,22 @@ class AnalysisDomain:
 
         :param outline: The outline associated with the file.
         :type outline: Outline
+
+        :returns: A subscription that can be cancelled.
         """
         event = 'analysis.outline'
-        self.server.notification(event, callback=callback)
+        return self.server.notification(event, callback=callback, files=files)
 
-    def on_overrides(self, *, callback):
+    def on_overrides(self, *, callback, files=None):
         """Reports the overridding members in a file.
 
         This notification is not subscribed to by default. Clients can
         subscribe by including the value "OVERRIDES" in the list of services
         passed in an analysis.setSubscriptions request.
 
+        :param files: If given, only notifications about these files are
+            delivered to the callback.
+
         Callback arguments:
 
         :param file: The file with which the overrides are associated.
@@ -654,9 +2017,11 @@ class AnalysisDomain:
 
         :param overrides: The overrides associated with the file.
         :type overrides: [Override]
+
+        :returns: A subscription that can be cancelled.
         """
         event = 'analysis.overrides'
-        self.server.notification(event, callback=callback)
+        return self.server.notification(event, callback=callback, files=files)
 
 
 @DartAnalysisServer.register_domain('completion')
@@ -665,7 +2030,8 @@ class CompletionDomain:
     code completion suggestions.
     """
 
-    def get_suggestions(self, file, offset, *, callback=None, errback=None):
+    def get_suggestions(self, file, offset, *, callback=None, errback=None,
+                        **kwargs):
         """Request that completion suggestions for the given offset in the
         given file be returned.
 
@@ -682,10 +2048,13 @@ class CompletionDomain:
         :param id: The identifier used to associate results with this
             completion request.
         :type id: CompletionId
+
+        :returns: A future resolved with a dict of the callback arguments.
         """
         method = 'completion.getSuggestions'
         params = {'file': file, 'offset': offset}
-        self.server.request(method, params, callback=callback, errback=errback)
+        return self.server.request(method, params, callback=callback,
+                                   errback=errback, **kwargs)
 
     def on_results(self, *, callback):
         """Reports the completion suggestions that should be presented to the
@@ -721,9 +2090,11 @@ class CompletionDomain:
         :param is_last: True if this is that last set of results that will be
             returned for the indicated completion.
         :type is_last: bool
+
+        :returns: A subscription that can be cancelled.
         """
         event = 'completion.results'
-        self.server.notification(event, callback=callback)
+        return self.server.notification(event, callback=callback)
 
 
 @DartAnalysisServer.register_domain('search')
@@ -733,7 +2104,7 @@ class SearchDomain:
     """
 
     def find_element_references(self, file, offset, include_potential, *,
-                                callback=None, errback=None):
+                                callback=None, errback=None, **kwargs):
         """Perform a search for references to the element defined or
         referenced at the given offset in the given file.
 
@@ -765,13 +2136,17 @@ class SearchDomain:
             element was found at the given location, this field will be
             absent.
         :type element: Element
+
+        :returns: A future resolved with a dict of the callback arguments.
         """
         method = 'search.findElementReferences'
         params = {'file': file, 'includePotential': include_potential,
                   'offset': offset}
-        self.server.request(method, params, callback=callback, errback=errback)
+        return self.server.request(method, params, callback=callback,
+                                   errback=errback, **kwargs)
 
-    def find_member_declarations(self, name, *, callback=None, errback=None):
+    def find_member_declarations(self, name, *, callback=None, errback=None,
+                                 **kwargs):
         """Perform a search for declarations of members whose name is equal to
         the given name.
 
@@ -786,12 +2161,16 @@ class SearchDomain:
         :param id: The identifier used to associate results with this search
             request.
         :type id: SearchId
+
+        :returns: A future resolved with a dict of the callback arguments.
         """
         method = 'search.findMemberDeclarations'
         params = {'name': name}
-        self.server.request(method, params, callback=callback, errback=errback)
+        return self.server.request(method, params, callback=callback,
+                                   errback=errback, **kwargs)
 
-    def find_member_references(self, name, *, callback=None, errback=None):
+    def find_member_references(self, name, *, callback=None, errback=None,
+                               **kwargs):
         """Perform a search for references to members whose name is equal to
         the given name. This search does not check to see that there is a
         member defined with the given name, so it is able to find references
@@ -808,13 +2187,16 @@ class SearchDomain:
         :param id: The identifier used to associate results with this search
             request.
         :type id: SearchId
+
+        :returns: A future resolved with a dict of the callback arguments.
         """
         method = 'search.findMemberReferences'
         params = {'name': name}
-        self.server.request(method, params, callback=callback, errback=errback)
+        return self.server.request(method, params, callback=callback,
+                                   errback=errback, **kwargs)
 
     def find_top_level_declarations(self, pattern, *, callback=None,
-                                    errback=None):
+                                    errback=None, **kwargs):
         """Perform a search for declarations of top-level elements (classes,
         typedefs, getters, setters, functions and fields) whose name matches
         the given pattern.
@@ -831,12 +2213,16 @@ class SearchDomain:
         :param id: The identifier used to associate results with this search
             request.
         :type id: SearchId
+
+        :returns: A future resolved with a dict of the callback arguments.
         """
         method = 'search.findTopLevelDeclarations'
         params = {'pattern': pattern}
-        self.server.request(method, params, callback=callback, errback=errback)
+        return self.server.request(method, params, callback=callback,
+                                   errback=errback, **kwargs)
 
-    def get_type_hierarchy(self, file, offset, *, callback=None, errback=None):
+    def get_type_hierarchy(self, file, offset, *, callback=None, errback=None,
+                           **kwargs):
         """Return the type hierarchy of the class declared or referenced at
         the given location.
 
@@ -858,10 +2244,13 @@ class SearchDomain:
             offset does not represent a type, or if the file has not been
             sufficiently analyzed to allow a type hierarchy to be produced.
         :type hierarchy_items: [TypeHierarchyItem]
+
+        :returns: A future resolved with a dict of the callback arguments.
         """
         method = 'search.getTypeHierarchy'
         params = {'file': file, 'offset': offset}
-        self.server.request(method, params, callback=callback, errback=errback)
+        return self.server.request(method, params, callback=callback,
+                                   errback=errback, **kwargs)
 
     def on_results(self, *, callback):
         """Reports some or all of the results of performing a requested
@@ -880,9 +2269,11 @@ class SearchDomain:
         :param is_last: True if this is that last set of results that will be
             returned for the indicated search.
         :type is_last: bool
+
+        :returns: A subscription that can be cancelled.
         """
         event = 'search.results'
-        self.server.notification(event, callback=callback)
+        return self.server.notification(event, callback=callback)
 
 
 @DartAnalysisServer.register_domain('edit')
@@ -892,7 +2283,7 @@ class EditDomain:
     """
 
     def format(self, file, selection_offset, selection_length, line_length, *,
-               callback=None, errback=None):
+               callback=None, errback=None, **kwargs):
         """Format the contents of a single file. The currently selected region
         of text is passed in so that the selection can be preserved across the
         formatting operation. The updated selection will be as close to
@@ -935,14 +2326,18 @@ class EditDomain:
         :param selection_length: The length of the selection after formatting
             the code.
         :type selection_length: int
+
+        :returns: A future resolved with a dict of the callback arguments.
         """
         method = 'edit.format'
         params = {'file': file, 'lineLength': line_length,
                   'selectionLength': selection_length,
                   'selectionOffset': selection_offset}
-        self.server.request(method, params, callback=callback, errback=errback)
+        return self.server.request(method, params, callback=callback,
+                                   errback=errback, **kwargs)
 
-    def get_assists(self, file, offset, length, *, callback=None, errback=None):
+    def get_assists(self, file, offset, length, *, callback=None, errback=None,
+                    **kwargs):
         """Return the set of assists that are available at the given location.
         An assist is distinguished from a refactoring primarily by the fact
         that it affects a single file and does not require user input in order
@@ -964,13 +2359,16 @@ class EditDomain:
 
         :param assists: The assists that are available at the given location.
         :type assists: [SourceChange]
+
+        :returns: A future resolved with a dict of the callback arguments.
         """
         method = 'edit.getAssists'
         params = {'file': file, 'length': length, 'offset': offset}
-        self.server.request(method, params, callback=callback, errback=errback)
+        return self.server.request(method, params, callback=callback,
+                                   errback=errback, **kwargs)
 
-    def get_available_refactorings(self, file, offset, length, *, callback=None,
-                                   errback=None):
+    def get_available_refactorings(self, file, offset, length, *,
+                                   callback=None, errback=None, **kwargs):
         """Get a list of the kinds of refactorings that are valid for the
         given selection in the given file.
 
@@ -991,12 +2389,16 @@ class EditDomain:
         :param kinds: The kinds of refactorings that are valid for the given
             selection.
         :type kinds: [RefactoringKind]
+
+        :returns: A future resolved with a dict of the callback arguments.
         """
         method = 'edit.getAvailableRefactorings'
         params = {'file': file, 'length': length, 'offset': offset}
-        self.server.request(method, params, callback=callback, errback=errback)
+        return self.server.request(method, params, callback=callback,
+                                   errback=errback, **kwargs)
 
-    def get_fixes(self, file, offset, *, callback=None, errback=None):
+    def get_fixes(self, file, offset, *, callback=None, errback=None,
+                  **kwargs):
         """Return the set of fixes that are available for the errors at a
         given offset in a given file.
 
@@ -1013,13 +2415,16 @@ class EditDomain:
         :param fixes: The fixes that are available for the errors at the given
             offset.
         :type fixes: [AnalysisErrorFixes]
+
+        :returns: A future resolved with a dict of the callback arguments.
         """
         method = 'edit.getFixes'
         params = {'file': file, 'offset': offset}
-        self.server.request(method, params, callback=callback, errback=errback)
+        return self.server.request(method, params, callback=callback,
+                                   errback=errback, **kwargs)
 
     def get_refactoring(self, kind, file, offset, length, validate_only,
-                        options, *, callback=None, errback=None):
+                        options, *, callback=None, errback=None, **kwargs):
         """Get the changes required to perform a refactoring.
 
         If another refactoring request is received during the processing of
@@ -1091,14 +2496,17 @@ class EditDomain:
             change field is omitted or if there are no potential edits for the
             refactoring.
         :type potential_edits: [str]
+
+        :returns: A future resolved with a dict of the callback arguments.
         """
         method = 'edit.getRefactoring'
         params = {'file': file, 'kind': kind, 'length': length,
                   'offset': offset, 'options': options,
                   'validateOnly': validate_only}
-        self.server.request(method, params, callback=callback, errback=errback)
+        return self.server.request(method, params, callback=callback,
+                                   errback=errback, **kwargs)
 
-    def sort_members(self, file, *, callback=None, errback=None):
+    def sort_members(self, file, *, callback=None, errback=None, **kwargs):
         """Sort all of the directives, unit and class members of the given
         Dart file.
 
@@ -1117,12 +2525,16 @@ class EditDomain:
         :param edit: The file edit that is to be applied to the given file to
             effect the sorting.
         :type edit: SourceFileEdit
+
+        :returns: A future resolved with a dict of the callback arguments.
         """
         method = 'edit.sortMembers'
         params = {'file': file}
-        self.server.request(method, params, callback=callback, errback=errback)
+        return self.server.request(method, params, callback=callback,
+                                   errback=errback, **kwargs)
 
-    def organize_directives(self, file, *, callback=None, errback=None):
+    def organize_directives(self, file, *, callback=None, errback=None,
+                            **kwargs):
         """Organizes all of the directives - removes unused imports and sorts
         directives of the given Dart file according to the Dart Style Guide .
 
@@ -1143,10 +2555,13 @@ class EditDomain:
         :param edit: The file edit that is to be applied to the given file to
             effect the organizing.
         :type edit: SourceFileEdit
+
+        :returns: A future resolved with a dict of the callback arguments.
         """
         method = 'edit.organizeDirectives'
         params = {'file': file}
-        self.server.request(method, params, callback=callback, errback=errback)
+        return self.server.request(method, params, callback=callback,
+                                   errback=errback, **kwargs)
 
 
 @DartAnalysisServer.register_domain('execution')
@@ -1155,7 +2570,8 @@ class ExecutionDomain:
     execution or debugging experience.
     """
 
-    def create_context(self, context_root, *, callback=None, errback=None):
+    def create_context(self, context_root, *, callback=None, errback=None,
+                       **kwargs):
         """Create an execution context for the executable file with the given
         path. The context that is created will persist until
         execution.deleteContext is used to delete it. Clients, therefore, are
@@ -1170,12 +2586,15 @@ class ExecutionDomain:
         :param id: The identifier used to refer to the execution context that
             was created.
         :type id: ExecutionContextId
+
+        :returns: A future resolved with a dict of the callback arguments.
         """
         method = 'execution.createContext'
         params = {'contextRoot': context_root}
-        self.server.request(method, params, callback=callback, errback=errback)
+        return self.server.request(method, params, callback=callback,
+                                   errback=errback, **kwargs)
 
-    def delete_context(self, id, *, callback=None, errback=None):
+    def delete_context(self, id, *, callback=None, errback=None, **kwargs):
         """Delete the execution context with the given identifier. The context
         id is no longer valid after this command. The server is allowed to re-
         use ids when they are no longer valid.
@@ -1183,12 +2602,15 @@ class ExecutionDomain:
         :param id: The identifier of the execution context that is to be
             deleted.
         :type id: ExecutionContextId
+
+        :returns: A future resolved with a dict of the callback arguments.
         """
         method = 'execution.deleteContext'
         params = {'id': id}
-        self.server.request(method, params, callback=callback, errback=errback)
+        return self.server.request(method, params, callback=callback,
+                                   errback=errback, **kwargs)
 
-    def map_uri(self, id, file, uri, *, callback=None, errback=None):
+    def map_uri(self, id, file, uri, *, callback=None, errback=None, **kwargs):
         """Map a URI from the execution context to the file that it
         corresponds to, or map a file to the URI that it corresponds to in the
         execution context.
@@ -1231,12 +2653,16 @@ class ExecutionDomain:
         :param uri: The URI to which the file path was mapped. This field is
             omitted if the file field was not given in the request.
         :type uri: str
+
+        :returns: A future resolved with a dict of the callback arguments.
         """
         method = 'execution.mapUri'
         params = {'file': file, 'id': id, 'uri': uri}
-        self.server.request(method, params, callback=callback, errback=errback)
+        return self.server.request(method, params, callback=callback,
+                                   errback=errback, **kwargs)
 
-    def set_subscriptions(self, subscriptions, *, callback=None, errback=None):
+    def set_subscriptions(self, subscriptions, *, callback=None, errback=None,
+                          **kwargs):
         """Subscribe for services. All previous subscriptions are replaced by
         the given set of services.
 
@@ -1246,18 +2672,24 @@ class ExecutionDomain:
 
         :param subscriptions: A list of the services being subscribed to.
         :type subscriptions: [ExecutionService]
+
+        :returns: A future resolved with a dict of the callback arguments.
         """
         method = 'execution.setSubscriptions'
         params = {'subscriptions': subscriptions}
-        self.server.request(method, params, callback=callback, errback=errback)
+        return self.server.request(method, params, callback=callback,
+                                   errback=errback, **kwargs)
 
-    def on_launch_data(self, *, callback):
+    def on_launch_data(self, *, callback, files=None):
         """Reports information needed to allow a single file to be launched.
 
         This notification is not subscribed to by default. Clients can
         subscribe by including the value "LAUNCH_DATA" in the list of services
         passed in an execution.setSubscriptions request.
 
+        :param files: If given, only notifications about these files are
+            delivered to the callback.
+
         Callback arguments:
 
         :param file: The file for which launch data is being provided. This
@@ -1272,6 +2704,255 @@ class ExecutionDomain:
             by the file. This field is omitted if the file is not an HTML
             file.
         :type referenced_files: [FilePath]
+
+        :returns: A subscription that can be cancelled.
         """
         event = 'execution.launchData'
-        self.server.notification(event, callback=callback)
+        return self.server.notification(event, callback=callback, files=files)
+
+
+DartAnalysisServer.result_types = {
+    'analysis.getErrors': {
+        'errors': '[AnalysisError]',
+    },
+    'analysis.getHover': {
+        'hovers': '[HoverInformation]',
+    },
+    'analysis.getNavigation': {
+        'targets': '[NavigationTarget]',
+        'regions': '[NavigationRegion]',
+    },
+    'search.findElementReferences': {
+        'element': 'Element',
+    },
+    'search.getTypeHierarchy': {
+        'hierarchyItems': '[TypeHierarchyItem]',
+    },
+    'edit.format': {
+        'edits': '[SourceEdit]',
+    },
+    'edit.getAssists': {
+        'assists': '[SourceChange]',
+    },
+    'edit.getFixes': {
+        'fixes': '[AnalysisErrorFixes]',
+    },
+    'edit.getRefactoring': {
+        'initialProblems': '[RefactoringProblem]',
+        'optionsProblems': '[RefactoringProblem]',
+        'finalProblems': '[RefactoringProblem]',
+        'change': 'SourceChange',
+    },
+    'edit.sortMembers': {
+        'edit': 'SourceFileEdit',
+    },
+    'edit.organizeDirectives': {
+        'edit': 'SourceFileEdit',
+    },
+}
+
+
+DartAnalysisServer.event_types = {
+    'server.status': {
+        'analysis': 'AnalysisStatus',
+        'pub': 'PubStatus',
+    },
+    'analysis.errors': {
+        'errors': '[AnalysisError]',
+    },
+    'analysis.folding': {
+        'regions': '[FoldingRegion]',
+    },
+    'analysis.highlights': {
+        'regions': '[HighlightRegion]',
+    },
+    'analysis.navigation': {
+        'regions': '[NavigationRegion]',
+        'targets': '[NavigationTarget]',
+    },
+    'analysis.occurrences': {
+        'occurrences': '[Occurrences]',
+    },
+    'analysis.outline': {
+        'outline': 'Outline',
+    },
+    'analysis.overrides': {
+        'overrides': '[Override]',
+    },
+    'completion.results': {
+        'results': '[CompletionSuggestion]',
+    },
+    'search.results': {
+        'results': '[SearchResult]',
+    },
+}
+
+
+DartAnalysisServer.result_fields = {
+    'server.getVersion': {
+        'version': 'str',
+    },
+    'server.shutdown': {},
+    'server.setSubscriptions': {},
+    'analysis.getErrors': {
+        'errors': '[AnalysisError]',
+    },
+    'analysis.getHover': {
+        'hovers': '[HoverInformation]',
+    },
+    'analysis.getLibraryDependencies': {
+        'libraries': '[FilePath]',
+        'packageMap': '{str: {str: [FilePath]}}',
+    },
+    'analysis.getNavigation': {
+        'files': '[FilePath]',
+        'targets': '[NavigationTarget]',
+        'regions': '[NavigationRegion]',
+    },
+    'analysis.reanalyze': {},
+    'analysis.setAnalysisRoots': {},
+    'analysis.setGeneralSubscriptions': {},
+    'analysis.setPriorityFiles': {},
+    'analysis.setSubscriptions': {},
+    'analysis.updateContent': {},
+    'analysis.updateOptions': {},
+    'completion.getSuggestions': {
+        'id': 'CompletionId',
+    },
+    'search.findElementReferences': {
+        'id': 'SearchId',
+        'element': 'Element',
+    },
+    'search.findMemberDeclarations': {
+        'id': 'SearchId',
+    },
+    'search.findMemberReferences': {
+        'id': 'SearchId',
+    },
+    'search.findTopLevelDeclarations': {
+        'id': 'SearchId',
+    },
+    'search.getTypeHierarchy': {
+        'hierarchyItems': '[TypeHierarchyItem]',
+    },
+    'edit.format': {
+        'edits': '[SourceEdit]',
+        'selectionOffset': 'int',
+        'selectionLength': 'int',
+    },
+    'edit.getAssists': {
+        'assists': '[SourceChange]',
+    },
+    'edit.getAvailableRefactorings': {
+        'kinds': '[RefactoringKind]',
+    },
+    'edit.getFixes': {
+        'fixes': '[AnalysisErrorFixes]',
+    },
+    'edit.getRefactoring': {
+        'initialProblems': '[RefactoringProblem]',
+        'optionsProblems': '[RefactoringProblem]',
+        'finalProblems': '[RefactoringProblem]',
+        'feedback': 'RefactoringFeedback',
+        'change': 'SourceChange',
+        'potentialEdits': '[str]',
+    },
+    'edit.sortMembers': {
+        'edit': 'SourceFileEdit',
+    },
+    'edit.organizeDirectives': {
+        'edit': 'SourceFileEdit',
+    },
+    'execution.createContext': {
+        'id': 'ExecutionContextId',
+    },
+    'execution.deleteContext': {},
+    'execution.mapUri': {
+        'file': 'FilePath',
+        'uri': 'str',
+    },
+    'execution.setSubscriptions': {},
+}
+
+
+DartAnalysisServer.event_fields = {
+    'server.connected': {
+        'version': 'str',
+    },
+    'server.error': {
+        'isFatal': 'bool',
+        'message': 'str',
+        'stackTrace': 'str',
+    },
+    'server.status': {
+        'analysis': 'AnalysisStatus',
+        'pub': 'PubStatus',
+    },
+    'analysis.analyzedFiles': {
+        'directories': '[FilePath]',
+    },
+    'analysis.errors': {
+        'file': 'FilePath',
+        'errors': '[AnalysisError]',
+    },
+    'analysis.flushResults': {
+        'files': '[FilePath]',
+    },
+    'analysis.folding': {
+        'file': 'FilePath',
+        'regions': '[FoldingRegion]',
+    },
+    'analysis.highlights': {
+        'file': 'FilePath',
+        'regions': '[HighlightRegion]',
+    },
+    'analysis.invalidate': {
+        'file': 'FilePath',
+        'offset': 'int',
+        'length': 'int',
+        'delta': 'int',
+    },
+    'analysis.navigation': {
+        'file': 'FilePath',
+        'regions': '[NavigationRegion]',
+        'targets': '[NavigationTarget]',
+        'files': '[FilePath]',
+    },
+    'analysis.occurrences': {
+        'file': 'FilePath',
+        'occurrences': '[Occurrences]',
+    },
+    'analysis.outline': {
+        'file': 'FilePath',
+        'outline': 'Outline',
+    },
+    'analysis.overrides': {
+        'file': 'FilePath',
+        'overrides': '[Override]',
+    },
+    'completion.results': {
+        'id': 'CompletionId',
+        'replacementOffset': 'int',
+        'replacementLength': 'int',
+        'results': '[CompletionSuggestion]',
+        'isLast': 'bool',
+    },
+    'search.results': {
+        'id': 'SearchId',
+        'results': '[SearchResult]',
+        'isLast': 'bool',
+    },
+    'execution.launchData': {
+        'file': 'FilePath',
+        'kind': 'ExecutableKind',
+        'referencedFiles': '[FilePath]',
+    },
+}
+
+
+DartAnalysisServer.type_aliases = {
+    'CompletionId': 'str',
+    'ExecutionContextId': 'str',
+    'FilePath': 'str',
+    'SearchId': 'str',
+}
@@ -0,0 +1,301 @@
+"""Batch analysis of whole projects, for continuous integration.
+
+Run with ``python -m das``::
+
+    python -m das --sdk $DART_SDK_PATH --processes 4 --format sarif \\
+        packages/app packages/core > report.sarif
+
+The roots are analyzed by one or more analysis servers. Errors are written
+to the standard output as soon as the servers report them, so they are
+never all held in memory, and the program exits once every server reports
+that analysis is idle. The exit status is 1 when any error has at least the
+severity given with ``--fail-on``, and 2 when analysis could not complete.
+
+The analysis server sends the complete errors of a file again when they
+change. In that case the file is reported again, and its last report is the
+one that counts, also for the exit status. A file whose errors are all
+fixed gets a record without error: a JSON object with ``"errors": 0``, or
+a SARIF result of the ``pass`` kind.
+"""
+import argparse
+import functools
+import json
+import os
+import pathlib
+import sys
+import zlib
+
+from das.api import AnalysisErrorSeverity, DartAnalysisServer
+from das.loop import EventLoop
+from das.pool import DartAnalysisServerPool
+from das.server import DAS, DART, ServerExitedError
+
+
+SEVERITIES = [AnalysisErrorSeverity.INFO, AnalysisErrorSeverity.WARNING,
+              AnalysisErrorSeverity.ERROR]
+
+SARIF_LEVELS = {
+    AnalysisErrorSeverity.INFO: 'note',
+    AnalysisErrorSeverity.WARNING: 'warning',
+    AnalysisErrorSeverity.ERROR: 'error',
+}
+
+
+class JsonLinesWriter:
+    """Write every error as a JSON object on its own line."""
+
+    def __init__(self, output):
+        self._output = output
+
+    def write(self, file, error):
+        location = error.location
+        record = {
+            'file': file,
+            'severity': error.severity,
+            'type': error.type,
+            'message': error.message,
+            'correction': error.correction,
+            'offset': location.offset,
+            'length': location.length,
+            'line': location.start_line,
+            'column': location.start_column,
+        }
+        self._output.write(json.dumps(record) + '\n')
+        self._output.flush()
+
+    def clean(self, file):
+        self._output.write(json.dumps({'file': file, 'errors': 0}) + '\n')
+        self._output.flush()
+
+    def close(self):
+        pass
+
+
+class SarifWriter:
+    """Write the errors as a SARIF 2.1.0 log.
+
+    Results are written as they come, inside the ``results`` array of a
+    single run, and the log is completed by :meth:`close`.
+    """
+
+    def __init__(self, output):
+        self._output = output
+        self._results = 0
+        log = {
+            'version': '2.1.0',
+            '$schema': 'https://json.schemastore.org/sarif-2.1.0.json',
+            'runs': [{
+                'tool': {'driver': {'name': 'das'}},
+                'results': [],
+            }],
+        }
+        # Everything up to the opening of the results array.
+        header = json.dumps(log)
+        self._footer = header[header.index('[]') + 1:]
+        self._output.write(header[:header.index('[]') + 1])
+
+    def write(self, file, error):
+        location = error.location
+        result = {
+            'ruleId': error.type,
+            'level': SARIF_LEVELS.get(error.severity, 'none'),
+            'message': {'text': error.message},
+            'locations': [{
+                'physicalLocation': {
+                    'artifactLocation': {
+                        'uri': pathlib.Path(file).as_uri(),
+                    },
+                    'region': {
+                        'startLine': location.start_line,
+                        'startColumn': location.start_column,
+                        'charOffset': location.offset,
+                        'charLength': location.length,
+                    },
+                },
+            }],
+        }
+        self._write_result(result)
+
+    def clean(self, file):
+        self._write_result({
+            'kind': 'pass',
+            'level': 'none',
+            'message': {'text': 'No errors'},
+            'locations': [{
+                'physicalLocation': {
+                    'artifactLocation': {'uri': pathlib.Path(file).as_uri()},
+                },
+            }],
+        })
+
+    def _write_result(self, result):
+        if self._results:
+            self._output.write(',')
+        self._output.write('\n' + json.dumps(result))
+        self._output.flush()
+        self._results += 1
+
+    def close(self):
+        self._output.write('\n' + self._footer + '\n')
+        self._output.flush()
+
+
+WRITERS = {
+    'jsonl': JsonLinesWriter,
+    'sarif': SarifWriter,
+}
+
+
+class BatchAnalysis:
+    """Analyze a set of roots and report their errors to a writer.
+
+    ``server`` is a :class:`DartAnalysisServer` or a
+    :class:`DartAnalysisServerPool` running on ``loop``, which must provide
+    ``run_until_complete`` as :class:`das.loop.EventLoop` does.
+    """
+
+    def __init__(self, server, loop, writer, fail_on='ERROR'):
+        self._server = server
+        self._loop = loop
+        self._writer = writer
+        self._fail_severities = set(
+            SEVERITIES[SEVERITIES.index(fail_on):]) if fail_on else set()
+        self._reported = {}
+        self._error_counts = {}
+        self._failing = set()
+        self._analyzing = {}
+        self.files = 0
+        self.errors = 0
+
+    @property
+    def failed(self):
+        """Whether the last report of any file has a failing error."""
+        return bool(self._failing)
+
+    def _servers(self):
+        if isinstance(self._server, DartAnalysisServerPool):
+            return self._server.servers
+        return [self._server]
+
+    def run(self, roots, timeout=None):
+        """Analyze the roots and return the exit status."""
+        servers = self._servers()
+        done = servers[0]._create_future()
+        for index, server in enumerate(servers):
+            # The status of each server is followed on its own, as the pool
+            # does not tell which server a notification comes from.
+            server.server.on_status(
+                callback=functools.partial(self._on_status, index, done))
+            server.add_exit_listener(functools.partial(self._on_exit, done))
+            self._analyzing[index] = None
+        self._server.analysis.on_errors(callback=self._on_errors)
+
+        self._server.start()
+        self._server.server.set_subscriptions(['STATUS'])
+        roots_set = self._server.analysis.set_analysis_roots(roots, [], {})
+        roots_set.add_done_callback(functools.partial(self._on_roots, done))
+        try:
+            self._loop.run_until_complete(done, timeout)
+        finally:
+            self._writer.close()
+            self._server.stop()
+
+        if self.failed:
+            return 1
+        return 0
+
+    def _on_roots(self, done, future):
+        error = future.exception()
+        if error is not None and not done.done():
+            done.set_exception(error)
+
+    def _on_exit(self, done, server):
+        if not done.done():
+            done.set_exception(ServerExitedError('analysis'))
+
+    def _on_status(self, index, done, event, params):
+        status = params.get('analysis')
+        if status is None:
+            return
+        # Servers that have not started analyzing yet are not idle, even
+        # when they say so.
+        if status.is_analyzing:
+            self._analyzing[index] = True
+        elif self._analyzing[index]:
+            self._analyzing[index] = False
+        if not any(analyzing is not False
+                   for analyzing in self._analyzing.values()):
+            if not done.done():
+                done.set_result(None)
+
+    def _on_errors(self, event, params):
+        file = params['file']
+        errors = params['errors']
+        # Only a checksum is kept by file, to skip reports that did not
+        # change without holding the errors.
+        checksum = zlib.crc32(repr(errors).encode('utf-8'))
+        if self._reported.get(file) == checksum:
+            return
+        if file not in self._reported:
+            self.files += 1
+        self._reported[file] = checksum
+        # Counts only hold the errors of the last report of each file.
+        previous = self._error_counts.get(file, 0)
+        self.errors += len(errors) - previous
+        self._error_counts[file] = len(errors)
+        self._failing.discard(file)
+        if previous and not errors:
+            self._writer.clean(file)
+        for error in errors:
+            self._writer.write(file, error)
+            if error.severity in self._fail_severities:
+                self._failing.add(file)
+
+
+def sdk_paths(sdk):
+    return (os.path.join(sdk, 'bin', 'dart'),
+            os.path.join(sdk, 'bin', 'snapshots',
+                         'analysis_server.dart.snapshot'))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m das',
+        description='Analyze Dart projects and report their errors.')
+    parser.add_argument('roots', nargs='+', help='directories to analyze')
+    parser.add_argument('--sdk', default=os.environ.get('DART_SDK_PATH'),
+                        help='Dart SDK directory, $DART_SDK_PATH by default')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='number of analysis servers to run')
+    parser.add_argument('--format', choices=sorted(WRITERS),
+                        default='jsonl', help='output format')
+    parser.add_argument('--fail-on', choices=SEVERITIES + ['none'],
+                        default='ERROR',
+                        help='lowest severity making the exit status 1')
+    parser.add_argument('--timeout', type=float,
+                        help='seconds to wait for analysis to complete')
+    args = parser.parse_args(argv)
+
+    dart_path, das_path = DART, DAS
+    if args.sdk:
+        dart_path, das_path = sdk_paths(args.sdk)
+    roots = [os.path.abspath(root) for root in args.roots]
+
+    loop = EventLoop()
+    # Every server needs a root of its own, or it never starts analyzing.
+    processes = max(1, min(args.processes, len(roots)))
+    if processes > 1:
+        server = DartAnalysisServerPool(dart_path, das_path, loop,
+                                        size=processes,
+                                        health_check_interval=0)
+    else:
+        server = DartAnalysisServer(dart_path, das_path, loop)
+
+    writer = WRITERS[args.format](sys.stdout)
+    fail_on = None if args.fail_on == 'none' else args.fail_on
+    analysis = BatchAnalysis(server, loop, writer, fail_on)
+    try:
+        return analysis.run(roots, args.timeout)
+    except Exception as error:
+        print('Analysis failed: {}'.format(error), file=sys.stderr)
+        return 2
@@ -0,0 +1,144 @@
+import collections
+
+from das.api import DartAnalysisServer
+
+
+# Requests answered from the cache. Their responses only depend on the
+# content of the file they are about, as far as the cache is concerned.
+CACHED_METHODS = {
+    'analysis.getHover',
+    'analysis.getNavigation',
+    'edit.getAssists',
+    'edit.getAvailableRefactorings',
+}
+
+# Requests after which no cached response can be trusted.
+RESET_METHODS = {
+    'analysis.reanalyze',
+    'analysis.setAnalysisRoots',
+    'analysis.updateOptions',
+}
+
+
+class ResponseCache:
+    """LRU cache of the responses to cursor driven requests.
+
+    Cached requests are answered without any round trip to the server while
+    the file they are about does not change. Each file has a content version
+    that is bumped when its content is updated through any
+    ``analysis.updateContent`` request and when the server sends
+    ``analysis.invalidate`` for it. Changing the analysis roots or options
+    drops all the cached responses.
+
+    The domains of the API are available on the cache as on the server, e.g.
+    ``cache.analysis.get_hover(file, offset)``. Requests that are not cached
+    go straight to the server. Cached results are shared between callers, so
+    they must not be modified.
+    """
+
+    def __init__(self, server, maxsize=1024):
+        self._server = server
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = collections.OrderedDict()
+        self._versions = collections.defaultdict(int)
+        self._epoch = 0
+
+        server.add_request_listener(self._on_request)
+        self._subscription = server.notification(
+            'analysis.invalidate', callback=self._on_invalidate)
+
+        for name, domain_class in DartAnalysisServer._domains.items():
+            domain = domain_class()
+            domain.server = self
+            setattr(self, name, domain)
+
+    def close(self):
+        """Stop tracking the server and drop all the entries."""
+        self._server.remove_request_listener(self._on_request)
+        self._subscription.cancel()
+        self.clear()
+
+    def clear(self):
+        self._entries.clear()
+        self._versions.clear()
+        self._epoch += 1
+
+    def version(self, file):
+        return self._versions[file]
+
+    def _on_request(self, method, params):
+        if method == 'analysis.updateContent':
+            for file in params['files']:
+                self._versions[file] += 1
+        elif method in RESET_METHODS:
+            self.clear()
+
+    def _on_invalidate(self, event, params):
+        self._versions[params.peek('file')] += 1
+
+    def _key(self, method, params):
+        file = params['file']
+        return (method, file, self._versions[file], self._epoch,
+                tuple(sorted(params.items())))
+
+    def _store(self, key, result):
+        self._entries[key] = result
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def request(self, method, params=None, *, callback=None, errback=None,
+                **kwargs):
+        """Send a request, or answer it from the cache.
+
+        Takes the same arguments as :meth:`DartAnalysisServer.request`.
+        """
+        if method not in CACHED_METHODS:
+            return self._server.request(method, params, callback=callback,
+                                        errback=errback, **kwargs)
+
+        key = self._key(method, params)
+        try:
+            result = self._entries[key]
+        except KeyError:
+            pass
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            future = self._server._create_future()
+            future.set_result(result)
+            if callback is not None:
+                self._server._dispatch(callback, method, **result)
+            return future
+
+        self.misses += 1
+
+        def on_result(method, **result):
+            # Responses to requests sent before a change are not stored, as
+            # they may be out of date.
+            if self._key(method, params) == key:
+                self._store(key, result)
+            if callback is not None:
+                callback(method, **result)
+
+        return self._server.request(method, params, callback=on_result,
+                                    errback=errback, **kwargs)
+
+    def notification(self, event, *, callback, files=None):
+        return self._server.notification(event, callback=callback,
+                                         files=files)
+
+    def info(self):
+        """Return the hit and miss statistics of the cache."""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hit_ratio': self.hits / lookups if lookups else None,
+        }
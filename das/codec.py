@@ -0,0 +1,82 @@
+"""JSON codecs for the wire protocol.
+
+A codec turns the bytes of a message into Python objects and back. The
+fastest backend installed is picked by default: orjson, then ujson, then the
+standard library json module.
+"""
+import json
+
+from das.spec import encode_object
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+class StdlibCodec:
+    name = 'json'
+
+    def loads(self, data):
+        return json.loads(data)
+
+    def dumps(self, obj):
+        return json.dumps(obj, default=encode_object).encode('utf-8')
+
+
+class OrjsonCodec:
+    name = 'orjson'
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError('orjson is not installed')
+        self.loads = orjson.loads
+
+    def dumps(self, obj):
+        return orjson.dumps(obj, default=encode_object)
+
+
+class UjsonCodec:
+    name = 'ujson'
+
+    def __init__(self):
+        if ujson is None:
+            raise ImportError('ujson is not installed')
+        self.loads = ujson.loads
+
+    def dumps(self, obj):
+        return ujson.dumps(obj, ensure_ascii=False,
+                           default=encode_object).encode('utf-8')
+
+
+# In order of preference.
+CODECS = {
+    'orjson': OrjsonCodec,
+    'ujson': UjsonCodec,
+    'json': StdlibCodec,
+}
+
+
+def available_codecs():
+    """Return the names of the codecs whose backend is installed."""
+    installed = {'orjson': orjson, 'ujson': ujson, 'json': json}
+    return [name for name in CODECS if installed[name] is not None]
+
+
+def get_codec(name=None):
+    """Return a codec instance.
+
+    If no name is given, the fastest codec available is returned.
+    """
+    if name is None:
+        name = available_codecs()[0]
+    try:
+        codec_class = CODECS[name]
+    except KeyError:
+        raise ValueError('Unknown codec: {}'.format(name))
+    return codec_class()
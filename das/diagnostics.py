@@ -0,0 +1,111 @@
+import bisect
+import collections
+import os
+
+
+def _error_field(error, name):
+    if isinstance(error, dict):
+        return error[name]
+    return getattr(error, name)
+
+
+class DiagnosticsStore:
+    """Errors of all the analyzed files, kept up to date in memory.
+
+    The store listens to ``analysis.errors``, which replaces the errors of a
+    file, and ``analysis.flushResults``, which drops them. Errors can then be
+    read without any request to the server. Counters by severity and by error
+    type are updated as notifications arrive.
+
+    Works with a :class:`DartAnalysisServer` or a
+    :class:`DartAnalysisServerPool`.
+    """
+
+    def __init__(self, server):
+        self._errors = {}
+        self._files = []
+        self.severity_counts = collections.Counter()
+        self.type_counts = collections.Counter()
+        self._subscriptions = [
+            server.analysis.on_errors(callback=self._on_errors),
+            server.analysis.on_flush_results(callback=self._on_flush_results),
+        ]
+
+    def close(self):
+        """Stop listening to the server."""
+        for subscription in self._subscriptions:
+            subscription.cancel()
+        self._subscriptions = []
+
+    def _count(self, errors, delta):
+        for error in errors:
+            self.severity_counts[_error_field(error, 'severity')] += delta
+            self.type_counts[_error_field(error, 'type')] += delta
+
+    def _remove(self, file):
+        errors = self._errors.pop(file, None)
+        if errors is not None:
+            self._count(errors, -1)
+            del self._files[bisect.bisect_left(self._files, file)]
+
+    def _on_errors(self, event, params):
+        file = params['file']
+        errors = params['errors']
+        self._remove(file)
+        # Files without errors are not kept, so the store only grows with
+        # the number of files that have problems.
+        if errors:
+            self._errors[file] = errors
+            self._count(errors, 1)
+            bisect.insort(self._files, file)
+
+    def _on_flush_results(self, event, params):
+        for file in params['files']:
+            self._remove(file)
+
+    def errors(self, file):
+        """Return the errors of the given file."""
+        return self._errors.get(file, [])
+
+    def files(self, directory=None):
+        """Return the files with errors, in order.
+
+        If ``directory`` is given, only the files under it are returned.
+        """
+        if directory is None:
+            return list(self._files)
+        prefix = directory.rstrip(os.sep) + os.sep
+        start = bisect.bisect_left(self._files, prefix)
+        files = []
+        for file in self._files[start:]:
+            if not file.startswith(prefix):
+                break
+            files.append(file)
+        return files
+
+    def items(self, directory=None):
+        """Return ``(file, errors)`` pairs, optionally under a directory."""
+        return [(file, self._errors[file]) for file in self.files(directory)]
+
+    def counts(self, directory=None):
+        """Return the error counts by severity and by type.
+
+        The counts of the whole store are kept incrementally. The ones of a
+        directory are computed from its files.
+        """
+        if directory is None:
+            return {'severity': dict(+self.severity_counts),
+                    'type': dict(+self.type_counts)}
+        severity_counts = collections.Counter()
+        type_counts = collections.Counter()
+        for file, errors in self.items(directory):
+            for error in errors:
+                severity_counts[_error_field(error, 'severity')] += 1
+                type_counts[_error_field(error, 'type')] += 1
+        return {'severity': dict(severity_counts), 'type': dict(type_counts)}
+
+    def __contains__(self, file):
+        return file in self._errors
+
+    def __len__(self):
+        return len(self._errors)
@@ -0,0 +1,285 @@
+"""Python stand-in for the analysis server.
+
+The fake server speaks the same protocol as the real one on its standard
+input and output, so clients can be tested and load tested without the Dart
+SDK. Every request of the spec is answered with a synthetic result built
+from the field types of the protocol, with lists of a chosen length. The
+requests that start a search or a completion are followed by one
+``search.results`` or ``completion.results`` notification. Setting the
+analysis roots starts a pretend analysis: ``server.status`` notifications
+bracket one ``analysis.errors`` notification for each of ``files`` files in
+every root.
+
+Responses can be delayed, and notifications can be sent in floods at a
+chosen rate. Payloads only depend on the options, so runs are repeatable.
+
+The fake server is a module of the package, run with ``python -m das.fake``.
+:func:`launch_options` returns the arguments that make a client start it::
+
+    server = DartAnalysisServer(event_loop=loop,
+                                **fake.launch_options(items=100))
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+
+import das.api
+from das.api import DartAnalysisServer
+from das.spec import SpecObject
+
+
+VERSION = '.'.join(str(part) for part in DartAnalysisServer.api_version)
+
+# Requests whose results are sent afterwards in notifications, by id.
+RESULT_EVENTS = {
+    'completion.getSuggestions': 'completion.results',
+    'search.findElementReferences': 'search.results',
+    'search.findMemberDeclarations': 'search.results',
+    'search.findMemberReferences': 'search.results',
+    'search.findTopLevelDeclarations': 'search.results',
+}
+
+# Lists nested deeper than this are sent empty, which also stops recursive
+# types like Outline.
+MAX_DEPTH = 3
+
+
+class PayloadFactory:
+    """Build synthetic values for the types of the protocol.
+
+    Top level lists get ``items`` elements and nested lists one, so the
+    size of a payload grows linearly with ``items``.
+    """
+
+    def __init__(self, items=10):
+        self.items = items
+
+    def value(self, field_type, name='value', depth=0):
+        field_type = DartAnalysisServer.type_aliases.get(field_type,
+                                                         field_type)
+        if field_type.startswith('['):
+            if depth >= MAX_DEPTH:
+                return []
+            count = self.items if depth == 0 else 1
+            item_type = field_type[1:-1]
+            return [self.value(item_type, name, depth + 1)
+                    for _ in range(count)]
+        elif field_type.startswith('{'):
+            key_type, value_type = field_type[1:-1].split(': ', 1)
+            return {'key': self.value(value_type, name, depth + 1)}
+        elif field_type.startswith('('):
+            first_type = field_type[1:-1].split(' | ')[0]
+            return self.value(first_type, name, depth)
+        elif field_type == 'str':
+            return name
+        elif field_type in ('int', 'long'):
+            return 1
+        elif field_type == 'bool':
+            return False
+
+        spec_class = SpecObject._types.get(field_type)
+        if spec_class is not None:
+            return {json_name: self.value(item_type, json_name, depth)
+                    for json_name, _, item_type in spec_class._fields}
+        enum_class = getattr(das.api, field_type, None)
+        if enum_class is not None:
+            return next(value for key, value in vars(enum_class).items()
+                        if key.isupper())
+        # Types without fields, like RefactoringFeedback.
+        return {}
+
+    def fields(self, field_types):
+        return {name: self.value(field_type, name)
+                for name, field_type in field_types.items()}
+
+
+class FakeServer:
+    """Answer the requests read from ``input`` on ``output``.
+
+    ``delay`` is the time taken by every response, unless ``delays`` has
+    one for its method. ``floods`` is a list of ``(event, rate, count)``
+    tuples: ``count`` notifications of the event are sent at ``rate`` per
+    second, about ``files`` different files.
+    """
+
+    def __init__(self, input, output, *, items=10, delay=0.0, delays=None,
+                 floods=(), files=1):
+        self._input = input
+        self._output = output
+        self.delay = delay
+        self.delays = delays or {}
+        self.floods = floods
+        self.files = ['/fake/file{}.dart'.format(i) for i in range(files)]
+        self.payloads = PayloadFactory(items)
+        self._lock = threading.Lock()
+        self._results = {}
+        self._result_ids = itertools.count(1)
+
+    def run(self):
+        """Serve until the input is closed or the server is shut down."""
+        self.notify('server.connected', {'version': VERSION})
+        for event, rate, count in self.floods:
+            thread = threading.Thread(target=self.flood,
+                                      args=(event, rate, count), daemon=True)
+            thread.start()
+        for line in self._input:
+            if line.strip() and not self.handle(line):
+                break
+
+    def _write(self, data):
+        with self._lock:
+            self._output.write(data)
+            self._output.flush()
+
+    def notify(self, event, params):
+        body = {'event': event, 'params': params}
+        self._write(json.dumps(body).encode('utf-8') + b'\n')
+
+    def handle(self, line):
+        """Answer one request. Returns False once the server is shut down."""
+        request = json.loads(line)
+        method = request['method']
+        delay = self.delays.get(method, self.delay)
+        if delay:
+            timer = threading.Timer(delay, self.respond, (request,))
+            timer.daemon = True
+            timer.start()
+        else:
+            self.respond(request)
+        return method != 'server.shutdown'
+
+    def respond(self, request):
+        request_id = request['id']
+        method = request['method']
+        if method not in DartAnalysisServer.result_fields:
+            error = {'code': 'UNKNOWN_REQUEST',
+                     'message': 'Unknown request: ' + method}
+            body = json.dumps({'id': request_id, 'error': error})
+            self._write(body.encode('utf-8') + b'\n')
+            return
+
+        event = RESULT_EVENTS.get(method)
+        if event is None:
+            result = self._result(method)
+        else:
+            # Results are streamed by id, so every request gets its own.
+            result_id = str(next(self._result_ids))
+            fields = DartAnalysisServer.result_fields[method]
+            result = self.payloads.fields(fields)
+            result['id'] = result_id
+            result = json.dumps(result).encode('utf-8')
+        header = json.dumps({'id': request_id})[:-1].encode('utf-8')
+        self._write(header + b', "result": ' + result + b'}\n')
+
+        if method == 'analysis.setAnalysisRoots':
+            self.analyze(request['params']['included'])
+        if event is not None:
+            fields = DartAnalysisServer.event_fields[event]
+            params = self.payloads.fields(fields)
+            params['id'] = result_id
+            params['isLast'] = True
+            self.notify(event, params)
+
+    def analyze(self, roots):
+        """Send the notifications of the analysis of the given roots."""
+        if not roots:
+            return
+        self.notify('server.status', {'analysis': {'isAnalyzing': True}})
+        for root in roots:
+            for index in range(len(self.files)):
+                file = os.path.join(root, 'file{}.dart'.format(index))
+                error = self.payloads.value('AnalysisError')
+                error['location']['file'] = file
+                self.notify('analysis.errors',
+                            {'file': file, 'errors': [error]})
+        self.notify('server.status', {'analysis': {'isAnalyzing': False}})
+
+    def _result(self, method):
+        # Results do not depend on the params, so they are encoded once.
+        try:
+            return self._results[method]
+        except KeyError:
+            if method == 'server.getVersion':
+                result = {'version': VERSION}
+            else:
+                fields = DartAnalysisServer.result_fields[method]
+                result = self.payloads.fields(fields)
+            encoded = json.dumps(result).encode('utf-8')
+            self._results[method] = encoded
+            return encoded
+
+    def flood(self, event, rate, count):
+        """Send ``count`` notifications of ``event`` at ``rate`` per second."""
+        params = self.payloads.fields(DartAnalysisServer.event_fields[event])
+        messages = []
+        for file in self.files:
+            if 'file' in params:
+                params['file'] = file
+            body = {'event': event, 'params': params}
+            messages.append(json.dumps(body).encode('utf-8') + b'\n')
+
+        started = time.monotonic()
+        for sent in range(count):
+            if rate:
+                delay = started + sent / rate - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            self._write(messages[sent % len(messages)])
+
+
+def launch_options(items=10, delay=0.0, delays=None, floods=(), files=1):
+    """Return the arguments of :class:`DartAnalysisServer` that make it run
+    the fake server with the given options."""
+    arguments = ['-m', 'das.fake', '--items', str(items), '--delay',
+                 str(delay), '--files', str(files)]
+    for method, method_delay in (delays or {}).items():
+        arguments += ['--method-delay', '{}={}'.format(method, method_delay)]
+    for event, rate, count in floods:
+        arguments += ['--flood', '{}:{}:{}'.format(event, rate, count)]
+    # The interpreter runs the module instead of a server snapshot.
+    return {'dart_path': sys.executable, 'das_path': None,
+            'arguments': arguments}
+
+
+def parse_flood(value):
+    event, rate, count = value.split(':')
+    return event, float(rate), int(count)
+
+
+def parse_method_delay(value):
+    method, delay = value.split('=')
+    return method, float(delay)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog='python -m das.fake',
+        description='Fake Dart analysis server with synthetic responses.')
+    parser.add_argument('--items', type=int, default=10,
+                        help='number of items of the lists in payloads')
+    parser.add_argument('--delay', type=float, default=0.0,
+                        help='seconds taken by every response')
+    parser.add_argument('--method-delay', type=parse_method_delay,
+                        action='append', default=[],
+                        metavar='METHOD=SECONDS',
+                        help='seconds taken by the responses to a method')
+    parser.add_argument('--flood', type=parse_flood, action='append',
+                        default=[], metavar='EVENT:RATE:COUNT',
+                        help='send COUNT notifications at RATE per second')
+    parser.add_argument('--files', type=int, default=1,
+                        help='number of files the notifications are about')
+    args = parser.parse_args()
+
+    server = FakeServer(sys.stdin.buffer, sys.stdout.buffer,
+                        items=args.items, delay=args.delay,
+                        delays=dict(args.method_delay), floods=args.flood,
+                        files=args.files)
+    server.run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""A small event loop for programs that do not use asyncio.
+
+:class:`EventLoop` provides what :class:`DartAnalysisServer` needs from a
+loop: ``call_soon_threadsafe`` for the callbacks of the reader thread and
+``call_later`` for request timeouts::
+
+    loop = EventLoop()
+    server = DartAnalysisServer(dart_path, das_path, loop)
+    server.start()
+    version = loop.run_until_complete(server.server.get_version())
+
+Timers are kept in a heap and the loop sleeps on a condition variable until
+the next deadline or until a callback is scheduled from another thread, so
+callbacks run as soon as they are due and an idle loop uses no CPU.
+
+Exceptions raised by callbacks propagate out of :meth:`EventLoop.run_forever`.
+The callbacks that were due at the same time are kept, and run when the loop
+is started again.
+"""
+import collections
+import heapq
+import itertools
+import threading
+import time
+
+
+class TimerHandle:
+    """A callback scheduled with :meth:`EventLoop.call_later`."""
+    __slots__ = ('when', 'callback', 'args', 'cancelled')
+
+    def __init__(self, when, callback, args):
+        self.when = when
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class EventLoop:
+    """Event loop running callbacks and timers in a single thread.
+
+    Every method can be called from any thread. Callbacks run in the thread
+    that calls :meth:`run_forever`.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._ready = collections.deque()
+        self._timers = []
+        self._sequence = itertools.count()
+        self._stopping = False
+        self._running = False
+
+    def time(self):
+        return time.monotonic()
+
+    def call_soon(self, callback, *args):
+        with self._condition:
+            self._ready.append((callback, args))
+            self._condition.notify()
+
+    call_soon_threadsafe = call_soon
+
+    def call_at(self, when, callback, *args):
+        handle = TimerHandle(when, callback, args)
+        with self._condition:
+            # The sequence number keeps timers with the same deadline in
+            # the order they were scheduled.
+            heapq.heappush(self._timers,
+                           (when, next(self._sequence), handle))
+            if self._timers[0][2] is handle:
+                self._condition.notify()
+        return handle
+
+    def call_later(self, delay, callback, *args):
+        return self.call_at(self.time() + delay, callback, *args)
+
+    def stop(self):
+        """Make :meth:`run_forever` return after the current callbacks."""
+        with self._condition:
+            self._stopping = True
+            self._condition.notify()
+
+    def is_running(self):
+        return self._running
+
+    def _wait_for_callbacks(self):
+        # Moves the due timers to the ready queue and waits until there is
+        # something to run. Returns None when the loop is stopped.
+        with self._condition:
+            while True:
+                if self._stopping:
+                    self._stopping = False
+                    return None
+                now = self.time()
+                timers = self._timers
+                while timers and (timers[0][0] <= now or
+                                  timers[0][2].cancelled):
+                    handle = heapq.heappop(timers)[2]
+                    if not handle.cancelled:
+                        self._ready.append((handle.callback, handle.args))
+                if self._ready:
+                    ready = self._ready
+                    self._ready = collections.deque()
+                    return ready
+                timeout = timers[0][0] - now if timers else None
+                self._condition.wait(timeout)
+
+    def run_forever(self):
+        """Run callbacks until :meth:`stop` is called."""
+        if self._running:
+            raise RuntimeError('The event loop is already running')
+        self._running = True
+        try:
+            while True:
+                ready = self._wait_for_callbacks()
+                if ready is None:
+                    break
+                try:
+                    while ready:
+                        callback, args = ready.popleft()
+                        callback(*args)
+                finally:
+                    if ready:
+                        with self._condition:
+                            ready.extend(self._ready)
+                            self._ready = ready
+        finally:
+            self._running = False
+
+    def run_until_complete(self, future, timeout=None):
+        """Run the loop until the future is done and return its result.
+
+        Works with the :class:`concurrent.futures.Future` objects returned
+        by the requests of the server. If ``timeout`` seconds pass first,
+        :class:`TimeoutError` is raised. If the loop is stopped first,
+        :class:`RuntimeError` is raised.
+        """
+        # Futures cannot forget their callbacks, so the callback of a
+        # future completing after the call returned must not stop the loop.
+        waiting = [True]
+        expired = []
+
+        def on_done(future):
+            with self._condition:
+                if waiting:
+                    self._stopping = True
+                    self._condition.notify()
+
+        def on_timeout():
+            expired.append(True)
+            self.stop()
+
+        timer = None
+        if timeout is not None:
+            timer = self.call_later(timeout, on_timeout)
+        future.add_done_callback(on_done)
+        try:
+            self.run_forever()
+        finally:
+            if timer is not None:
+                timer.cancel()
+            with self._condition:
+                waiting.clear()
+                # A stop requested by the future after the loop stopped
+                # for another reason.
+                self._stopping = False
+        if not future.done():
+            if expired:
+                raise TimeoutError('Future not done after {} seconds'.format(
+                    timeout))
+            raise RuntimeError('Event loop stopped before the future '
+                               'completed')
+        return future.result()
@@ -0,0 +1,154 @@
+import difflib
+
+from das.api import (AddContentOverlay, ChangeContentOverlay,
+                     RemoveContentOverlay, SourceEdit)
+
+
+# Changed regions up to this size are sent as a single edit. Bigger ones are
+# diffed line by line to find the parts that really changed.
+DIFF_THRESHOLD = 1024
+
+
+def utf16_length(text):
+    """Return the length of the text in UTF-16 code units.
+
+    Offsets and lengths of the protocol count UTF-16 code units, so
+    characters outside the Basic Multilingual Plane count twice.
+    """
+    if text.isascii():
+        return len(text)
+    return len(text.encode('utf-16-le')) // 2
+
+
+def apply_edit(content, offset, length, replacement):
+    """Return the content with the ``length`` code units at ``offset``, in
+    UTF-16 code units, replaced."""
+    if content.isascii():
+        return content[:offset] + replacement + content[offset + length:]
+    data = content.encode('utf-16-le')
+    return (data[:2 * offset] + replacement.encode('utf-16-le') +
+            data[2 * (offset + length):]).decode('utf-16-le')
+
+
+def _common_length(same, limit):
+    # Largest size up to limit for which same(size) is true, found by
+    # bisection so the strings are compared by slices rather than one
+    # character at a time.
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if same(middle):
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def compute_edits(old, new):
+    """Return the list of :class:`SourceEdit` turning ``old`` into ``new``.
+
+    Edits are sorted by descending offset, so that applying them in order
+    leaves the offsets of the following ones valid. Offsets and lengths are
+    in UTF-16 code units, as the server expects.
+    """
+    if old == new:
+        return []
+
+    limit = min(len(old), len(new))
+    start = _common_length(lambda size: old[:size] == new[:size], limit)
+    end = _common_length(
+        lambda size: old[len(old) - size:] == new[len(new) - size:],
+        limit - start)
+    old_middle = old[start:len(old) - end]
+    new_middle = new[start:len(new) - end]
+
+    if len(old_middle) + len(new_middle) <= DIFF_THRESHOLD:
+        return [SourceEdit(offset=utf16_length(old[:start]),
+                           length=utf16_length(old_middle),
+                           replacement=new_middle)]
+
+    old_lines = old_middle.splitlines(keepends=True)
+    new_lines = new_middle.splitlines(keepends=True)
+    old_offsets = [utf16_length(old[:start])]
+    for line in old_lines:
+        old_offsets.append(old_offsets[-1] + utf16_length(line))
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines,
+                                      autojunk=False)
+    edits = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag != 'equal':
+            edits.append(SourceEdit(
+                offset=old_offsets[i1],
+                length=old_offsets[i2] - old_offsets[i1],
+                replacement=''.join(new_lines[j1:j2])))
+    edits.reverse()
+    return edits
+
+
+class OverlayManager:
+    """Keep the content overlays of the server in sync with editor buffers.
+
+    The manager remembers the content last sent for each file and sends
+    only the edits since then as a ``ChangeContentOverlay``. Updates are not
+    sent right away: all the updates made within ``delay`` seconds of the
+    first one are coalesced, and the edits for every changed file go in a
+    single ``analysis.updateContent`` request.
+    """
+
+    def __init__(self, server, delay=0.05):
+        self._server = server
+        self._event_loop = server._event_loop
+        self.delay = delay
+        self._sent = {}
+        self._pending = {}
+        self._flush_scheduled = False
+
+    def content(self, file):
+        """Return the latest content given for the file, or None."""
+        return self._pending.get(file, self._sent.get(file))
+
+    def update(self, file, content):
+        """Set the content of the file, to be sent on the next flush."""
+        self._pending[file] = content
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._event_loop.call_later(self.delay, self._scheduled_flush)
+
+    def remove(self, file):
+        """Remove the overlay of the file, right away."""
+        self._pending.pop(file, None)
+        if self._sent.pop(file, None) is not None:
+            return self._server.analysis.update_content(
+                {file: RemoveContentOverlay()})
+
+    def _scheduled_flush(self):
+        self._flush_scheduled = False
+        self.flush()
+
+    def flush(self):
+        """Send the pending updates now.
+
+        Returns the future of the request, or None if nothing changed.
+        """
+        files = {}
+        for file, content in self._pending.items():
+            old_content = self._sent.get(file)
+            if old_content is None:
+                files[file] = AddContentOverlay(content=content)
+            else:
+                edits = compute_edits(old_content, content)
+                if edits:
+                    files[file] = ChangeContentOverlay(edits=edits)
+            self._sent[file] = content
+        self._pending.clear()
+
+        if files:
+            return self._server.analysis.update_content(files)
+
+    def close(self):
+        """Remove the overlays of all the files."""
+        self._pending.clear()
+        if self._sent:
+            files = {file: RemoveContentOverlay() for file in self._sent}
+            self._sent.clear()
+            return self._server.analysis.update_content(files)
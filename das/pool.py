@@ -0,0 +1,582 @@
+import asyncio
+import functools
+import itertools
+import os
+import zlib
+from collections.abc import Mapping
+
+from das.api import DartAnalysisServer
+from das.server import (LazyParams, RequestError, RequestTimeoutError,
+                        ServerExitedError, Subscription, run_coroutine)
+from das.state import ServerState
+
+
+# Requests sent to every server, unchanged.
+BROADCAST_METHODS = {
+    'server.setSubscriptions',
+    'server.shutdown',
+    'analysis.reanalyze',
+    'analysis.setGeneralSubscriptions',
+    'analysis.updateOptions',
+    'execution.setSubscriptions',
+}
+
+# Searches over the whole workspace, sent to every server. Their results
+# are reported under a single id of the pool.
+WORKSPACE_SEARCHES = {
+    'search.findMemberDeclarations',
+    'search.findMemberReferences',
+    'search.findTopLevelDeclarations',
+}
+
+# Notifications of results whose ids are translated to ids of the pool,
+# with the params of the last one of a server that exited.
+RESULTS_EVENTS = {
+    'search.results': {'results': [], 'isLast': True},
+    'completion.results': {'replacementOffset': 0, 'replacementLength': 0,
+                           'results': [], 'isLast': True},
+}
+
+# Requests about an execution context, sent to the server that created it.
+CONTEXT_METHODS = {
+    'execution.deleteContext',
+    'execution.mapUri',
+}
+
+
+def _merge_library_dependencies(result, server_result):
+    for library in server_result.get('libraries', []):
+        if library not in result.setdefault('libraries', []):
+            result['libraries'].append(library)
+    package_map = result.setdefault('packageMap', {})
+    for context, packages in server_result.get('packageMap', {}).items():
+        package_map.setdefault(context, {}).update(packages)
+
+
+# Requests about the whole workspace sent to every server, with the
+# functions merging their results.
+MERGED_METHODS = {
+    'analysis.getLibraryDependencies': _merge_library_dependencies,
+}
+
+
+class PoolSubscription:
+    """Handle of a callback registered on every server of a pool."""
+
+    def __init__(self, pool, event, callback, files):
+        self._pool = pool
+        self.event = event
+        self.callback = callback
+        self.files = files
+        self.subscriptions = {}
+
+    def subscribe(self, index, server):
+        self.subscriptions[index] = server.notification(
+            self.event, callback=self.callback, files=self.files)
+
+    def cancel(self):
+        for subscription in self.subscriptions.values():
+            subscription.cancel()
+        self.subscriptions.clear()
+        if self in self._pool._subscriptions:
+            self._pool._subscriptions.remove(self)
+
+
+class _IndexedSubscription(PoolSubscription):
+    """Pool subscription whose callback also gets the index of the server
+    sending the notification."""
+
+    def subscribe(self, index, server):
+        self.subscriptions[index] = server.notification(
+            self.event, callback=functools.partial(self.callback, index),
+            files=self.files)
+
+
+class _PoolSearch:
+    __slots__ = ('event', 'id', 'open')
+
+    def __init__(self, event, search_id, servers):
+        self.event = event
+        self.id = search_id
+        # Servers that may still send results.
+        self.open = servers
+
+
+class ResultsParams(Mapping):
+    """Params of a ``search.results`` or ``completion.results`` notification
+    of a server, with the id of the search or completion in the pool."""
+    __slots__ = ('_params', '_id', '_is_last')
+
+    def __init__(self, params, search_id, is_last):
+        self._params = params
+        self._id = search_id
+        self._is_last = is_last
+
+    def peek(self, key):
+        if key == 'id':
+            return self._id
+        return self._params.peek(key)
+
+    def __getitem__(self, key):
+        if key == 'id':
+            return self._id
+        if key == 'isLast':
+            return self._is_last
+        return self._params[key]
+
+    def __iter__(self):
+        return iter(self._params)
+
+    def __len__(self):
+        return len(self._params)
+
+
+class DartAnalysisServerPool:
+    """Pool of analysis server processes sharing the analysis roots.
+
+    Every analysis root is owned by one server and requests about a file are
+    routed to the owner of the root containing it. Requests not about a file
+    go to the least busy server, except for the ones changing the state of
+    the servers, and the ones about the whole workspace, which are sent to
+    all of them. The domains of the API are available on the pool as on a
+    single server, e.g. ``pool.analysis.get_hover(file, offset)``.
+
+    Searches get an id of the pool, and the ``search.results`` notifications
+    of every server carry that id, the last one of the last server being
+    flagged with ``isLast``. The search request is answered as soon as the
+    first server answers it. A server failing a search afterwards just sends
+    no results for it. Completions and execution contexts get ids of the
+    pool too, as the ids of different servers are the same. Requests about
+    an execution context are sent to the server that created it.
+
+    Every ``health_check_interval`` seconds each server is pinged. Servers
+    that exited or did not answer within ``health_check_timeout`` seconds
+    are restarted with the state the pool set in them, as described in
+    :mod:`das.state`, and the notification subscriptions of the pool.
+    Requests pending on a server that exited fail with
+    :class:`ServerExitedError`.
+
+    With a ``server_class`` whose ``start`` and ``stop`` are coroutines, like
+    :class:`AsyncioDartAnalysisServer`, they run as tasks of the event loop,
+    and :meth:`start` and :meth:`stop` return a future to await.
+    """
+
+    def __init__(self, dart_path, das_path, event_loop, size=None, *,
+                 health_check_interval=30, health_check_timeout=10,
+                 server_class=DartAnalysisServer, **server_options):
+        self._event_loop = event_loop
+        self._server_factory = functools.partial(
+            server_class, dart_path, das_path, event_loop, **server_options)
+        self.size = size or os.cpu_count() or 1
+        self.health_check_interval = health_check_interval
+        self.health_check_timeout = health_check_timeout
+        self.restarts = 0
+        self._states = [ServerState() for _ in range(self.size)]
+        self._servers = [self._create_server(index)
+                         for index in range(self.size)]
+        self._subscriptions = []
+        self._health_timer = None
+        self._started = False
+        self._roots = {}
+        self._excluded = []
+        self._package_roots = {}
+        self._search_ids = itertools.count()
+        self._searches = {}
+        self._results_subscriptions = dict.fromkeys(RESULTS_EVENTS, ())
+        for event in RESULTS_EVENTS:
+            results = _IndexedSubscription(self, event, self._on_results,
+                                           None)
+            for index, server in enumerate(self._servers):
+                results.subscribe(index, server)
+            self._subscriptions.append(results)
+        self._context_ids = itertools.count()
+        # Server index and id of the execution contexts, by pool id.
+        self._contexts = {}
+
+        for name, domain_class in DartAnalysisServer._domains.items():
+            domain = domain_class()
+            domain.server = self
+            setattr(self, name, domain)
+
+    @property
+    def servers(self):
+        return list(self._servers)
+
+    def _create_server(self, index):
+        server = self._server_factory()
+        server.add_request_listener(self._states[index].record)
+        return server
+
+    def _gather_tasks(self, tasks):
+        tasks = [task for task in tasks if task is not None]
+        if tasks:
+            return asyncio.gather(*tasks)
+        return None
+
+    def start(self):
+        self._started = True
+        tasks = [run_coroutine(self._event_loop, server.start())
+                 for server in self._servers]
+        self._schedule_health_check()
+        return self._gather_tasks(tasks)
+
+    def stop(self, timeout=0):
+        self._started = False
+        if self._health_timer is not None:
+            self._health_timer.cancel()
+            self._health_timer = None
+        return self._gather_tasks([
+            run_coroutine(self._event_loop, server.stop(timeout))
+            for server in self._servers])
+
+    def restart(self, index):
+        """Replace the server at ``index`` with a new process, and restore
+        its state."""
+        old_server = self._servers[index]
+        if old_server.running:
+            run_coroutine(self._event_loop, old_server.stop())
+        old_server._fail_pending_requests()
+        self._abandon_searches(index)
+        # The contexts of the old process are gone.
+        for context_id, (owner, _) in list(self._contexts.items()):
+            if owner == index:
+                del self._contexts[context_id]
+
+        server = self._create_server(index)
+        self._servers[index] = server
+        for subscription in self._subscriptions:
+            subscription.subscribe(index, server)
+        # Requests made before an asyncio server is started are sent once
+        # it is.
+        run_coroutine(self._event_loop, server.start())
+        for method, params in self._states[index].requests():
+            server.request(method, params)
+        self.restarts += 1
+
+    def _schedule_health_check(self):
+        if self.health_check_interval:
+            self._health_timer = self._event_loop.call_later(
+                self.health_check_interval, self._health_check)
+
+    def _health_check(self):
+        if not self._started:
+            return
+        for index, server in enumerate(self._servers):
+            if not server.running:
+                self.restart(index)
+                continue
+            errback = functools.partial(self._ping_failed, server)
+            server.request('server.getVersion', errback=errback,
+                           timeout=self.health_check_timeout)
+        self._schedule_health_check()
+
+    def _ping_failed(self, server, method, error):
+        failed = isinstance(error, (RequestTimeoutError, ServerExitedError))
+        if failed and self._started and server in self._servers:
+            self.restart(self._servers.index(server))
+
+    def owner(self, file):
+        """Return the index of the server owning the given file.
+
+        Files outside of the analysis roots are spread over the servers by
+        hashing their path.
+        """
+        owner_root = None
+        for root in self._roots:
+            if file == root or file.startswith(root.rstrip(os.sep) + os.sep):
+                if owner_root is None or len(root) > len(owner_root):
+                    owner_root = root
+        if owner_root is not None:
+            return self._roots[owner_root]
+        return zlib.crc32(file.encode('utf-8')) % self.size
+
+    def server_for(self, file):
+        return self._servers[self.owner(file)]
+
+    def _least_busy(self):
+        return min(self._servers, key=lambda s: s.pending_requests)
+
+    def _set_analysis_roots(self, params):
+        included = params['included']
+        for root in list(self._roots):
+            if root not in included:
+                del self._roots[root]
+        for root in included:
+            if root not in self._roots:
+                counts = [0] * self.size
+                for index in self._roots.values():
+                    counts[index] += 1
+                self._roots[root] = counts.index(min(counts))
+        self._excluded = params.get('excluded', [])
+        self._package_roots = params.get('packageRoots') or {}
+
+    def _roots_params(self, index):
+        roots = [root for root, owner in self._roots.items()
+                 if owner == index]
+        params = {
+            'included': roots,
+            'excluded': [path for path in self._excluded
+                         if self.owner(path) == index],
+        }
+        if self._package_roots:
+            params['packageRoots'] = {
+                path: package_root
+                for path, package_root in self._package_roots.items()
+                if self.owner(path) == index}
+        return params
+
+    def _send_roots(self, index, **kwargs):
+        return self._servers[index].request(
+            'analysis.setAnalysisRoots', self._roots_params(index), **kwargs)
+
+    def _split_params(self, method, params):
+        # Split the params of requests about many files by owner. Servers
+        # without any of the files get empty params, so their previous
+        # state for the request is cleared.
+        split = [None] * self.size
+        if method == 'analysis.setPriorityFiles':
+            for index in range(self.size):
+                split[index] = {'files': []}
+            for file in params['files']:
+                split[self.owner(file)]['files'].append(file)
+        elif method == 'analysis.setSubscriptions':
+            for index in range(self.size):
+                split[index] = {'subscriptions': {}}
+            for service, files in params['subscriptions'].items():
+                for index in range(self.size):
+                    split[index]['subscriptions'][service] = []
+                for file in files:
+                    subscriptions = split[self.owner(file)]['subscriptions']
+                    subscriptions[service].append(file)
+        elif method == 'analysis.updateContent':
+            for file, overlay in params['files'].items():
+                index = self.owner(file)
+                if split[index] is None:
+                    split[index] = {'files': {}}
+                split[index]['files'][file] = overlay
+        else:
+            return None
+        return split
+
+    def request(self, method, params=None, *, callback=None, errback=None,
+                **kwargs):
+        """Send a request to the servers concerned by it.
+
+        Takes the same arguments as :meth:`DartAnalysisServer.request`.
+        When a request is sent to several servers, the returned future is
+        resolved once all of them responded, or failed with the first error.
+        """
+        if method == 'analysis.setAnalysisRoots':
+            self._set_analysis_roots(params)
+            futures = [self._send_roots(index, **kwargs)
+                       for index in range(self.size)]
+            return self._gather(method, futures, callback, errback)
+
+        if method in WORKSPACE_SEARCHES:
+            return self._search(method, params, 'search.results',
+                                range(self.size), callback, errback, kwargs)
+        if method == 'search.findElementReferences':
+            return self._search(method, params, 'search.results',
+                                [self.owner(params['file'])], callback,
+                                errback, kwargs)
+        if method == 'completion.getSuggestions':
+            return self._search(method, params, 'completion.results',
+                                [self.owner(params['file'])], callback,
+                                errback, kwargs)
+
+        if method == 'execution.createContext':
+            return self._create_context(params, callback, errback, kwargs)
+        if method in CONTEXT_METHODS:
+            return self._context_request(method, params, callback, errback,
+                                         kwargs)
+
+        if method in MERGED_METHODS:
+            futures = [server.request(method, params, **kwargs)
+                       for server in self._servers]
+            return self._gather(method, futures, callback, errback,
+                                MERGED_METHODS[method])
+
+        if params is not None and 'file' in params:
+            server = self.server_for(params['file'])
+            return server.request(method, params, callback=callback,
+                                  errback=errback, **kwargs)
+
+        if method in BROADCAST_METHODS:
+            split = [params] * self.size
+        else:
+            split = self._split_params(method, params)
+        if split is not None:
+            futures = [server.request(method, server_params, **kwargs)
+                       for server, server_params in zip(self._servers, split)
+                       if server_params is not None]
+            return self._gather(method, futures, callback, errback)
+
+        return self._least_busy().request(method, params, callback=callback,
+                                          errback=errback, **kwargs)
+
+    def _search(self, method, params, event, indexes, callback, errback,
+                kwargs):
+        # The id of the search is recorded by the callbacks of the requests,
+        # which run before the notifications received after the responses.
+        future = self._servers[0]._create_future()
+        search = _PoolSearch(event, str(next(self._search_ids)),
+                             len(indexes))
+
+        def on_result(index, method, **result):
+            server_id = result.pop('id', None)
+            if server_id is None:
+                self._close_search(search)
+            else:
+                self._searches[event, index, server_id] = search
+            if future.done():
+                return
+            if server_id is not None:
+                result['id'] = search.id
+            elif search.open:
+                # Other servers may still find something.
+                return
+            future.set_result(result)
+            if callback is not None:
+                callback(method, **result)
+
+        def on_error(index, method, error):
+            if self._close_search(search):
+                self._fail(future, method, error, errback)
+
+        for index in indexes:
+            self._servers[index].request(
+                method, params, callback=functools.partial(on_result, index),
+                errback=functools.partial(on_error, index), **kwargs)
+        return future
+
+    def _close_search(self, search):
+        search.open -= 1
+        return search.open == 0
+
+    def _on_results(self, index, event, params):
+        key = (event, index, params.peek('id'))
+        search = self._searches.get(key)
+        if search is not None:
+            is_last = False
+            if params['isLast']:
+                del self._searches[key]
+                is_last = self._close_search(search)
+            params = ResultsParams(params, search.id, is_last)
+        for subscription in self._results_subscriptions[event]:
+            subscription._deliver(event, params)
+
+    def _abandon_searches(self, index):
+        # The searches and completions of a server that exited get no more
+        # results from it.
+        for key in [key for key in self._searches if key[1] == index]:
+            search = self._searches.pop(key)
+            if self._close_search(search):
+                params = dict(RESULTS_EVENTS[search.event], id=search.id)
+                params = LazyParams(None, search.event, params=params)
+                for subscription in self._results_subscriptions[search.event]:
+                    subscription._deliver(search.event, params)
+
+    def _remove_subscription(self, subscription):
+        self._results_subscriptions[subscription.event] = tuple(
+            s for s in self._results_subscriptions[subscription.event]
+            if s is not subscription)
+
+    def _create_context(self, params, callback, errback, kwargs):
+        # Contexts are created by the server analyzing their root.
+        index = self.owner(params['contextRoot'])
+        future = self._servers[0]._create_future()
+
+        def on_result(method, **result):
+            context_id = str(next(self._context_ids))
+            self._contexts[context_id] = (index, result['id'])
+            if future.done():
+                return
+            result['id'] = context_id
+            future.set_result(result)
+            if callback is not None:
+                callback(method, **result)
+
+        def on_error(method, error):
+            self._fail(future, method, error, errback)
+
+        self._servers[index].request('execution.createContext', params,
+                                     callback=on_result, errback=on_error,
+                                     **kwargs)
+        return future
+
+    def _context_request(self, method, params, callback, errback, kwargs):
+        context = self._contexts.get(params['id'])
+        if context is None:
+            future = self._servers[0]._create_future()
+            error = RequestError({
+                'code': 'INVALID_EXECUTION_CONTEXT',
+                'message': 'Unknown execution context {}'.format(
+                    params['id'])})
+            self._fail(future, method, error, errback)
+            return future
+        index, server_id = context
+        if method == 'execution.deleteContext':
+            del self._contexts[params['id']]
+        return self._servers[index].request(
+            method, dict(params, id=server_id), callback=callback,
+            errback=errback, **kwargs)
+
+    def _fail(self, future, method, error, errback):
+        if future.done():
+            return
+        future.set_exception(error)
+        if errback is not None:
+            future.exception()
+            errback(method, error)
+
+    def _gather(self, method, futures, callback, errback,
+                merge=dict.update):
+        future = self._servers[0]._create_future()
+        result = {}
+        remaining = [len(futures)]
+        if not futures:
+            future.set_result(result)
+            if callback is not None:
+                callback(method)
+            return future
+
+        def on_done(done):
+            if future.done():
+                return
+            if done.cancelled():
+                future.cancel()
+                return
+            error = done.exception()
+            if error is not None:
+                self._fail(future, method, error, errback)
+                return
+            merge(result, done.result())
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                future.set_result(result)
+                if callback is not None:
+                    callback(method, **result)
+
+        for server_future in futures:
+            server_future.add_done_callback(on_done)
+        return future
+
+    def notification(self, event, *, callback, files=None):
+        """Register a callback for notifications from any of the servers.
+
+        Returns a :class:`PoolSubscription` that can be cancelled.
+        """
+        if event in RESULTS_EVENTS:
+            # Delivered once their ids are translated to the ones of the
+            # pool.
+            subscription = Subscription(self, event, callback)
+            self._results_subscriptions[event] += (subscription,)
+            return subscription
+        subscription = PoolSubscription(self, event, callback, files)
+        for index, server in enumerate(self._servers):
+            subscription.subscribe(index, server)
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def check_version(self, version):
+        return self._servers[0].check_version(version)
@@ -0,0 +1,177 @@
+"""Recording and replay of the traffic between a client and the server.
+
+A :class:`Recorder` given to a server logs every request it writes and every
+message it reads, with the time since recording started::
+
+    recorder = Recorder('session.log.gz')
+    server = DartAnalysisServer(dart, das, loop, recorder=recorder)
+    ...
+    recorder.close()
+
+The log is a gzip compressed text file with one entry per line: the time in
+seconds, ``>`` for messages sent or ``<`` for messages received, and the
+message exactly as it went through the pipe, separated by spaces.
+
+A :class:`Replayer` sends the recorded requests again to another server,
+real or fake, at the original pace or as fast as possible, and compares the
+latencies with the recorded ones. It can also feed the recorded messages
+straight to a client, for measuring the cost of handling them.
+"""
+import asyncio
+import collections
+import gzip
+import json
+import threading
+import time
+
+from das.server import MESSAGE_HEADER
+
+
+SENT = b'>'
+RECEIVED = b'<'
+
+Entry = collections.namedtuple('Entry', 'time direction message')
+
+
+class Recorder:
+    """Write the messages of a server to a compressed log."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = gzip.open(path, 'wb')
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+
+    def record(self, direction, message):
+        # Requests are written from the event loop and responses from the
+        # reader thread, so entries are written under a lock.
+        elapsed = time.monotonic() - self._start
+        entry = b'%.6f %s %s\n' % (elapsed, direction, message.rstrip(b'\n'))
+        with self._lock:
+            if self._file is not None:
+                self._file.write(entry)
+
+    def sent(self, message):
+        self.record(SENT, message)
+
+    def received(self, message):
+        self.record(RECEIVED, message)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_log(path):
+    """Iterate over the entries of a log written by a :class:`Recorder`."""
+    with gzip.open(path, 'rb') as log:
+        for line in log:
+            elapsed, direction, message = line.rstrip(b'\n').split(b' ', 2)
+            yield Entry(float(elapsed), direction, message)
+
+
+class Replayer:
+    """Play a recorded session back.
+
+    ``speed`` is the factor applied to the recorded pace: 1 keeps the
+    original timing, 2 goes twice as fast, and None sends everything without
+    waiting.
+    """
+
+    def __init__(self, path, speed=1.0):
+        self.path = path
+        self.speed = speed
+        self.entries = list(read_log(path))
+
+    def requests(self):
+        """Return ``(time, id, body)`` for each recorded request."""
+        return [(entry.time, body['id'], body)
+                for entry, body in self._decoded(SENT)]
+
+    def recorded_latencies(self):
+        """Return the recorded latency of each request, by request id."""
+        sent = {}
+        latencies = {}
+        for entry in self.entries:
+            if entry.direction == SENT:
+                sent[json.loads(entry.message)['id']] = entry.time
+                continue
+            header = MESSAGE_HEADER.match(entry.message)
+            if header is not None and header.group(1) == b'id':
+                request_id = header.group(2).decode('utf-8')
+                if request_id in sent:
+                    latencies[request_id] = entry.time - sent[request_id]
+        return latencies
+
+    def _decoded(self, direction):
+        for entry in self.entries:
+            if entry.direction == direction:
+                yield entry, json.loads(entry.message)
+
+    async def _wait_until(self, started, recorded_time):
+        if self.speed is None:
+            return
+        delay = recorded_time / self.speed - (time.monotonic() - started)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def replay(self, server):
+        """Send the recorded requests to ``server`` and wait for them.
+
+        Must run on the event loop of the server. Returns a list with the
+        method, the recorded latency and the replayed latency of every
+        request, in the order they were sent. Latencies of requests without
+        a recorded response are None.
+        """
+        recorded = self.recorded_latencies()
+        report = []
+        futures = []
+        started = time.monotonic()
+
+        for recorded_time, request_id, body in self.requests():
+            await self._wait_until(started, recorded_time)
+            item = {'method': body['method'],
+                    'recorded': recorded.get(request_id),
+                    'replayed': None, 'error': None}
+            report.append(item)
+            future = server.request(body['method'], body.get('params'))
+            future.add_done_callback(
+                self._on_done(item, time.perf_counter()))
+            futures.append(asyncio.wrap_future(future))
+
+        await asyncio.gather(*futures, return_exceptions=True)
+        return report
+
+    @staticmethod
+    def _on_done(item, sent_at):
+
+        def on_done(future):
+            item['replayed'] = time.perf_counter() - sent_at
+            if future.cancelled():
+                item['error'] = 'cancelled'
+            elif future.exception() is not None:
+                item['error'] = str(future.exception())
+
+        return on_done
+
+    async def feed(self, server):
+        """Hand the recorded incoming messages to ``server``.
+
+        Messages go straight to the code handling what is read from the
+        server process, so their decoding and dispatch can be measured on
+        their own. Responses are only handled for the requests
+        the server is waiting for.
+        """
+        started = time.monotonic()
+        for entry in self.entries:
+            if entry.direction == RECEIVED:
+                await self._wait_until(started, entry.time)
+                server._handle_message(entry.message)
@@ -0,0 +1,244 @@
+"""Client side scheduling of requests by priority.
+
+The analysis server answers requests in the order it reads them, so a burst
+of slow requests, like searches or formatting whole files, delays the ones
+made while typing, like completions and hovers. A :class:`RequestScheduler`
+sends the requests of the ``BULK`` class only while fewer than
+``bulk_limit`` of them are waiting for a response, and keeps the rest queued
+on the client. The other requests are ``INTERACTIVE`` and are sent right
+away, or first when a limit is also set for them.
+
+Requests that change the state of the server, like content updates, are
+sent right away whatever the limits, and do not count in them, so they
+reach the server in the order they were made.
+"""
+import collections
+import functools
+
+from das.api import DartAnalysisServer
+from das.server import RequestError
+from das.state import STATE_METHODS
+
+
+INTERACTIVE = 'interactive'
+BULK = 'bulk'
+
+# Slow requests nobody is waiting for while typing.
+BULK_METHODS = {
+    'analysis.getErrors',
+    'analysis.getLibraryDependencies',
+    'search.findElementReferences',
+    'search.findMemberDeclarations',
+    'search.findMemberReferences',
+    'search.findTopLevelDeclarations',
+    'search.getTypeHierarchy',
+    'edit.format',
+    'edit.organizeDirectives',
+    'edit.sortMembers',
+}
+
+# Requests changing the state of the server, never queued.
+UNSCHEDULED_METHODS = set(STATE_METHODS) | {
+    'analysis.updateContent',
+    'analysis.updateOptions',
+}
+
+
+class QueueFullError(RequestError):
+    def __init__(self, method, priority):
+        message = 'Too many {} requests queued for {}'.format(
+            priority, method)
+        super().__init__({'code': 'CLIENT_QUEUE_FULL', 'message': message})
+
+
+class _QueuedRequest:
+    __slots__ = ('method', 'params', 'future', 'callback', 'errback',
+                 'kwargs', 'released')
+
+    def __init__(self, method, params, future, callback, errback, kwargs):
+        self.method = method
+        self.params = params
+        self.future = future
+        self.callback = callback
+        self.errback = errback
+        self.kwargs = kwargs
+        self.released = False
+
+
+class RequestScheduler:
+    """Send the requests of a server by priority, with limited concurrency.
+
+    ``bulk_limit`` and ``interactive_limit`` are the number of requests of
+    each class that can wait for a response at the same time, None meaning
+    no limit. At most ``max_queued`` bulk requests are queued: requests
+    beyond that fail with :class:`QueueFullError`, and :meth:`capacity`
+    lets bulk callers wait for room instead.
+
+    The class of a request comes from its method, and can be given with the
+    ``priority`` argument of any request, e.g.
+    ``scheduler.analysis.get_errors(file, priority=INTERACTIVE)``. The
+    domains of the API are available on the scheduler as on the server.
+    """
+
+    def __init__(self, server, *, bulk_limit=2, interactive_limit=None,
+                 max_queued=1000):
+        self._server = server
+        self.limits = {INTERACTIVE: interactive_limit, BULK: bulk_limit}
+        self.max_queued = max_queued
+        self.in_flight = {INTERACTIVE: 0, BULK: 0}
+        self.rejected = 0
+        self._queues = {INTERACTIVE: collections.deque(),
+                        BULK: collections.deque()}
+        self._capacity_waiters = collections.deque()
+        self._reserved = 0
+
+        for name, domain_class in DartAnalysisServer._domains.items():
+            domain = domain_class()
+            domain.server = self
+            setattr(self, name, domain)
+
+    def priority(self, method):
+        """Return the class of the requests of a method."""
+        if method in BULK_METHODS:
+            return BULK
+        return INTERACTIVE
+
+    def _has_slot(self, priority):
+        limit = self.limits[priority]
+        return limit is None or self.in_flight[priority] < limit
+
+    def request(self, method, params=None, *, callback=None, errback=None,
+                priority=None, **kwargs):
+        """Send a request, or queue it until its class has a free slot.
+
+        Takes the same arguments as :meth:`DartAnalysisServer.request`, and
+        the class of the request as ``priority``.
+        """
+        if method in UNSCHEDULED_METHODS:
+            return self._server.request(method, params, callback=callback,
+                                        errback=errback, **kwargs)
+        if priority is None:
+            priority = self.priority(method)
+        future = self._server._create_future()
+        request = _QueuedRequest(method, params, future, callback, errback,
+                                 kwargs)
+        queue = self._queues[priority]
+        reserved = priority == BULK and self._reserved > 0
+        if reserved:
+            # Takes the room reserved for a producer woken by capacity().
+            self._reserved -= 1
+        if not queue and self._has_slot(priority):
+            self._send(request, priority)
+        elif (priority == BULK and not reserved and
+              len(queue) + self._reserved >= self.max_queued):
+            self.rejected += 1
+            self._fail(request, QueueFullError(method, priority))
+        else:
+            queue.append(request)
+        if reserved:
+            self._wake_up_waiters()
+        return future
+
+    def _send(self, request, priority):
+        # Completed from the callbacks of the request, which run before the
+        # notifications received after the response, unlike the callbacks
+        # of its future. Only cancellations come from the future.
+        self.in_flight[priority] += 1
+        future = self._server.request(
+            request.method, request.params,
+            callback=functools.partial(self._on_result, request, priority),
+            errback=functools.partial(self._on_error, request, priority),
+            **request.kwargs)
+        future.add_done_callback(
+            functools.partial(self._on_done, request, priority))
+
+    def _release(self, request, priority):
+        # Returns whether the slot of the request was still taken.
+        if request.released:
+            return False
+        request.released = True
+        self.in_flight[priority] -= 1
+        return True
+
+    def _on_result(self, request, priority, method, **result):
+        if self._release(request, priority):
+            self._complete(request, result)
+            self._send_queued()
+
+    def _on_error(self, request, priority, method, error):
+        if self._release(request, priority):
+            self._fail(request, error)
+            self._send_queued()
+
+    def _on_done(self, request, priority, future):
+        if future.cancelled() and self._release(request, priority):
+            request.future.cancel()
+            self._send_queued()
+
+    def _send_queued(self):
+        # Interactive requests go first whenever both classes have room.
+        for priority in (INTERACTIVE, BULK):
+            queue = self._queues[priority]
+            while queue and self._has_slot(priority):
+                request = queue.popleft()
+                if not request.future.done():
+                    self._send(request, priority)
+        self._wake_up_waiters()
+
+    def _wake_up_waiters(self):
+        # Every waiter woken reserves room for one request in the queue.
+        while (self._capacity_waiters and
+               len(self._queues[BULK]) + self._reserved < self.max_queued):
+            waiter = self._capacity_waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._reserved += 1
+
+    def capacity(self):
+        """Return a future resolved once a bulk request can be queued.
+
+        Bulk producers wait on it before each request to slow down to the
+        pace of the server, instead of having requests rejected. Room is
+        reserved for the next bulk request, so a producer must make one
+        once the future is resolved.
+        """
+        waiter = self._server._create_future()
+        self._capacity_waiters.append(waiter)
+        self._wake_up_waiters()
+        return waiter
+
+    def _complete(self, request, result):
+        if request.future.done():
+            return
+        request.future.set_result(result)
+        if request.callback is not None:
+            request.callback(request.method, **result)
+
+    def _fail(self, request, error):
+        if request.future.done():
+            return
+        request.future.set_exception(error)
+        if request.errback is not None:
+            # The error is handled by the errback.
+            request.future.exception()
+            request.errback(request.method, error)
+
+    def queued(self, priority):
+        return len(self._queues[priority])
+
+    def get_stats(self):
+        """Return the requests in flight and queued, by class."""
+        stats = {
+            priority: {
+                'in_flight': self.in_flight[priority],
+                'queued': len(self._queues[priority]),
+                'limit': self.limits[priority],
+            }
+            for priority in (INTERACTIVE, BULK)
+        }
+        stats[BULK]['rejected'] = self.rejected
+        return stats
+
+    def notification(self, event, *, callback, files=None):
+        return self._server.notification(event, callback=callback,
+                                         files=files)
@@ -1,14 +1,67 @@
-
+import asyncio
+import concurrent.futures
+import functools
 import itertools
-import json
+import re
 import time
+from collections.abc import Mapping
 from subprocess import Popen, PIPE, TimeoutExpired
-from threading import Thread
+from threading import Condition, Lock, Thread
+
+from das.codec import get_codec
+from das.spec import decode_fields, field_decoders
+from das.stats import ServerStats
 
 
 DART = '/opt/google/dartsdk/bin/darts'
 DAS = '/opt/google/dartsdk/bin/snapshots/analysis_server.dart.snapshot'
 
+# Maximum length of a single message read from an asyncio pipe. Navigation
+# and highlights notifications for big files can be several megabytes long.
+STREAM_LIMIT = 2 ** 28
+
+# The analysis server writes the id of responses and the name of
+# notifications as the first key of each message.
+MESSAGE_HEADER = re.compile(rb'\{\s*"(id|event)"\s*:\s*"([^"\\]*)"')
+
+# First param of a notification, when its value is a string. For the
+# notifications about a file, this is the file path.
+FIRST_PARAM = re.compile(
+    rb'"params"\s*:\s*\{\s*"([^"\\]*)"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+# Requests answered from the state of the server only. Identical requests
+# of these methods made while one is in flight share its response.
+COALESCED_METHODS = {
+    'server.getVersion',
+    'analysis.getErrors',
+    'analysis.getHover',
+    'analysis.getLibraryDependencies',
+    'analysis.getNavigation',
+    'search.getTypeHierarchy',
+    'edit.getAssists',
+    'edit.getAvailableRefactorings',
+    'edit.getFixes',
+}
+
+# Size of pending outgoing data above which the asyncio transport flushes
+# right away instead of waiting for the next loop iteration.
+WRITE_BUFFER_SIZE = 2 ** 16
+
+
+def _freeze(value):
+    # Hashable form of request params, equal for equal params whatever the
+    # order of their keys, and for spec objects and the dicts they encode
+    # to.
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item))
+                            for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    to_json = getattr(value, 'to_json', None)
+    if to_json is not None:
+        return _freeze(to_json())
+    return value
+
 
 class DartAnalysisException(Exception):
     pass
@@ -21,15 +74,162 @@ class RequestError(Exception):
         self.stacktrace = raw_error.get('stackTrace', None)
 
 
+class RequestTimeoutError(RequestError):
+    def __init__(self, method, timeout):
+        message = '{} timed out after {} seconds'.format(method, timeout)
+        super().__init__({'code': 'CLIENT_REQUEST_TIMEOUT',
+                          'message': message})
+
+
+class ServerExitedError(RequestError):
+    def __init__(self, method):
+        message = 'The server exited before responding to ' + method
+        super().__init__({'code': 'CLIENT_SERVER_EXITED',
+                          'message': message})
+
+
+class LazyParams(Mapping):
+    """Params of a notification, decoded on first access.
+
+    Notifications are handed to callbacks undecoded, so the cost of decoding
+    big payloads is only paid if the callback actually reads them.
+    """
+    __slots__ = ('_server', '_event', '_line', '_params')
+
+    def __init__(self, server, event, line=None, params=None):
+        self._server = server
+        self._event = event
+        self._line = line
+        self._params = params
+
+    def _decoded(self):
+        server = self._server
+        if server is not None:
+            started = time.perf_counter()
+            if self._line is not None:
+                body = server.codec.loads(self._line)
+                self._params = body.get('params', {})
+                self._line = None
+            self._params = server._decode(self._event, self._params,
+                                          server.event_types)
+            self._server = None
+            server.stats.notification_decoded(
+                self._event, time.perf_counter() - started)
+        return self._params
+
+    def peek(self, key):
+        """Return the value of a param, decoding as little as possible.
+
+        The value of the first param is read from the raw message when it is
+        a string, so checking the file of a notification is cheap.
+        """
+        if self._line is not None:
+            match = FIRST_PARAM.search(self._line)
+            if match is not None and match.group(1) == key.encode('utf-8'):
+                value = match.group(2)
+                if b'\\' in value:
+                    return self._server.codec.loads(b'"' + value + b'"')
+                return value.decode('utf-8')
+        return self._decoded().get(key)
+
+    def __getitem__(self, key):
+        return self._decoded()[key]
+
+    def __iter__(self):
+        return iter(self._decoded())
+
+    def __len__(self):
+        return len(self._decoded())
+
+    def __repr__(self):
+        return 'LazyParams({!r})'.format(self._event)
+
+
+class Subscription:
+    """Handle of a callback registered for a notification.
+
+    Calling :meth:`cancel` unsubscribes the callback. Once cancelled, the
+    callback is not called again, even for notifications already received.
+    """
+    __slots__ = ('_server', 'event', 'callback', 'files', 'active')
+
+    def __init__(self, server, event, callback, files=None):
+        self._server = server
+        self.event = event
+        self.callback = callback
+        self.files = files
+        self.active = True
+
+    def accepts(self, params):
+        return self.files is None or params.peek('file') in self.files
+
+    def cancel(self):
+        if self.active:
+            self.active = False
+            self._server._remove_subscription(self)
+
+    def _deliver(self, event, params):
+        if self.active:
+            self.callback(event, params)
+
+
+class _PendingRequest:
+    __slots__ = ('method', 'future', 'callback', 'errback', 'timer',
+                 'sent_at', 'received_at', 'key', 'followers', 'request_id',
+                 'supersede')
+
+    def __init__(self, method, future, callback, errback):
+        self.method = method
+        self.future = future
+        self.callback = callback
+        self.errback = errback
+        self.timer = None
+        self.sent_at = None
+        self.received_at = None
+        self.key = None
+        self.followers = None
+        self.request_id = None
+        self.supersede = None
+
+    def cancel_timer(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+
 class DartAnalysisServer:
     _domains = {}
+    _decoders = {}
+    result_types = {}
+    event_types = {}
 
-    def __init__(self, dart_path, das_path, event_loop):
-        self._path = [dart_path, das_path]
+    def __init__(self, dart_path, das_path, event_loop, *,
+                 request_timeout=None, decode_types=True, codec=None,
+                 recorder=None, arguments=()):
+        # Without a snapshot, the arguments hold the whole program to run,
+        # like ['-m', 'das.fake'] with a Python interpreter.
+        self._path = [dart_path, *([das_path] if das_path else []),
+                      *arguments]
         self._event_loop = event_loop
+        if codec is None or isinstance(codec, str):
+            codec = get_codec(codec)
+        self.codec = codec
+        self.request_timeout = request_timeout
+        self.decode_types = decode_types
+        self.stats = ServerStats()
+        self.recorder = recorder
+        self._process = None
+        self._write_buffer = []
         self._id_counter = itertools.count()
         self._request_callbacks = {}
         self._event_callbacks = {}
+        self._request_listeners = []
+        self._exit_listeners = []
+        self._supersede_keys = {}
+        self._in_flight = {}
+        # Requests can be made from other threads than the one completing
+        # them.
+        self._in_flight_lock = Lock()
 
         for name, domain_class in self._domains.items():
             domain = domain_class()
@@ -37,66 +237,297 @@ class DartAnalysisServer:
             setattr(self, name, domain)
 
     def start(self):
-        self._process = Popen(self._path, stdin=PIPE, stdout=PIPE, bufsize=1)
+        self._process = Popen(self._path, stdin=PIPE, stdout=PIPE)
+        self._write_condition = Condition()
+        self._write_closed = False
 
         reader_thread = Thread(target=self._read_thread)
         reader_thread.start()
+        writer_thread = Thread(target=self._write_thread)
+        writer_thread.start()
 
     def stop(self, timeout=0):
-        self._process.stdin.close()
+        with self._write_condition:
+            self._write_closed = True
+            self._write_condition.notify()
         self._process.stdout.close()
         try:
             self._process.wait(timeout=timeout)
         except TimeoutExpired:
             self._process.kill()
 
+    @property
+    def running(self):
+        """Whether the server process has been started and is alive."""
+        return self._process is not None and self._process.poll() is None
+
     def _read_thread(self):
         while True:
             try:
-                line = self._process.stdout.readline().decode('utf-8')
+                line = self._process.stdout.readline()
             except ValueError:
                 break
             if not line:
                 break
-            body = json.loads(line)
-            if 'id' in body:
-                self._send_request(body)
-            elif 'event' in body:
-                self._send_event(body)
-            else:
-                raise DartAnalysisException('Unknown message: ' + line)
-
-    def _send_request(self, body):
+            self._handle_message(line)
+        self._process_exited()
+
+    def _write_thread(self):
+        # Messages queued while the previous write was in progress are sent
+        # together in a single write.
+        stdin = self._process.stdin
+        while True:
+            with self._write_condition:
+                while not self._write_buffer and not self._write_closed:
+                    self._write_condition.wait()
+                data = b''.join(self._write_buffer)
+                self._write_buffer.clear()
+            if not data:
+                break
+            try:
+                stdin.write(data)
+                stdin.flush()
+            except (OSError, ValueError):
+                break
+        try:
+            stdin.close()
+        except OSError:
+            pass
+
+    def _handle_message(self, line):
+        # Route messages by their header, so that responses nobody waits for
+        # and notifications nobody listens to are never decoded.
+        if self.recorder is not None:
+            self.recorder.received(line)
+        size = len(line)
+        self.stats.message_received(size)
+        header = MESSAGE_HEADER.match(line)
+        if header is not None:
+            key, name = header.group(1), header.group(2).decode('utf-8')
+            if key == b'event':
+                self.stats.notification_received(name, size)
+                self._send_event(name, LazyParams(self, name, line=line))
+            elif name in self._request_callbacks:
+                started = time.perf_counter()
+                self._send_request(self.codec.loads(line), size, started)
+            return
+
+        started = time.perf_counter()
+        body = self.codec.loads(line)
+        if 'id' in body:
+            self._send_request(body, size, started)
+        elif 'event' in body:
+            self.stats.notification_received(body['event'], size)
+            params = LazyParams(self, body['event'],
+                                params=body.get('params', {}))
+            self._send_event(body['event'], params)
+        else:
+            raise DartAnalysisException(
+                'Unknown message: ' + line.decode('utf-8'))
+
+    def _dispatch(self, callback, *args, **kwargs):
+        if kwargs:
+            callback = functools.partial(callback, **kwargs)
+        self._event_loop.call_soon_threadsafe(callback, *args)
+
+    def _send_request(self, body, size=0, started=None):
         if self._process is None:
             raise DartAnalysisException('Server not started')
 
-        try:
-            method, callback, errback = self._request_callbacks[body['id']]
-        except KeyError:
-            raise DartAnalysisException('Response without an ID')
+        pending = self._request_callbacks.pop(body['id'], None)
+        if pending is None:
+            # Late response to a request that already timed out.
+            return
+
+        failed = 'error' in body
+        if not failed:
+            result = self._decode(pending.method, body.get('result', {}),
+                                  self.result_types)
+
+        now = pending.received_at = time.perf_counter()
+        decode_time = now - started if started is not None else 0.0
+        self.stats.response_received(pending.method, now - pending.sent_at,
+                                     size, decode_time, failed)
+
+        if failed:
+            error = RequestError(body['error'])
+            self._dispatch(self._fail_request, pending, error)
+        else:
+            self._dispatch(self._complete_request, pending, result)
 
-        if 'error' in body and errback is not None:
-            self._event_loop.call_soon_threadsafe(errback, method,
-                                                  RequestError(body['error']))
-        elif callback is not None:
-            kwargs = body.get('result', {})
-            self._event_loop.call_soon_threadsafe(callback, method, **kwargs)
+    def _record_dispatch(self, pending):
+        if pending.received_at is not None:
+            delay = time.perf_counter() - pending.received_at
+            self.stats.dispatched(delay)
 
-    def _send_event(self, body):
+    def _release_supersede_key(self, pending):
+        # Keys are only kept while their latest request is pending.
+        if (pending.supersede is not None and
+                self._supersede_keys.get(pending.supersede) ==
+                pending.request_id):
+            del self._supersede_keys[pending.supersede]
+
+    def _waiting_requests(self, pending):
+        # The request and the identical ones that joined it while it was in
+        # flight. Requests made from now on are sent again.
+        if pending.key is None:
+            return (pending,)
+        with self._in_flight_lock:
+            if self._in_flight.get(pending.key) is pending:
+                del self._in_flight[pending.key]
+            if pending.followers is None:
+                return (pending,)
+            return [pending] + pending.followers
+
+    def _complete_request(self, pending, result):
+        self._record_dispatch(pending)
+        pending.cancel_timer()
+        self._release_supersede_key(pending)
+        for waiting in self._waiting_requests(pending):
+            if not waiting.future.cancelled():
+                waiting.future.set_result(result)
+            if waiting.callback is not None:
+                waiting.callback(waiting.method, **result)
+
+    def _fail_request(self, pending, error):
+        self._record_dispatch(pending)
+        pending.cancel_timer()
+        self._release_supersede_key(pending)
+        for waiting in self._waiting_requests(pending):
+            future = waiting.future
+            if not future.cancelled():
+                future.set_exception(error)
+                if waiting.errback is not None:
+                    # The errback takes care of the error, so the future
+                    # does not need to be awaited.
+                    future.exception()
+            if waiting.errback is not None:
+                waiting.errback(waiting.method, error)
+
+    def _expire_request(self, request_id, timeout):
+        pending = self._request_callbacks.pop(request_id, None)
+        if pending is not None:
+            pending.timer = None
+            error = RequestTimeoutError(pending.method, timeout)
+            self._fail_request(pending, error)
+
+    def _send_event(self, event, params):
         if self._process is None:
             raise DartAnalysisException('Server not started')
 
+        # All the subscribers share the same params, so the payload is
+        # decoded at most once.
+        for subscription in self._event_callbacks.get(event, ()):
+            if subscription.accepts(params):
+                self._dispatch(subscription._deliver, event, params)
+
+    def _decode(self, name, fields, types):
+        # Replace the values of fields holding spec objects with instances
+        # of the classes generated in das.api.
+        if not self.decode_types:
+            return fields
         try:
-            event, callback = self._event_callbacks[body['event']]
+            decoders = self._decoders[name]
         except KeyError:
-            return
-        params = (event, body['params'])
-        self._event_loop.call_soon_threadsafe(callback, *params)
+            decoders = field_decoders(types.get(name, {}))
+            self._decoders[name] = decoders
+        return decode_fields(fields, decoders)
 
     def _next_id(self):
         return str(next(self._id_counter))
 
-    def request(self, method, params=None, *, callback=None, errback=None):
+    def _write(self, data):
+        with self._write_condition:
+            self._write_buffer.append(data)
+            self._write_condition.notify()
+
+    def _create_future(self):
+        create_future = getattr(self._event_loop, 'create_future', None)
+        if create_future is None:
+            return concurrent.futures.Future()
+        return create_future()
+
+    def _fail_pending_requests(self):
+        # Fail every request still waiting for a response, for when the
+        # server is gone and responses will never arrive.
+        for request_id in list(self._request_callbacks):
+            pending = self._request_callbacks.pop(request_id, None)
+            if pending is not None:
+                error = ServerExitedError(pending.method)
+                self._dispatch(self._fail_request, pending, error)
+
+    def _process_exited(self):
+        # Nothing else will be read, so the requests still waiting would
+        # never complete.
+        self._fail_pending_requests()
+        for listener in self._exit_listeners:
+            self._dispatch(listener, self)
+
+    @property
+    def pending_requests(self):
+        """Number of requests sent that are still waiting for a response."""
+        return len(self._request_callbacks)
+
+    def get_stats(self):
+        """Return a snapshot of the statistics of the server.
+
+        See :mod:`das.stats` for what is measured.
+        """
+        snapshot = self.stats.snapshot()
+        snapshot['in_flight'] = self.pending_requests
+        return snapshot
+
+    def request(self, method, params=None, *, callback=None, errback=None,
+                timeout=None, supersede=None):
+        """Send a request to the server.
+
+        Returns a future resolved with the result of the request as a dict,
+        or failed with a :class:`RequestError`. If a callback is given, it is
+        also called with the method name and the result as keyword
+        arguments. If an errback is given, it is called with the method name
+        and the error.
+
+        Unless ``decode_types`` is disabled, values of spec object types are
+        decoded into the classes generated in :mod:`das.api`.
+
+        If the server does not respond within ``timeout`` seconds (by default
+        ``request_timeout``), the request fails with a
+        :class:`RequestTimeoutError` and any late response is dropped.
+
+        ``supersede`` is a key identifying what the request is for, like
+        ``('hover', file)``. A newer request with the same key supersedes
+        this one: its future is cancelled, its callbacks are never called
+        and its response is skipped without being decoded.
+
+        Requests of :data:`COALESCED_METHODS` made while an identical one,
+        with the same method, params and timeout, is in flight are not sent:
+        they get the response of the first one, or its timeout. Results
+        are then shared between callers, so they must not be modified.
+        Requests with a ``supersede`` key are always sent.
+
+        The future comes from the event loop when it provides
+        ``create_future``, which is the case for asyncio loops. Otherwise a
+        :class:`concurrent.futures.Future` is returned.
+        """
+        if timeout is None:
+            timeout = self.request_timeout
+
+        key = None
+        if supersede is None and method in COALESCED_METHODS:
+            key = (method, _freeze(params), timeout)
+            with self._in_flight_lock:
+                leader = self._in_flight.get(key)
+                if leader is not None:
+                    future = self._create_future()
+                    follower = _PendingRequest(method, future, callback,
+                                               errback)
+                    if leader.followers is None:
+                        leader.followers = []
+                    leader.followers.append(follower)
+            if leader is not None:
+                self.stats.request_coalesced(method)
+                return future
+
         request_id = self._next_id()
         body = {
             'id': request_id,
@@ -105,14 +536,103 @@ class DartAnalysisServer:
         }
         if params is not None:
             body['params'] = params
+        data = self.codec.dumps(body) + b'\n'
+
+        if supersede is not None:
+            self._supersede(supersede, request_id)
+
+        future = self._create_future()
+        pending = _PendingRequest(method, future, callback, errback)
+        pending.request_id = request_id
+        pending.supersede = supersede
+        # Registered before writing, as the response can be read as soon as
+        # the request is written.
+        self._request_callbacks[request_id] = pending
+        if key is not None:
+            pending.key = key
+            with self._in_flight_lock:
+                self._in_flight[key] = pending
+
+        if timeout is not None:
+            pending.timer = self._event_loop.call_later(
+                timeout, self._expire_request, request_id, timeout)
+
+        self.stats.request_sent(method, len(data))
+        if self.recorder is not None:
+            self.recorder.sent(data)
+        pending.sent_at = time.perf_counter()
+        try:
+            self._write(data)
+        except Exception as error:
+            self._unregister_request(pending, error)
+            raise
 
-        self._request_callbacks[request_id] = (method, callback, errback)
+        for listener in self._request_listeners:
+            listener(method, params)
+        return future
 
-        self._process.stdin.write(json.dumps(body).encode('utf-8') + b'\n')
-        self._process.stdin.flush()
+    def _unregister_request(self, pending, error):
+        # The request could not be written, so no response will come. The
+        # identical requests that joined it in the meantime fail with it.
+        self._request_callbacks.pop(pending.request_id, None)
+        pending.cancel_timer()
+        self._release_supersede_key(pending)
+        for follower in self._waiting_requests(pending)[1:]:
+            self._dispatch(self._fail_request, follower, error)
 
-    def notification(self, event, *, callback):
-        self._event_callbacks[event] = (event, callback)
+    def _supersede(self, key, request_id):
+        # Once out of the pending requests, the response of the previous
+        # request is dropped by the reader as soon as its id is read.
+        previous_id = self._supersede_keys.get(key)
+        self._supersede_keys[key] = request_id
+        pending = self._request_callbacks.pop(previous_id, None)
+        if pending is not None:
+            pending.cancel_timer()
+            pending.future.cancel()
+            self.stats.request_superseded(pending.method)
+
+    def add_request_listener(self, listener):
+        """Call ``listener`` with the method and params of every request
+        sent, for keeping track of the state set in the server."""
+        self._request_listeners.append(listener)
+
+    def remove_request_listener(self, listener):
+        self._request_listeners.remove(listener)
+
+    def add_exit_listener(self, listener):
+        """Call ``listener`` with the server on the event loop once nothing
+        more can be read from the server process, because it exited or was
+        stopped. The requests still waiting are failed with
+        :class:`ServerExitedError`."""
+        self._exit_listeners.append(listener)
+
+    def remove_exit_listener(self, listener):
+        self._exit_listeners.remove(listener)
+
+    def notification(self, event, *, callback, files=None):
+        """Call ``callback`` with the event name and params of every
+        notification of the given kind.
+
+        Any number of callbacks can be registered for the same event. If
+        ``files`` is given, only notifications about those files are
+        delivered. Returns a :class:`Subscription` that can be cancelled.
+        """
+        if files is not None:
+            files = frozenset(files)
+        subscription = Subscription(self, event, callback, files)
+        # The subscribers are replaced rather than modified, so the reader
+        # can go through them without locking.
+        subscriptions = self._event_callbacks.get(event, ())
+        self._event_callbacks[event] = subscriptions + (subscription,)
+        return subscription
+
+    def _remove_subscription(self, subscription):
+        subscriptions = tuple(s for s in self._event_callbacks.get(
+            subscription.event, ()) if s is not subscription)
+        if subscriptions:
+            self._event_callbacks[subscription.event] = subscriptions
+        else:
+            self._event_callbacks.pop(subscription.event, None)
 
     @classmethod
     def register_domain(cls, name):
@@ -129,3 +649,85 @@ class DartAnalysisServer:
         that_major, that_minor, that_patch = version
         this_major, this_minor, this_patch = self.api_version
         return (that_major == this_major and that_minor >= this_minor)
+
+
+def run_coroutine(event_loop, result):
+    """Run the result of the ``start`` or ``stop`` method of a server.
+
+    The methods of :class:`AsyncioDartAnalysisServer` return coroutines,
+    which are run as tasks of the event loop. The task is returned, or None
+    for the other servers.
+    """
+    if asyncio.iscoroutine(result):
+        return event_loop.create_task(result)
+    return None
+
+
+class AsyncioDartAnalysisServer(DartAnalysisServer):
+    """Dart Analysis Server client running on asyncio subprocess pipes.
+
+    Messages are read by a task on the event loop and dispatched from there,
+    so no reader thread is needed per server. ``start`` and ``stop`` are
+    coroutines. If no event loop is given, the current event loop is used,
+    which is the running loop when the server is created in a coroutine.
+    """
+
+    def __init__(self, dart_path, das_path, event_loop=None, **kwargs):
+        if event_loop is None:
+            # Requests can be made before start, so the loop is needed from
+            # the beginning.
+            event_loop = asyncio.get_event_loop()
+        super().__init__(dart_path, das_path, event_loop, **kwargs)
+        self._reader_task = None
+        self._write_size = 0
+
+    async def start(self):
+        self._process = await asyncio.create_subprocess_exec(
+            *self._path, stdin=PIPE, stdout=PIPE, limit=STREAM_LIMIT)
+        self._reader_task = self._event_loop.create_task(self._read_task())
+        # Requests made before the server was started.
+        self._flush()
+
+    async def stop(self, timeout=0):
+        self._flush()
+        self._process.stdin.close()
+        try:
+            await asyncio.wait_for(self._process.wait(), timeout)
+        except asyncio.TimeoutError:
+            self._process.kill()
+            await self._process.wait()
+        await self._reader_task
+
+    @property
+    def running(self):
+        return self._process is not None and self._process.returncode is None
+
+    async def _read_task(self):
+        stdout = self._process.stdout
+        while True:
+            line = await stdout.readline()
+            if not line:
+                break
+            self._handle_message(line)
+        self._process_exited()
+
+    def _dispatch(self, callback, *args, **kwargs):
+        if kwargs:
+            callback = functools.partial(callback, **kwargs)
+        self._event_loop.call_soon(callback, *args)
+
+    def _write(self, data):
+        # Messages written during the same loop iteration are coalesced and
+        # sent with a single write, unless too much data is pending.
+        if not self._write_buffer:
+            self._event_loop.call_soon(self._flush)
+        self._write_buffer.append(data)
+        self._write_size += len(data)
+        if self._write_size >= WRITE_BUFFER_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if self._write_buffer and self._process is not None:
+            self._process.stdin.write(b''.join(self._write_buffer))
+            self._write_buffer.clear()
+            self._write_size = 0
@@ -0,0 +1,115 @@
+"""Runtime support for the object types defined in the protocol spec.
+
+The classes themselves are generated into :mod:`das.api`. Each one lists its
+fields as ``(json_name, attribute, type)`` tuples, where ``type`` uses the
+notation of the generated docs: ``Location``, ``[Location]``,
+``{str: [FilePath]}``. Types that are not object types (strings, enums,
+aliases and unions) are kept as decoded by JSON.
+"""
+
+
+class SpecObject:
+    """Base class of the object types defined in the protocol spec.
+
+    Instances only keep one slot per field, which makes them much smaller
+    than the dicts produced by the JSON decoder. Fields omitted by the server
+    are set to None.
+    """
+    __slots__ = ()
+    _fields = ()
+    _defaults = {}
+    _types = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        SpecObject._types[cls.__name__] = cls
+
+    def __init__(self, **kwargs):
+        for name, attribute, field_type in self._fields:
+            value = kwargs.pop(attribute, self._defaults.get(name))
+            setattr(self, attribute, value)
+        if kwargs:
+            raise TypeError('Unexpected fields for {}: {}'.format(
+                type(self).__name__, ', '.join(sorted(kwargs))))
+
+    @classmethod
+    def from_json(cls, data):
+        try:
+            decoders = cls.__dict__['_decoders']
+        except KeyError:
+            decoders = tuple((name, attribute, decoder(field_type))
+                             for name, attribute, field_type in cls._fields)
+            cls._decoders = decoders
+
+        obj = cls.__new__(cls)
+        for name, attribute, decode in decoders:
+            value = data.get(name)
+            if value is not None and decode is not None:
+                value = decode(value)
+            setattr(obj, attribute, value)
+        return obj
+
+    def to_json(self):
+        data = {}
+        for name, attribute, field_type in self._fields:
+            value = getattr(self, attribute)
+            if value is not None:
+                data[name] = value
+        return data
+
+    def __eq__(self, other):
+        if type(self) is not type(other):
+            return NotImplemented
+        return all(getattr(self, attribute) == getattr(other, attribute)
+                   for _, attribute, _ in self._fields)
+
+    def __repr__(self):
+        fields = ('{}={!r}'.format(attribute, getattr(self, attribute))
+                  for _, attribute, _ in self._fields)
+        return '{}({})'.format(type(self).__name__, ', '.join(fields))
+
+
+def decoder(field_type):
+    """Return a function decoding JSON values of the given type.
+
+    Returns None if values of the type do not need any decoding.
+    """
+    if field_type.startswith('['):
+        item = decoder(field_type[1:-1])
+        if item is None:
+            return None
+        return lambda values: [item(value) for value in values]
+    elif field_type.startswith('{'):
+        key_type, value_type = field_type[1:-1].split(': ', 1)
+        value = decoder(value_type)
+        if value is None:
+            return None
+        return lambda values: {k: value(v) for k, v in values.items()}
+    cls = SpecObject._types.get(field_type)
+    if cls is None:
+        return None
+    return cls.from_json
+
+
+def field_decoders(field_types):
+    """Compile a ``{field name: type}`` mapping into a decoders tuple."""
+    decoders = ((name, decoder(field_type))
+                for name, field_type in field_types.items())
+    return tuple((name, decode) for name, decode in decoders
+                 if decode is not None)
+
+
+def decode_fields(fields, decoders):
+    """Decode in place the values of a result or notification params dict."""
+    for name, decode in decoders:
+        value = fields.get(name)
+        if value is not None:
+            fields[name] = decode(value)
+    return fields
+
+
+def encode_object(obj):
+    """``default`` hook for the JSON encoder."""
+    if isinstance(obj, SpecObject):
+        return obj.to_json()
+    raise TypeError('{!r} is not JSON serializable'.format(obj))
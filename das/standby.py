@@ -0,0 +1,161 @@
+"""Analysis servers started ahead of time.
+
+Starting an analysis server takes a while: the Dart VM has to load the
+server snapshot before it sends ``server.connected``. A :class:`WarmStandby`
+keeps a few servers started and connected, and hands one out right away
+when a session needs it::
+
+    standby = WarmStandby(dart_path, das_path, loop, size=1)
+    standby.start()
+    ...
+    server = standby.acquire()
+    server.analysis.set_analysis_roots([project], [], {})
+
+The server handed out is replaced by a new one in the background. The time
+each server took from being spawned to being connected is measured.
+"""
+import asyncio
+import functools
+import time
+
+from das.api import DartAnalysisServer
+from das.server import run_coroutine
+from das.stats import Histogram
+
+
+class WarmStandby:
+    """Keep ``size`` analysis servers started, ready to be handed out.
+
+    Servers are created and started on the event loop. Servers handed out
+    belong to the caller, who stops them when done.
+
+    With ``server_class=AsyncioDartAnalysisServer``, the servers are started
+    by tasks of the event loop, and :meth:`stop` returns an awaitable.
+    """
+
+    def __init__(self, dart_path, das_path, event_loop, size=1, *,
+                 server_class=DartAnalysisServer, **server_options):
+        self._event_loop = event_loop
+        self._server_factory = functools.partial(
+            server_class, dart_path, das_path, event_loop, **server_options)
+        self.size = size
+        self.startup = Histogram()
+        self.hits = 0
+        self.misses = 0
+        self._ready = []
+        self._starting = {}
+        # Servers handed out before being connected, still measured.
+        self._handed_out = {}
+        # Tasks starting asyncio servers, until their process is started.
+        self._start_tasks = {}
+        self._started = False
+
+    def start(self):
+        self._started = True
+        self._refill()
+
+    def stop(self, timeout=0):
+        """Stop the servers that were not handed out."""
+        self._started = False
+        servers = self._ready + list(self._starting)
+        self._ready = []
+        self._starting.clear()
+        for _, subscription in self._handed_out.values():
+            subscription.cancel()
+        self._handed_out.clear()
+        tasks = [self._stop_server(server, timeout) for server in servers]
+        tasks = [task for task in tasks if task is not None]
+        if tasks:
+            return asyncio.gather(*tasks)
+        return None
+
+    def _stop_server(self, server, timeout):
+        start_task = self._start_tasks.pop(server, None)
+        if start_task is None:
+            return run_coroutine(self._event_loop, server.stop(timeout))
+        return self._event_loop.create_task(
+            self._stop_when_started(start_task, server, timeout))
+
+    async def _stop_when_started(self, start_task, server, timeout):
+        # An asyncio server has no process to stop until it is started.
+        await start_task
+        await server.stop(timeout)
+
+    def _refill(self):
+        while self._started and (len(self._ready) + len(self._starting) <
+                                 self.size):
+            self._spawn()
+
+    def _spawn(self):
+        server = self._server_factory()
+        subscription = server.server.on_connected(
+            callback=functools.partial(self._on_connected, server))
+        server.add_exit_listener(self._on_exit)
+        self._starting[server] = (time.perf_counter(), subscription)
+        task = run_coroutine(self._event_loop, server.start())
+        if task is not None:
+            self._start_tasks[server] = task
+            task.add_done_callback(
+                lambda task: self._start_tasks.pop(server, None))
+
+    def _on_connected(self, server, event, params):
+        started = self._starting.pop(server, None)
+        ready = started is not None
+        if not ready:
+            started = self._handed_out.pop(server, None)
+            if started is None:
+                return
+        spawned_at, subscription = started
+        subscription.cancel()
+        self.startup.record(time.perf_counter() - spawned_at)
+        if ready:
+            self._ready.append(server)
+
+    def _on_exit(self, server):
+        # A server that died while waiting is replaced.
+        server.remove_exit_listener(self._on_exit)
+        if server in self._ready:
+            self._ready.remove(server)
+        elif server in self._starting:
+            self._starting.pop(server)[1].cancel()
+        else:
+            return
+        self._refill()
+
+    def acquire(self):
+        """Return a started server, and start another one to replace it.
+
+        The server is connected if any was ready. Otherwise the one that has
+        been starting for the longest is returned, or a new one if there is
+        none. Requests can be sent to it anyway, they are answered once it
+        is connected. An asyncio server handed out that way may still be
+        starting its process, so it can only be stopped once it is
+        :attr:`running`.
+        """
+        if self._ready:
+            self.hits += 1
+            server = self._ready.pop(0)
+        else:
+            self.misses += 1
+            if not self._starting:
+                self._spawn()
+            server = next(iter(self._starting))
+            self._handed_out[server] = self._starting.pop(server)
+        server.remove_exit_listener(self._on_exit)
+        self._event_loop.call_soon_threadsafe(self._refill)
+        return server
+
+    @property
+    def ready(self):
+        """Number of connected servers waiting to be handed out."""
+        return len(self._ready)
+
+    def get_stats(self):
+        """Return the hand out counts and the startup times, in seconds."""
+        return {
+            'ready': len(self._ready),
+            'starting': len(self._starting),
+            'hits': self.hits,
+            'misses': self.misses,
+            'startup': self.startup.as_dict(),
+        }
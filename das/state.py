@@ -0,0 +1,81 @@
+"""State set in analysis servers by the requests sent to them.
+
+A :class:`ServerState` records the requests sent to a server, and returns
+the ones setting the same state in a new server process.
+"""
+from das.overlay import apply_edit
+
+
+# Requests whose last params hold the whole state they set.
+STATE_METHODS = [
+    'server.setSubscriptions',
+    'analysis.setAnalysisRoots',
+    'analysis.setPriorityFiles',
+    'analysis.setSubscriptions',
+    'analysis.setGeneralSubscriptions',
+    'execution.setSubscriptions',
+]
+
+
+def _field(value, name):
+    # Params may hold spec objects or the dicts they encode to.
+    if isinstance(value, dict):
+        return value.get(name)
+    return getattr(value, name)
+
+
+class ServerState:
+    """State set in a server by the requests sent to it."""
+
+    def __init__(self):
+        self.params = {}
+        self.options = {}
+        self.overlays = {}
+
+    def record(self, method, params):
+        if method in STATE_METHODS:
+            self.params[method] = params
+        elif method == 'analysis.updateOptions':
+            # Only the options given are changed.
+            options = params['options']
+            if not isinstance(options, dict):
+                options = options.to_json()
+            self.options.update(options)
+        elif method == 'analysis.updateContent':
+            for file, overlay in params['files'].items():
+                self._update_overlay(file, overlay)
+
+    def _update_overlay(self, file, overlay):
+        overlay_type = _field(overlay, 'type')
+        if overlay_type == 'add':
+            self.overlays[file] = _field(overlay, 'content')
+        elif overlay_type == 'remove':
+            self.overlays.pop(file, None)
+        elif overlay_type == 'change' and file in self.overlays:
+            content = self.overlays[file]
+            for edit in _field(overlay, 'edits'):
+                content = apply_edit(content, _field(edit, 'offset'),
+                                     _field(edit, 'length'),
+                                     _field(edit, 'replacement'))
+            self.overlays[file] = content
+
+    def requests(self):
+        """Return the ``(method, params)`` restoring the state."""
+        requests = []
+        if 'server.setSubscriptions' in self.params:
+            requests.append(('server.setSubscriptions',
+                             self.params['server.setSubscriptions']))
+        if self.options:
+            requests.append(('analysis.updateOptions',
+                             {'options': dict(self.options)}))
+        if 'analysis.setAnalysisRoots' in self.params:
+            requests.append(('analysis.setAnalysisRoots',
+                             self.params['analysis.setAnalysisRoots']))
+        if self.overlays:
+            files = {file: {'type': 'add', 'content': content}
+                     for file, content in self.overlays.items()}
+            requests.append(('analysis.updateContent', {'files': files}))
+        for method in STATE_METHODS[2:]:
+            if method in self.params:
+                requests.append((method, self.params[method]))
+        return requests
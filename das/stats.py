@@ -0,0 +1,205 @@
+"""Request and message statistics of an analysis server client.
+
+Every :class:`DartAnalysisServer` keeps a :class:`ServerStats` with the
+latency of each request method, the bytes sent and received and the time
+spent decoding messages. Latencies are measured from the moment a request is
+written until its response is read, so they include the time spent by the
+analysis server. The time from reading a response to running its callback on
+the event loop is measured separately, as the dispatch delay.
+
+Hooks receive every measurement as it is taken, for exporting them to other
+metrics systems. They are called from the thread that takes the measurement,
+which is the reader thread for responses of the thread transport.
+"""
+import collections
+
+
+class Histogram:
+    """Histogram of durations in seconds.
+
+    Buckets grow by powers of two from one microsecond, so percentiles are
+    approximate but recording a value is cheap.
+    """
+    __slots__ = ('count', 'total', 'min', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.buckets = [0] * 40
+
+    def record(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if self.max is None or seconds > self.max:
+            self.max = seconds
+        index = min(int(seconds * 1e6).bit_length(), len(self.buckets) - 1)
+        self.buckets[index] += 1
+
+    def percentile(self, percent):
+        if not self.count:
+            return None
+        rank = self.count * percent / 100
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= rank:
+                return min(2 ** index / 1e6, self.max)
+        return self.max
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else None,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+        }
+
+
+class MethodStats:
+    __slots__ = ('requests', 'errors', 'superseded', 'coalesced',
+                 'bytes_out', 'bytes_in', 'latency', 'decode')
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.superseded = 0
+        self.coalesced = 0
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.latency = Histogram()
+        self.decode = Histogram()
+
+    def as_dict(self):
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'superseded': self.superseded,
+            'coalesced': self.coalesced,
+            'bytes_out': self.bytes_out,
+            'bytes_in': self.bytes_in,
+            'latency': self.latency.as_dict(),
+            'decode': self.decode.as_dict(),
+        }
+
+
+class EventStats:
+    __slots__ = ('count', 'bytes_in', 'decode')
+
+    def __init__(self):
+        self.count = 0
+        self.bytes_in = 0
+        self.decode = Histogram()
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'bytes_in': self.bytes_in,
+            'decode': self.decode.as_dict(),
+        }
+
+
+class StatsHook:
+    """Base class for receivers of the measurements of a server.
+
+    All the methods do nothing by default. Sizes are in bytes and times in
+    seconds.
+    """
+
+    def on_request(self, method, size):
+        pass
+
+    def on_response(self, method, latency, size, decode_time, error):
+        pass
+
+    def on_notification(self, event, size):
+        pass
+
+    def on_decode(self, event, decode_time):
+        pass
+
+    def on_dispatch(self, delay):
+        pass
+
+
+class ServerStats:
+    """Statistics of the requests and messages of a server."""
+
+    def __init__(self):
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.messages_in = 0
+        self.methods = collections.defaultdict(MethodStats)
+        self.events = collections.defaultdict(EventStats)
+        self.dispatch_delay = Histogram()
+        self.hooks = []
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        self.hooks.remove(hook)
+
+    def request_sent(self, method, size):
+        self.bytes_out += size
+        stats = self.methods[method]
+        stats.requests += 1
+        stats.bytes_out += size
+        for hook in self.hooks:
+            hook.on_request(method, size)
+
+    def request_superseded(self, method):
+        self.methods[method].superseded += 1
+
+    def request_coalesced(self, method):
+        self.methods[method].coalesced += 1
+
+    def message_received(self, size):
+        self.messages_in += 1
+        self.bytes_in += size
+
+    def response_received(self, method, latency, size, decode_time, error):
+        stats = self.methods[method]
+        if error:
+            stats.errors += 1
+        stats.bytes_in += size
+        stats.latency.record(latency)
+        stats.decode.record(decode_time)
+        for hook in self.hooks:
+            hook.on_response(method, latency, size, decode_time, error)
+
+    def notification_received(self, event, size):
+        stats = self.events[event]
+        stats.count += 1
+        stats.bytes_in += size
+        for hook in self.hooks:
+            hook.on_notification(event, size)
+
+    def notification_decoded(self, event, decode_time):
+        self.events[event].decode.record(decode_time)
+        for hook in self.hooks:
+            hook.on_decode(event, decode_time)
+
+    def dispatched(self, delay):
+        self.dispatch_delay.record(delay)
+        for hook in self.hooks:
+            hook.on_dispatch(delay)
+
+    def snapshot(self):
+        """Return all the statistics as a dict of plain values."""
+        return {
+            'bytes_out': self.bytes_out,
+            'bytes_in': self.bytes_in,
+            'messages_in': self.messages_in,
+            'dispatch_delay': self.dispatch_delay.as_dict(),
+            'methods': {method: stats.as_dict()
+                        for method, stats in list(self.methods.items())},
+            'events': {event: stats.as_dict()
+                       for event, stats in list(self.events.items())},
+        }
@@ -0,0 +1,222 @@
+"""Async iterators over results streamed in notifications.
+
+Some requests only return an id, and their results arrive afterwards in one
+or more notifications carrying that id, the last one flagged with
+``isLast``. A router listens to those notifications and hands each of them
+to the stream of its request, so every request can be consumed on its own::
+
+    completions = CompletionStreams(server)
+    async for params in completions.get_suggestions(file, offset):
+        show(params['results'])
+
+    searches = SearchStreams(server)
+    async with searches.find_member_references('build') as stream:
+        async for results in stream.batches():
+            ...
+
+Notifications for streams that were cancelled, or that nobody is waiting
+for, are dropped without being decoded. Streams need an asyncio event loop.
+"""
+import asyncio
+import collections
+
+
+class ResultStream:
+    """Async iterator over the notifications of one request.
+
+    Each item is the params of a notification. Iteration stops after the
+    last one, or when the stream is cancelled.
+    """
+
+    def __init__(self, router):
+        self._router = router
+        self._items = collections.deque()
+        self._waiter = None
+        self._error = None
+        self.id = None
+        self.result = None
+        self.done = False
+        self.cancelled = False
+
+    def _wake_up(self):
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    def _feed(self, params):
+        self._items.append(params)
+        self._wake_up()
+
+    def _finish(self):
+        self.done = True
+        self._wake_up()
+
+    def _fail(self, error):
+        self._error = error
+        self._finish()
+
+    def cancel(self):
+        """Stop the stream. Results received later are discarded."""
+        if not self.done:
+            self.cancelled = True
+            self._items.clear()
+            self._router._forget(self)
+            self._finish()
+
+    async def batches(self):
+        """Iterate over the ``results`` of each notification.
+
+        Closing the generator cancels the stream, so the remaining results
+        are never decoded. As Python only closes async generators when they
+        are collected, stop early inside ``async with stream:`` to cancel
+        right away.
+        """
+        try:
+            async for params in self:
+                yield params['results']
+        finally:
+            self.cancel()
+
+    async def aclose(self):
+        self.cancel()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.cancel()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while not self._items:
+            if self._error is not None:
+                error, self._error = self._error, None
+                raise error
+            if self.done:
+                raise StopAsyncIteration
+            self._waiter = asyncio.get_running_loop().create_future()
+            await self._waiter
+            self._waiter = None
+        return self._items.popleft()
+
+
+class ResultRouter:
+    """Route the notifications of an event to streams by request id."""
+
+    event = None
+
+    def __init__(self, server):
+        self._server = server
+        self._streams = {}
+        self._subscription = server.notification(self.event,
+                                                 callback=self._on_results)
+
+    def close(self):
+        """Stop listening to the server and cancel all the streams."""
+        self._subscription.cancel()
+        for stream in list(self._streams.values()):
+            stream.cancel()
+
+    def _start(self, request, *args, callback=None, **kwargs):
+        # The stream is registered by the callback of the request, which
+        # runs before the notifications received after the response, while
+        # the callbacks of the future may run after them.
+        stream = ResultStream(self)
+
+        def on_result(method, **result):
+            if not stream.cancelled:
+                stream.result = result
+                stream.id = result.get('id')
+                if stream.id is None:
+                    # Nothing to search for, no results will be sent.
+                    stream._finish()
+                else:
+                    self._streams[stream.id] = stream
+            if callback is not None:
+                callback(method, **result)
+
+        def on_done(future):
+            if future.cancelled():
+                stream.cancel()
+            elif future.exception() is not None:
+                if not stream.cancelled:
+                    stream._fail(future.exception())
+
+        future = request(*args, callback=on_result, **kwargs)
+        future.add_done_callback(on_done)
+        return stream
+
+    def _forget(self, stream):
+        if self._streams.get(stream.id) is stream:
+            del self._streams[stream.id]
+
+    def _on_results(self, event, params):
+        # The id is the first param of the notification, so it can be read
+        # without decoding the results.
+        stream = self._streams.get(params.peek('id'))
+        if stream is None:
+            return
+        stream._feed(params)
+        if params['isLast']:
+            self._forget(stream)
+            stream._finish()
+
+
+class CompletionStreams(ResultRouter):
+    """Streams of ``completion.results`` notifications.
+
+    Starting a completion for a file cancels the previous completion for
+    the same file, whose results are not relevant anymore.
+    """
+
+    event = 'completion.results'
+
+    def __init__(self, server):
+        super().__init__(server)
+        self._by_file = {}
+
+    def get_suggestions(self, file, offset, **kwargs):
+        """Request completion suggestions and return their stream."""
+        previous = self._by_file.get(file)
+        if previous is not None:
+            previous.cancel()
+        stream = self._start(self._server.completion.get_suggestions,
+                             file, offset, **kwargs)
+        stream.file = file
+        self._by_file[file] = stream
+        return stream
+
+    def _forget(self, stream):
+        super()._forget(stream)
+        if self._by_file.get(stream.file) is stream:
+            del self._by_file[stream.file]
+
+
+class SearchStreams(ResultRouter):
+    """Streams of ``search.results`` notifications.
+
+    Every search has its own stream, so concurrent searches do not see each
+    other's results. The result of the search request itself, such as the
+    element of ``find_element_references``, is available as
+    ``stream.result`` once the first batch arrives.
+    """
+
+    event = 'search.results'
+
+    def find_element_references(self, file, offset, include_potential,
+                                **kwargs):
+        return self._start(self._server.search.find_element_references,
+                           file, offset, include_potential, **kwargs)
+
+    def find_member_declarations(self, name, **kwargs):
+        return self._start(self._server.search.find_member_declarations,
+                           name, **kwargs)
+
+    def find_member_references(self, name, **kwargs):
+        return self._start(self._server.search.find_member_references,
+                           name, **kwargs)
+
+    def find_top_level_declarations(self, pattern, **kwargs):
+        return self._start(self._server.search.find_top_level_declarations,
+                           pattern, **kwargs)
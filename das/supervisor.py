@@ -0,0 +1,224 @@
+"""Restart of crashed analysis servers with their state.
+
+A :class:`SupervisedServer` runs a :class:`DartAnalysisServer` and starts a
+new process when the current one exits. The new process gets the state the
+client set in the old one, so the session goes on as before:
+
+* analysis roots, priority files and options,
+* server, general, per file and execution subscriptions,
+* content overlays, with all the changes made to them.
+
+Requests that were waiting for the old process fail with
+:class:`ServerExitedError`, unless ``retry`` is set. Then they are sent
+again to the new process, except for the requests setting the state, which
+just succeed as the state is restored anyway.
+"""
+import collections
+import functools
+import time
+
+from das.api import DartAnalysisServer
+from das.pool import PoolSubscription
+from das.server import ServerExitedError, run_coroutine
+from das.state import STATE_METHODS, ServerState
+
+
+class _SupervisedRequest:
+    __slots__ = ('method', 'params', 'future', 'callback', 'errback',
+                 'kwargs', 'server')
+
+    def __init__(self, method, params, future, callback, errback, kwargs):
+        self.method = method
+        self.params = params
+        self.future = future
+        self.callback = callback
+        self.errback = errback
+        self.kwargs = kwargs
+        self.server = None
+
+
+class SupervisedServer:
+    """Analysis server restarted with its state when its process exits.
+
+    The domains of the API are available as on a single server, e.g.
+    ``server.analysis.get_hover(file, offset)``, and subscriptions carry
+    over to the new processes.
+
+    If the process exits more than ``max_restarts`` times within
+    ``restart_window`` seconds, the server is not restarted anymore and
+    ``gave_up`` is set.
+    """
+
+    def __init__(self, dart_path, das_path, event_loop, *, retry=False,
+                 max_restarts=5, restart_window=60,
+                 server_class=DartAnalysisServer, **server_options):
+        self._event_loop = event_loop
+        self._server_factory = functools.partial(
+            server_class, dart_path, das_path, event_loop, **server_options)
+        self.retry = retry
+        self.max_restarts = max_restarts
+        self.restart_window = restart_window
+        self.restarts = 0
+        self.gave_up = False
+        self.state = ServerState()
+        self._restart_times = collections.deque()
+        self._subscriptions = []
+        self._waiting = []
+        self._stopped = False
+        self._server = None
+        self._create_server()
+
+        for name, domain_class in DartAnalysisServer._domains.items():
+            domain = domain_class()
+            domain.server = self
+            setattr(self, name, domain)
+
+    @property
+    def current(self):
+        """The server running the current process."""
+        return self._server
+
+    def _create_server(self):
+        server = self._server_factory()
+        server.add_request_listener(self.state.record)
+        server.add_exit_listener(self._on_exit)
+        for subscription in self._subscriptions:
+            subscription.subscribe(0, server)
+        self._server = server
+
+    def start(self):
+        """Start the server process.
+
+        Returns a task to await for servers whose ``start`` is a coroutine,
+        like :class:`AsyncioDartAnalysisServer`, and None for the others.
+        :meth:`stop` does the same.
+        """
+        self._stopped = False
+        return run_coroutine(self._event_loop, self._server.start())
+
+    def stop(self, timeout=0):
+        self._stopped = True
+        return run_coroutine(self._event_loop, self._server.stop(timeout))
+
+    @property
+    def running(self):
+        return self._server.running
+
+    @property
+    def pending_requests(self):
+        return self._server.pending_requests
+
+    def _on_exit(self, server):
+        if server is not self._server or self._stopped or self.gave_up:
+            return
+
+        now = time.monotonic()
+        while (self._restart_times and
+               now - self._restart_times[0] > self.restart_window):
+            self._restart_times.popleft()
+        if len(self._restart_times) >= self.max_restarts:
+            self.gave_up = True
+            waiting, self._waiting = self._waiting, []
+            for request in waiting:
+                self._fail(request, ServerExitedError(request.method))
+            return
+        self._restart_times.append(now)
+        self.restart()
+
+    def restart(self):
+        """Replace the server process with a new one, and restore its
+        state."""
+        # Stopping a server whose process already exited still ends its
+        # reader and writer threads. The requests restoring the state are
+        # sent once an asyncio server is started.
+        run_coroutine(self._event_loop, self._server.stop())
+        self._create_server()
+        run_coroutine(self._event_loop, self._server.start())
+        self.restarts += 1
+        for method, params in self.state.requests():
+            self._server.request(method, params)
+
+        waiting, self._waiting = self._waiting, []
+        for request in waiting:
+            self._retry(request)
+
+    def _retry(self, request):
+        if request.method in STATE_METHODS or (
+                request.method == 'analysis.updateContent'):
+            # Restored with the rest of the state.
+            self._complete(request, {})
+        else:
+            self._send(request)
+
+    def _send(self, request):
+        # Completed from the callbacks of the request, which run before the
+        # notifications received after the response, unlike the callbacks
+        # of its future. Only cancellations come from the future.
+        request.server = self._server
+        future = self._server.request(
+            request.method, request.params,
+            callback=functools.partial(self._on_result, request),
+            errback=functools.partial(self._on_error, request),
+            **request.kwargs)
+        future.add_done_callback(functools.partial(self._on_done, request))
+
+    def _on_done(self, request, future):
+        if future.cancelled():
+            request.future.cancel()
+
+    def _on_result(self, request, method, **result):
+        self._complete(request, result)
+
+    def _on_error(self, request, method, error):
+        retry = (isinstance(error, ServerExitedError) and self.retry and
+                 not self._stopped and not self.gave_up and
+                 request.method != 'server.shutdown')
+        if retry:
+            if request.server is self._server:
+                # Sent again once the new process is started.
+                self._waiting.append(request)
+            else:
+                self._retry(request)
+        else:
+            self._fail(request, error)
+
+    def _complete(self, request, result):
+        if request.future.done():
+            return
+        request.future.set_result(result)
+        if request.callback is not None:
+            request.callback(request.method, **result)
+
+    def _fail(self, request, error):
+        if request.future.done():
+            return
+        request.future.set_exception(error)
+        if request.errback is not None:
+            # The error is handled by the errback.
+            request.future.exception()
+            request.errback(request.method, error)
+
+    def request(self, method, params=None, *, callback=None, errback=None,
+                **kwargs):
+        """Send a request to the current server process.
+
+        Takes the same arguments as :meth:`DartAnalysisServer.request`.
+        """
+        future = self._server._create_future()
+        request = _SupervisedRequest(method, params, future, callback,
+                                     errback, kwargs)
+        self._send(request)
+        return future
+
+    def notification(self, event, *, callback, files=None):
+        """Register a callback for notifications of every server process.
+
+        Returns a subscription that can be cancelled.
+        """
+        subscription = PoolSubscription(self, event, callback, files)
+        subscription.subscribe(0, self._server)
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def check_version(self, version):
+        return self._server.check_version(version)
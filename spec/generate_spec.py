@@ -48,11 +48,33 @@ def parse_fields(element):
         fields.append({
             'name': field_elem.get('name'),
             'type': parse_field_type(field_elem),
+            'value': field_elem.get('value'),
             'doc': parse_element_doc(field_elem)
         })
     return fields
 
 
+def parse_types(root):
+    types = []
+    for type_elem in root.findall('./body/types/type'):
+        spec_type = {
+            'name': type_elem.get('name'),
+            'doc': parse_element_doc(type_elem),
+        }
+        if type_elem.find('object') is not None:
+            spec_type['kind'] = 'object'
+            spec_type['fields'] = parse_fields(type_elem.find('object'))
+        elif type_elem.find('enum') is not None:
+            spec_type['kind'] = 'enum'
+            spec_type['values'] = [v.findtext('code').strip()
+                                   for v in type_elem.find('enum')]
+        else:
+            spec_type['kind'] = 'alias'
+            spec_type['type'] = parse_field_type(type_elem)
+        types.append(spec_type)
+    return types
+
+
 def camelcase_to_underscore(name):
     s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', name)
     return re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1).lower()
@@ -87,14 +109,139 @@ def parse_spec(filename):
             'doc': parse_element_doc(domain_elem)
         })
 
-    return {'domains': domains, 'version': version}
+    return {'domains': domains, 'types': parse_types(root),
+            'version': version}
+
+
+def object_types(spec):
+    # RequestError is handled by das.server.RequestError, and the fields of
+    # RefactoringFeedback and RefactoringOptions depend on the refactoring
+    # kind, so they are left as plain dicts.
+    return [t for t in spec['types']
+            if t['kind'] == 'object' and t['fields'] and
+            t['name'] != 'RequestError']
+
+
+def print_doc(lines, indent):
+    for i, line in enumerate(lines):
+        if i == 0:
+            line = '"""' + line
+        else:
+            print()
+
+        line = textwrap.fill(line)
+        print(textwrap.indent(line, prefix=indent))
+
+
+def generate_python_types(spec):
+    indent = '    '
+    for spec_type in spec['types']:
+        if spec_type['kind'] == 'enum':
+            print()
+            print()
+            print('class {name}:'.format(**spec_type))
+            print_doc(spec_type['doc'], indent)
+            print(textwrap.indent('"""', prefix=indent))
+            for value in spec_type['values']:
+                line = indent + "{0} = '{0}'".format(value)
+                if len(line) > 79:
+                    line = indent + "{0} = (\n{1}'{0}')".format(
+                        value, indent * 2)
+                print(line)
+
+    for spec_type in object_types(spec):
+        print()
+        print()
+        print('class {name}(SpecObject):'.format(**spec_type))
+        print_doc(spec_type['doc'], indent)
+
+        for field in spec_type['fields']:
+            print()
+            name = camelcase_to_underscore(field['name'])
+            doc = '\n'.join(field['doc'])
+            field_doc = ':ivar {name}: {doc}'.format(**locals())
+            line = textwrap.fill(field_doc, subsequent_indent='    ')
+            print(textwrap.indent(line, prefix=indent))
+            line = ':vartype {name}: {field[type]}'.format(**locals())
+            print(textwrap.indent(line, prefix=indent))
+        print(textwrap.indent('"""', prefix=indent))
+
+        attributes = [camelcase_to_underscore(f['name'])
+                      for f in spec_type['fields']]
+        attributes = ', '.join("'{}'".format(a) for a in attributes)
+        if len(spec_type['fields']) == 1:
+            attributes += ','
+        slots_def = '__slots__ = ({attributes})'.format(**locals())
+        sub_indent = ' ' * (slots_def.index('(') + 1)
+        line = textwrap.fill(slots_def, width=75, subsequent_indent=sub_indent)
+        print(textwrap.indent(line, prefix=indent))
+
+        print(indent + '_fields = (')
+        for field in spec_type['fields']:
+            name = camelcase_to_underscore(field['name'])
+            line = "('{field[name]}', '{name}', '{field[type]}'),"
+            print(indent * 2 + line.format(**locals()))
+        print(indent + ')')
+
+        defaults = {f['name']: f['value'] for f in spec_type['fields']
+                    if f['value'] is not None}
+        if defaults:
+            print(indent + '_defaults = {}'.format(defaults))
+
+
+def generate_type_table(name, members, object_names):
+    print()
+    print()
+    print('DartAnalysisServer.{name} = {{'.format(**locals()))
+    for member_name, fields in members:
+        # Only fields holding spec objects need to be decoded.
+        fields = [f for f in fields if not f['type'].startswith('(') and
+                  object_names.intersection(re.findall(r'\w+', f['type']))]
+        if not fields:
+            continue
+        print("    '{member_name}': {{".format(**locals()))
+        for field in fields:
+            line = "'{field[name]}': '{field[type]}',".format(**locals())
+            print('        ' + line)
+        print('    },')
+    print('}')
+
+
+def generate_field_table(name, members):
+    # All the fields, for the tools that need the whole protocol, like the
+    # fake server.
+    print()
+    print()
+    print('DartAnalysisServer.{name} = {{'.format(**locals()))
+    for member_name, fields in members:
+        if not fields:
+            print("    '{member_name}': {{}},".format(**locals()))
+            continue
+        print("    '{member_name}': {{".format(**locals()))
+        for field in fields:
+            line = "'{field[name]}': '{field[type]}',".format(**locals())
+            print('        ' + line)
+        print('    },')
+    print('}')
+
+
+def generate_alias_table(spec):
+    print()
+    print()
+    print('DartAnalysisServer.type_aliases = {')
+    for spec_type in spec['types']:
+        if spec_type['kind'] == 'alias':
+            print("    '{name}': '{type}',".format(**spec_type))
+    print('}')
 
 
 def generate_python_api(spec):
     print('from das.server import DartAnalysisServer')
+    print('from das.spec import SpecObject')
     print()
     print()
     print("DartAnalysisServer.api_version = {0}".format(spec['version']))
+    generate_python_types(spec)
     for domain in spec['domains']:
         print()
         print()
@@ -119,10 +266,11 @@ def generate_python_api(spec):
             method = camelcase_to_underscore(request['name'])
             params = [camelcase_to_underscore(p['name'])
                       for p in request['params']]
-            params = ', '.join(params + ['*', 'callback=None', 'errback=None'])
+            params = ', '.join(params + ['*', 'callback=None', 'errback=None',
+                                         '**kwargs'])
             method_def = '    def {method}(self, {params}):'.format(**locals())
             indent = ' ' * (method_def.index('(') + 1)
-            line = textwrap.fill(method_def, width=80,
+            line = textwrap.fill(method_def, width=79,
                                  subsequent_indent=indent)
             print()
             print(line)
@@ -166,6 +314,11 @@ def generate_python_api(spec):
                 line = ':type {name}: {param[type]}'.format(**locals())
                 print(textwrap.indent(line, prefix=indent))
 
+            print()
+            line = (':returns: A future resolved with a dict of the callback '
+                    'arguments.')
+            line = textwrap.fill(line, subsequent_indent='    ')
+            print(textwrap.indent(line, prefix=indent))
             print(textwrap.indent('"""', prefix=indent))
 
             method_name = domain['name'] + '.' + request['name']
@@ -182,14 +335,20 @@ def generate_python_api(spec):
                                  subsequent_indent=sub_indent)
             line = line.replace(':', ': ')
             print(textwrap.indent(line, prefix=indent))
-            kwargs = "callback=callback, errback=errback"
-            method = "self.server.request(method, params, {kwargs})"
-            print(textwrap.indent(method.format(**locals()), prefix=indent))
+            kwargs = "callback=callback, errback=errback, **kwargs"
+            method = "return self.server.request(method, params, {kwargs})"
+            method = indent + method.format(**locals())
+            sub_indent = ' ' * (method.index('(') + 1)
+            print(textwrap.fill(method, width=79, subsequent_indent=sub_indent,
+                                break_on_hyphens=False))
 
         for notification in domain['notifications']:
 
             method = camelcase_to_underscore(notification['name'])
-            method_def = '    def on_{method}(self, *, callback):'
+            param_names = [p['name'] for p in notification['params']]
+            has_file = 'file' in param_names
+            method_def = '    def on_{method}(self, *, callback{files}):'
+            files = ', files=None' if has_file else ''
             method_def = method_def.format(**locals())
             print()
             print(method_def)
@@ -204,6 +363,13 @@ def generate_python_api(spec):
                 line = textwrap.fill(line)
                 print(textwrap.indent(line, prefix=indent))
 
+            if has_file:
+                print()
+                line = (':param files: If given, only notifications about '
+                        'these files are delivered to the callback.')
+                line = textwrap.fill(line, subsequent_indent='    ')
+                print(textwrap.indent(line, prefix=indent))
+
             if notification['params']:
                 print()
                 print(textwrap.indent('Callback arguments:', prefix=indent))
@@ -219,13 +385,38 @@ def generate_python_api(spec):
                 print(textwrap.indent(line, prefix=indent))
                 line = ':type {name}: {param[type]}'.format(**locals())
                 print(textwrap.indent(line, prefix=indent))
+
+            print()
+            line = ':returns: A subscription that can be cancelled.'
+            print(textwrap.indent(line, prefix=indent))
             print(textwrap.indent('"""', prefix=indent))
 
             event_name = domain['name'] + '.' + notification['name']
             line = "event = '{event_name}'".format(**locals())
             print(textwrap.indent(line, prefix=indent))
-            method = "self.server.notification(event, callback=callback)"
-            print(textwrap.indent(method.format(**locals()), prefix=indent))
+            if has_file:
+                kwargs = 'callback=callback, files=files'
+            else:
+                kwargs = 'callback=callback'
+            method = "return self.server.notification(event, {kwargs})"
+            method = indent + method.format(**locals())
+            sub_indent = ' ' * (method.index('(') + 1)
+            print(textwrap.fill(method, width=79,
+                                subsequent_indent=sub_indent))
+
+    object_names = {t['name'] for t in object_types(spec)}
+    results = [(domain['name'] + '.' + request['name'], request['result'])
+               for domain in spec['domains']
+               for request in domain['requests']]
+    generate_type_table('result_types', results, object_names)
+    events = [(domain['name'] + '.' + notification['name'],
+               notification['params'])
+              for domain in spec['domains']
+              for notification in domain['notifications']]
+    generate_type_table('event_types', events, object_names)
+    generate_field_table('result_fields', results)
+    generate_field_table('event_fields', events)
+    generate_alias_table(spec)
 
 
 if __name__ == '__main__':
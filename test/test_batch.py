@@ -0,0 +1,111 @@
+import io
+import json
+import sys
+import textwrap
+import unittest
+
+from das import fake
+from das.api import AnalysisError, DartAnalysisServer, Location
+from das.batch import BatchAnalysis, JsonLinesWriter, SarifWriter
+from das.loop import EventLoop
+from das.pool import DartAnalysisServerPool
+from das.server import ServerExitedError
+
+
+class BatchAnalysisTest(unittest.TestCase):
+
+    def analyze(self, writer_class, processes=1, fail_on='ERROR'):
+        loop = EventLoop()
+        options = fake.launch_options(files=3)
+        if processes > 1:
+            server = DartAnalysisServerPool(
+                options.pop('dart_path'), options.pop('das_path'), loop,
+                size=processes, health_check_interval=0, **options)
+        else:
+            server = DartAnalysisServer(event_loop=loop, **options)
+        output = io.StringIO()
+        analysis = BatchAnalysis(server, loop, writer_class(output), fail_on)
+        status = analysis.run(['/project/a', '/project/b'], timeout=10)
+        return status, output.getvalue()
+
+    def test_json_lines(self):
+        status, output = self.analyze(JsonLinesWriter)
+        records = [json.loads(line) for line in output.splitlines()]
+        self.assertEqual(len(records), 6)
+        self.assertEqual(
+            sorted(record['file'] for record in records),
+            ['/project/a/file0.dart', '/project/a/file1.dart',
+             '/project/a/file2.dart', '/project/b/file0.dart',
+             '/project/b/file1.dart', '/project/b/file2.dart'])
+        # The fake server reports errors with the INFO severity.
+        self.assertEqual(records[0]['severity'], 'INFO')
+        self.assertEqual(status, 0)
+
+    def test_fail_on(self):
+        status, output = self.analyze(JsonLinesWriter, fail_on='INFO')
+        self.assertEqual(status, 1)
+
+    def test_sarif_pool(self):
+        status, output = self.analyze(SarifWriter, processes=2)
+        log = json.loads(output)
+        self.assertEqual(log['version'], '2.1.0')
+        results = log['runs'][0]['results']
+        self.assertEqual(len(results), 6)
+        self.assertEqual(results[0]['level'], 'note')
+        location = results[0]['locations'][0]['physicalLocation']
+        self.assertTrue(
+            location['artifactLocation']['uri'].startswith('file:///'))
+
+    def test_server_exit(self):
+        # Starts analyzing and exits before it is done.
+        script = textwrap.dedent('''
+            import json, sys
+            def send(message):
+                print(json.dumps(message), flush=True)
+            send({'event': 'server.connected', 'params': {'version': '1'}})
+            for line in sys.stdin:
+                request = json.loads(line)
+                send({'id': request['id'], 'result': {}})
+                if request['method'] == 'analysis.setAnalysisRoots':
+                    send({'event': 'server.status',
+                          'params': {'analysis': {'isAnalyzing': True}}})
+                    break
+        ''')
+        loop = EventLoop()
+        server = DartAnalysisServer(sys.executable, None, loop,
+                                    arguments=['-c', script])
+        analysis = BatchAnalysis(server, loop, JsonLinesWriter(io.StringIO()))
+        with self.assertRaises(ServerExitedError):
+            analysis.run(['/project'], timeout=10)
+
+    def test_last_report_counts(self):
+        output = io.StringIO()
+        analysis = BatchAnalysis(None, None, JsonLinesWriter(output), 'INFO')
+        error = AnalysisError(
+            severity='INFO', type='HINT', message='unused',
+            location=Location(file='/a.dart', offset=0, length=1,
+                              start_line=1, start_column=1))
+        analysis._on_errors('analysis.errors',
+                            {'file': '/a.dart', 'errors': [error]})
+        self.assertTrue(analysis.failed)
+        analysis._on_errors('analysis.errors',
+                            {'file': '/a.dart', 'errors': []})
+        self.assertFalse(analysis.failed)
+        self.assertEqual(analysis.errors, 0)
+        records = [json.loads(line)
+                   for line in output.getvalue().splitlines()]
+        self.assertEqual(records[-1], {'file': '/a.dart', 'errors': 0})
+
+    def test_sarif_clean(self):
+        output = io.StringIO()
+        writer = SarifWriter(output)
+        writer.clean('/a.dart')
+        writer.close()
+        result, = json.loads(output.getvalue())['runs'][0]['results']
+        self.assertEqual(result['kind'], 'pass')
+
+    def test_sarif_empty(self):
+        output = io.StringIO()
+        SarifWriter(output).close()
+        self.assertEqual(json.loads(output.getvalue())['runs'][0]['results'],
+                         [])
@@ -0,0 +1,70 @@
+import unittest
+
+from das.cache import ResponseCache
+from test.tools import RecordingServer
+
+
+class ResponseCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.das = RecordingServer()
+        self.sent = self.das.sent
+        self.cache = ResponseCache(self.das, maxsize=2)
+
+    def hover(self, file='/a.dart', offset=1):
+        future = self.cache.analysis.get_hover(file, offset)
+        if not future.done():
+            self.das.receive(
+                id=self.sent[-1]['id'],
+                result={'hovers': [{'offset': offset, 'length': 1}]})
+        return future.result()
+
+    def test_hit(self):
+        first = self.hover()
+        received = []
+        second = self.cache.analysis.get_hover(
+            '/a.dart', 1, callback=lambda m, hovers: received.append(hovers))
+        self.assertEqual(len(self.sent), 1)
+        self.assertEqual(second.result(), first)
+        self.assertEqual(received, [first['hovers']])
+        self.assertEqual(self.cache.info()['hits'], 1)
+        self.assertEqual(self.cache.info()['misses'], 1)
+
+    def test_update_content(self):
+        self.hover()
+        self.das.analysis.update_content({'/a.dart': {'type': 'remove'}})
+        self.hover()
+        self.assertEqual(self.cache.info()['misses'], 2)
+        self.hover('/b.dart')
+        self.hover('/b.dart')
+        self.assertEqual(self.cache.info()['hits'], 1)
+
+    def test_invalidate(self):
+        self.hover()
+        self.das.receive(event='analysis.invalidate',
+                         params={'file': '/a.dart', 'offset': 0, 'length': 1,
+                                 'delta': 1})
+        self.hover()
+        self.assertEqual(self.cache.info()['misses'], 2)
+
+    def test_stale_response_not_stored(self):
+        future = self.cache.analysis.get_hover('/a.dart', 1)
+        self.das.analysis.update_content({'/a.dart': {'type': 'remove'}})
+        self.das.receive(id=self.sent[0]['id'], result={'hovers': []})
+        self.assertEqual(future.result(), {'hovers': []})
+        self.assertEqual(self.cache.info()['size'], 0)
+
+    def test_lru(self):
+        self.hover(offset=1)
+        self.hover(offset=2)
+        self.hover(offset=1)
+        self.hover(offset=3)
+        self.assertEqual(self.cache.info()['evictions'], 1)
+        self.hover(offset=1)
+        self.assertEqual(self.cache.info()['hits'], 2)
+
+    def test_not_cached(self):
+        self.cache.edit.sort_members('/a.dart')
+        self.cache.edit.sort_members('/a.dart')
+        self.assertEqual(len(self.sent), 2)
+        self.assertEqual(self.cache.info()['misses'], 0)
@@ -0,0 +1,38 @@
+import unittest
+
+from das.api import AddContentOverlay, DartAnalysisServer
+from das.codec import StdlibCodec, available_codecs, get_codec
+
+
+class CodecTest(unittest.TestCase):
+
+    def test_roundtrip(self):
+        body = {'id': '1', 'params': {'file': '/ñ.dart', 'offset': 3}}
+        for name in available_codecs():
+            codec = get_codec(name)
+            data = codec.dumps(body)
+            self.assertIsInstance(data, bytes)
+            self.assertNotIn(b'\n', data)
+            self.assertEqual(codec.loads(data), body)
+
+    def test_encode_spec_objects(self):
+        overlay = AddContentOverlay(content='main() {}')
+        for name in available_codecs():
+            codec = get_codec(name)
+            data = codec.loads(codec.dumps({'files': {'a.dart': overlay}}))
+            self.assertEqual(data['files']['a.dart']['type'], 'add')
+
+    def test_default_codec(self):
+        self.assertEqual(get_codec().name, available_codecs()[0])
+        self.assertIn('json', available_codecs())
+
+    def test_unknown_codec(self):
+        with self.assertRaises(ValueError):
+            get_codec('pickle')
+
+    def test_server_codec(self):
+        das = DartAnalysisServer('dart', 'das', None, codec='json')
+        self.assertIsInstance(das.codec, StdlibCodec)
+        codec = StdlibCodec()
+        das = DartAnalysisServer('dart', 'das', None, codec=codec)
+        self.assertIs(das.codec, codec)
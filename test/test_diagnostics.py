@@ -0,0 +1,74 @@
+import json
+import unittest
+from unittest import mock
+
+from das.api import AnalysisError, DartAnalysisServer
+from das.diagnostics import DiagnosticsStore
+from test.tools import ImmediateEventLoop
+
+
+def error(severity='ERROR', error_type='COMPILE_TIME_ERROR'):
+    return {
+        'severity': severity,
+        'type': error_type,
+        'location': {'file': 'x', 'offset': 0, 'length': 1,
+                     'startLine': 1, 'startColumn': 1},
+        'message': 'Error',
+    }
+
+
+class DiagnosticsStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.das = DartAnalysisServer('dart', 'das', ImmediateEventLoop())
+        self.das._process = mock.Mock()
+        self.store = DiagnosticsStore(self.das)
+
+    def notify(self, event, **params):
+        body = {'event': event, 'params': params}
+        self.das._handle_message(json.dumps(body).encode('utf-8'))
+
+    def test_errors(self):
+        self.notify('analysis.errors', file='/p/lib/a.dart',
+                    errors=[error(), error('INFO', 'HINT')])
+        errors = self.store.errors('/p/lib/a.dart')
+        self.assertEqual(len(errors), 2)
+        self.assertIsInstance(errors[0], AnalysisError)
+        self.assertEqual(self.store.errors('/p/lib/b.dart'), [])
+        self.assertEqual(self.store.counts(), {
+            'severity': {'ERROR': 1, 'INFO': 1},
+            'type': {'COMPILE_TIME_ERROR': 1, 'HINT': 1},
+        })
+
+    def test_replace(self):
+        self.notify('analysis.errors', file='/p/a.dart',
+                    errors=[error(), error()])
+        self.notify('analysis.errors', file='/p/a.dart',
+                    errors=[error('WARNING')])
+        self.assertEqual(self.store.counts()['severity'], {'WARNING': 1})
+        self.notify('analysis.errors', file='/p/a.dart', errors=[])
+        self.assertNotIn('/p/a.dart', self.store)
+        self.assertEqual(self.store.counts()['severity'], {})
+
+    def test_flush_results(self):
+        self.notify('analysis.errors', file='/p/a.dart', errors=[error()])
+        self.notify('analysis.errors', file='/p/b.dart', errors=[error()])
+        self.notify('analysis.flushResults', files=['/p/a.dart'])
+        self.assertEqual(self.store.files(), ['/p/b.dart'])
+        self.assertEqual(len(self.store), 1)
+
+    def test_directory(self):
+        for file in ['/p/lib/a.dart', '/p/lib/src/b.dart', '/p/library.dart',
+                     '/p/test/a_test.dart']:
+            self.notify('analysis.errors', file=file, errors=[error()])
+        self.assertEqual(self.store.files('/p/lib'),
+                         ['/p/lib/a.dart', '/p/lib/src/b.dart'])
+        self.assertEqual(self.store.counts('/p/lib/')['severity'],
+                         {'ERROR': 2})
+        self.assertEqual(self.store.items('/p/test')[0][0],
+                         '/p/test/a_test.dart')
+
+    def test_close(self):
+        self.store.close()
+        self.notify('analysis.errors', file='/p/a.dart', errors=[error()])
+        self.assertEqual(len(self.store), 0)
@@ -0,0 +1,106 @@
+import asyncio
+import io
+import json
+import sys
+import unittest
+
+from das import fake
+from das.api import DartAnalysisServer, NavigationRegion
+from das.fake import FakeServer, PayloadFactory
+from das.server import AsyncioDartAnalysisServer, RequestError
+
+
+def run_fake(*requests, **options):
+    lines = b''.join(json.dumps(request).encode('utf-8') + b'\n'
+                     for request in requests)
+    output = io.BytesIO()
+    FakeServer(io.BytesIO(lines), output, **options).run()
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+class PayloadFactoryTest(unittest.TestCase):
+
+    def test_all_results_decode(self):
+        das = DartAnalysisServer('dart', 'das', None)
+        payloads = PayloadFactory(items=3)
+        for method, fields in DartAnalysisServer.result_fields.items():
+            result = json.loads(json.dumps(payloads.fields(fields)))
+            das._decode(method, result, DartAnalysisServer.result_types)
+        for event, fields in DartAnalysisServer.event_fields.items():
+            params = json.loads(json.dumps(payloads.fields(fields)))
+            das._decode(event, params, DartAnalysisServer.event_types)
+
+    def test_items(self):
+        fields = DartAnalysisServer.result_fields['analysis.getNavigation']
+        result = PayloadFactory(items=5).fields(fields)
+        self.assertEqual(len(result['regions']), 5)
+        region = NavigationRegion.from_json(result['regions'][0])
+        self.assertEqual(len(region.targets), 1)
+
+
+class FakeServerTest(unittest.TestCase):
+
+    def test_requests(self):
+        messages = run_fake(
+            {'id': '0', 'method': 'server.getVersion'},
+            {'id': '1', 'method': 'search.findMemberReferences',
+             'params': {'name': 'build'}},
+            {'id': '2', 'method': 'unknown.method'},
+            {'id': '3', 'method': 'server.shutdown'},
+            {'id': '4', 'method': 'server.getVersion'})
+        self.assertEqual(messages[0]['event'], 'server.connected')
+        self.assertEqual(messages[1], {'id': '0',
+                                       'result': {'version': fake.VERSION}})
+        self.assertEqual(messages[2], {'id': '1', 'result': {'id': '1'}})
+        self.assertEqual(messages[3]['event'], 'search.results')
+        self.assertEqual(messages[3]['params']['id'], '1')
+        self.assertTrue(messages[3]['params']['isLast'])
+        self.assertEqual(messages[4]['error']['code'], 'UNKNOWN_REQUEST')
+        self.assertEqual(messages[5], {'id': '3', 'result': {}})
+        self.assertEqual(len(messages), 6)
+
+    def test_flood(self):
+        flood = ('analysis.highlights', 0, 4)
+        server = FakeServer(io.BytesIO(), io.BytesIO(), floods=[flood],
+                            files=2)
+        server.flood(*flood)
+        messages = [json.loads(line)
+                    for line in server._output.getvalue().splitlines()]
+        self.assertEqual([m['params']['file'] for m in messages],
+                         ['/fake/file0.dart', '/fake/file1.dart'] * 2)
+
+
+class LaunchTest(unittest.TestCase):
+
+    def test_launch_command(self):
+        das = DartAnalysisServer(event_loop=None,
+                                 **fake.launch_options(items=2))
+        self.assertEqual(das._path[:5], [sys.executable, '-m', 'das.fake',
+                                         '--items', '2'])
+
+    def test_launch(self):
+        async def session():
+            das = AsyncioDartAnalysisServer(**fake.launch_options(
+                items=2, delays={'analysis.getHover': 0.01},
+                floods=[('analysis.errors', 0, 20)]))
+            connected = asyncio.get_running_loop().create_future()
+            das.notification('server.connected',
+                             callback=lambda *args: connected.set_result(1))
+            errors = []
+            das.notification('analysis.errors',
+                             callback=lambda event, params: errors.append(
+                                 params['file']))
+            await das.start()
+            await connected
+            version = await das.server.get_version()
+            hover = await das.analysis.get_hover('/a.dart', 1)
+            with self.assertRaises(RequestError):
+                await das.request('unknown.method')
+            await das.server.shutdown()
+            await das.stop(timeout=5)
+            return version, hover, errors
+
+        version, hover, errors = asyncio.run(session())
+        self.assertEqual(version['version'], fake.VERSION)
+        self.assertEqual(len(hover['hovers']), 2)
+        self.assertEqual(len(errors), 20)
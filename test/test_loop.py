@@ -0,0 +1,89 @@
+import concurrent.futures
+import threading
+import time
+import unittest
+
+from das.loop import EventLoop
+
+
+class EventLoopTest(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = EventLoop()
+        self.calls = []
+
+    def test_call_soon(self):
+        self.loop.call_soon(self.calls.append, 1)
+        self.loop.call_soon(self.calls.append, 2)
+        self.loop.call_soon(self.loop.stop)
+        self.loop.run_forever()
+        self.assertEqual(self.calls, [1, 2])
+
+    def test_timers_in_order(self):
+        self.loop.call_later(0.02, self.calls.append, 'b')
+        self.loop.call_later(0.01, self.calls.append, 'a')
+        self.loop.call_later(0.02, self.calls.append, 'c')
+        self.loop.call_later(0.03, self.loop.stop)
+        self.loop.run_forever()
+        self.assertEqual(self.calls, ['a', 'b', 'c'])
+
+    def test_timer_deadline(self):
+        started = time.monotonic()
+        self.loop.call_later(0.05, lambda: self.calls.append(
+            time.monotonic() - started))
+        self.loop.call_later(0.05, self.loop.stop)
+        self.loop.run_forever()
+        self.assertGreaterEqual(self.calls[0], 0.05)
+        self.assertLess(self.calls[0], 0.1)
+
+    def test_cancel(self):
+        handle = self.loop.call_later(0.01, self.calls.append, 1)
+        handle.cancel()
+        self.loop.call_later(0.02, self.loop.stop)
+        self.loop.run_forever()
+        self.assertEqual(self.calls, [])
+
+    def test_threadsafe_wakeup(self):
+        future = concurrent.futures.Future()
+        sent = []
+
+        def set_result():
+            sent.append(time.monotonic())
+            self.loop.call_soon_threadsafe(future.set_result, 42)
+
+        threading.Timer(0.02, set_result).start()
+        self.assertEqual(self.loop.run_until_complete(future, timeout=5), 42)
+        # The loop woke up right away, not on a polling tick.
+        self.assertLess(time.monotonic() - sent[0], 0.05)
+
+    def test_run_until_complete_timeout(self):
+        future = concurrent.futures.Future()
+        with self.assertRaises(TimeoutError):
+            self.loop.run_until_complete(future, timeout=0.01)
+
+    def test_late_future_after_timeout(self):
+        late = concurrent.futures.Future()
+        with self.assertRaises(TimeoutError):
+            self.loop.run_until_complete(late, timeout=0.01)
+        late.set_result(None)
+        future = concurrent.futures.Future()
+        self.loop.call_later(0.01, future.set_result, 42)
+        self.assertEqual(self.loop.run_until_complete(future, timeout=5), 42)
+
+    def test_run_until_complete_stopped(self):
+        self.loop.call_soon(self.loop.stop)
+        with self.assertRaises(RuntimeError):
+            self.loop.run_until_complete(concurrent.futures.Future())
+
+    def test_callback_error(self):
+        def fail():
+            raise RuntimeError('error')
+
+        self.loop.call_soon(fail)
+        self.loop.call_soon(self.calls.append, 1)
+        with self.assertRaises(RuntimeError):
+            self.loop.run_forever()
+        self.assertEqual(self.calls, [])
+        self.loop.call_soon(self.loop.stop)
+        self.loop.run_forever()
+        self.assertEqual(self.calls, [1])
@@ -0,0 +1,208 @@
+import json
+import threading
+import unittest
+from unittest import mock
+
+from das.api import AddContentOverlay, DartAnalysisServer, NavigationRegion
+from das.server import LazyParams, _freeze
+from test.tools import ImmediateEventLoop
+
+
+def message(**body):
+    return json.dumps(body).encode('utf-8') + b'\n'
+
+
+class MessageRoutingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.das = DartAnalysisServer('dart', 'das', ImmediateEventLoop())
+        self.das._process = mock.Mock()
+        self.das._write = mock.Mock()
+
+    def test_unsubscribed_event_not_decoded(self):
+        with mock.patch.object(self.das.codec, 'loads') as loads:
+            self.das._handle_message(message(event='analysis.navigation',
+                                             params={}))
+        loads.assert_not_called()
+
+    def test_event_decoded_on_access(self):
+        received = []
+        self.das.notification('analysis.navigation',
+                              callback=lambda e, p: received.append(p))
+        with mock.patch.object(self.das.codec, 'loads',
+                               wraps=self.das.codec.loads) as loads:
+            self.das._handle_message(message(
+                event='analysis.navigation',
+                params={'file': 'a.dart', 'files': [], 'targets': [],
+                        'regions': [{'offset': 1, 'length': 2,
+                                     'targets': [0]}]}))
+            self.assertIsInstance(received[0], LazyParams)
+            loads.assert_not_called()
+            regions = received[0]['regions']
+            self.assertEqual(loads.call_count, 1)
+        self.assertIsInstance(regions[0], NavigationRegion)
+        self.assertEqual(received[0]['file'], 'a.dart')
+
+    def test_response_without_request_not_decoded(self):
+        with mock.patch.object(self.das.codec, 'loads') as loads:
+            self.das._handle_message(message(id='42', result={}))
+        loads.assert_not_called()
+
+    def test_response(self):
+        future = self.das.request('server.getVersion')
+        self.das._handle_message(message(id='0', result={'version': '1.9'}))
+        self.assertEqual(future.result(), {'version': '1.9'})
+
+    def test_superseded_request(self):
+        received = []
+        first = self.das.analysis.get_hover(
+            'a.dart', 1, supersede=('hover', 'a.dart'),
+            callback=lambda method, hovers: received.append(1))
+        second = self.das.analysis.get_hover(
+            'a.dart', 2, supersede=('hover', 'a.dart'),
+            callback=lambda method, hovers: received.append(2))
+        other = self.das.analysis.get_hover(
+            'b.dart', 1, supersede=('hover', 'b.dart'))
+        self.assertTrue(first.cancelled())
+        self.assertEqual(self.das.pending_requests, 2)
+
+        with mock.patch.object(self.das.codec, 'loads',
+                               wraps=self.das.codec.loads) as loads:
+            self.das._handle_message(message(id='0', result={'hovers': []}))
+            loads.assert_not_called()
+            self.das._handle_message(message(id='1', result={'hovers': []}))
+            self.das._handle_message(message(id='2', result={'hovers': []}))
+        self.assertEqual(received, [2])
+        self.assertEqual(second.result(), {'hovers': []})
+        self.assertEqual(other.result(), {'hovers': []})
+        stats = self.das.get_stats()['methods']['analysis.getHover']
+        self.assertEqual(stats['superseded'], 1)
+        self.assertEqual(self.das._supersede_keys, {})
+
+    def test_coalesced_requests(self):
+        received = []
+        futures = [
+            self.das.analysis.get_errors(
+                'a.dart', callback=lambda method, errors: received.append(1)),
+            self.das.request('analysis.getErrors', {'file': 'a.dart'}),
+            self.das.analysis.get_errors('b.dart'),
+        ]
+        self.assertEqual(self.das._write.call_count, 2)
+        self.das._handle_message(message(id='0', result={'errors': []}))
+        self.assertEqual(futures[0].result(), {'errors': []})
+        self.assertEqual(futures[1].result(), {'errors': []})
+        self.assertFalse(futures[2].done())
+        self.assertEqual(received, [1])
+
+        # Once answered, the same request is sent again.
+        self.das.analysis.get_errors('a.dart')
+        self.assertEqual(self.das._write.call_count, 3)
+        stats = self.das.get_stats()['methods']['analysis.getErrors']
+        self.assertEqual(stats['coalesced'], 1)
+
+    def test_coalesced_error(self):
+        errors = []
+        futures = [self.das.analysis.get_hover(
+            'a.dart', 1, errback=lambda method, error: errors.append(error))
+            for _ in range(2)]
+        self.das._handle_message(message(id='0', error={
+            'code': 'GET_ERRORS_INVALID_FILE', 'message': 'invalid'}))
+        self.assertEqual(len(errors), 2)
+        self.assertIs(futures[1].exception(), errors[1])
+
+    def test_coalesced_by_timeout(self):
+        self.das.analysis.get_errors('a.dart')
+        self.das.analysis.get_errors('a.dart', timeout=0.2)
+        self.das.analysis.get_errors('a.dart', timeout=0.2)
+        self.assertEqual(self.das._write.call_count, 2)
+
+    def test_coalesced_after_write_error(self):
+        self.das._write.side_effect = OSError('broken pipe')
+        with self.assertRaises(OSError):
+            self.das.analysis.get_errors('a.dart')
+        self.assertEqual(self.das.pending_requests, 0)
+        self.das._write.side_effect = None
+        self.das.analysis.get_errors('a.dart')
+        self.assertEqual(self.das._write.call_count, 2)
+        self.assertEqual(self.das.pending_requests, 1)
+
+    def test_coalesced_from_other_threads(self):
+        # Requests joining one while it completes on another thread are
+        # either completed with it or sent again.
+        futures = []
+
+        def make_requests():
+            for _ in range(2000):
+                futures.append(self.das.analysis.get_errors('a.dart'))
+
+        thread = threading.Thread(target=make_requests)
+        thread.start()
+        answered = 0
+        while thread.is_alive() or answered < self.das._write.call_count:
+            if answered < self.das._write.call_count:
+                data = self.das._write.call_args_list[answered][0][0]
+                request_id = json.loads(data)['id']
+                self.das._handle_message(message(id=request_id,
+                                                 result={'errors': []}))
+                answered += 1
+        thread.join()
+        self.assertTrue(all(future.done() for future in futures))
+
+    def test_freeze_spec_objects(self):
+        self.assertEqual(
+            _freeze({'files': {'a': AddContentOverlay(content='x')}}),
+            _freeze({'files': {'a': {'content': 'x', 'type': 'add'}}}))
+
+    def test_unordered_message(self):
+        received = []
+        self.das.notification('server.connected',
+                              callback=lambda e, p: received.append(p))
+        self.das._handle_message(b'{"params": {"version": "1.9"}, '
+                                 b'"event": "server.connected"}\n')
+        self.assertEqual(dict(received[0]), {'version': '1.9'})
+
+
+class SubscriptionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.das = DartAnalysisServer('dart', 'das', ImmediateEventLoop())
+        self.das._process = mock.Mock()
+
+    def errors(self, file):
+        return message(event='analysis.errors',
+                       params={'file': file, 'errors': []})
+
+    def test_fan_out(self):
+        first, second = [], []
+        self.das.analysis.on_errors(callback=lambda e, p: first.append(p))
+        self.das.analysis.on_errors(callback=lambda e, p: second.append(p))
+        with mock.patch.object(self.das.codec, 'loads',
+                               wraps=self.das.codec.loads) as loads:
+            self.das._handle_message(self.errors('a.dart'))
+            self.assertEqual(first[0]['file'], 'a.dart')
+            self.assertEqual(second[0]['errors'], [])
+            self.assertEqual(loads.call_count, 1)
+
+    def test_cancel(self):
+        received = []
+        subscription = self.das.analysis.on_errors(
+            callback=lambda e, p: received.append(p))
+        self.das._handle_message(self.errors('a.dart'))
+        subscription.cancel()
+        subscription.cancel()
+        self.das._handle_message(self.errors('a.dart'))
+        self.assertEqual(len(received), 1)
+        self.assertNotIn('analysis.errors', self.das._event_callbacks)
+
+    def test_files(self):
+        received = []
+        self.das.analysis.on_errors(callback=lambda e, p: received.append(p),
+                                    files=['b.dart', 'c:\\d.dart'])
+        with mock.patch.object(self.das.codec, 'loads',
+                               wraps=self.das.codec.loads) as loads:
+            self.das._handle_message(self.errors('a.dart'))
+            loads.assert_not_called()
+        self.das._handle_message(self.errors('b.dart'))
+        self.das._handle_message(self.errors('c:\\d.dart'))
+        self.assertEqual([p['file'] for p in received],
+                         ['b.dart', 'c:\\d.dart'])
@@ -0,0 +1,133 @@
+import random
+import unittest
+
+from das.overlay import OverlayManager, apply_edit, compute_edits
+from test.tools import RecordingServer
+
+
+def apply_edits(content, edits):
+    for edit in edits:
+        content = apply_edit(content, edit.offset, edit.length,
+                             edit.replacement)
+    return content
+
+
+class ManualEventLoop:
+    """Event loop stand-in running timers only when asked to."""
+
+    def __init__(self):
+        self.timers = []
+
+    def call_soon_threadsafe(self, callback, *args):
+        callback(*args)
+
+    def call_later(self, delay, callback, *args):
+        self.timers.append((callback, args))
+
+    def run_timers(self):
+        timers, self.timers = self.timers, []
+        for callback, args in timers:
+            callback(*args)
+
+
+class ComputeEditsTest(unittest.TestCase):
+
+    def test_no_change(self):
+        self.assertEqual(compute_edits('abc', 'abc'), [])
+
+    def test_single_edit(self):
+        edits = compute_edits('main() {}', 'main() { print(1); }')
+        self.assertEqual(len(edits), 1)
+        self.assertEqual(edits[0].offset, 8)
+        self.assertEqual(edits[0].length, 0)
+        self.assertEqual(edits[0].replacement, ' print(1); ')
+
+    def test_repeated_characters(self):
+        edits = compute_edits('aaaa', 'aaaaa')
+        self.assertEqual(apply_edits('aaaa', edits), 'aaaaa')
+        self.assertEqual(edits[0].length, 0)
+
+    def test_utf16_offsets(self):
+        edits = compute_edits('a\U0001f600b = 1;', 'a\U0001f600b = 2;')
+        self.assertEqual(edits[0].offset, 7)
+        edits = compute_edits('\U0001f600\U0001f600x', '\U0001f600y')
+        self.assertEqual((edits[0].offset, edits[0].length), (2, 3))
+        self.assertEqual(apply_edits('\U0001f600\U0001f600x', edits),
+                         '\U0001f600y')
+
+    def test_large_file_utf16(self):
+        lines = ['\U0001f600 {}\n'.format(i) for i in range(2000)]
+        new_lines = list(lines)
+        new_lines[100] = new_lines[1900] = 'changed\n'
+        old, new = ''.join(lines), ''.join(new_lines)
+        edits = compute_edits(old, new)
+        self.assertEqual(len(edits), 2)
+        self.assertEqual(apply_edits(old, edits), new)
+
+    def test_large_file(self):
+        rng = random.Random(0)
+        lines = ['line {}\n'.format(i) for i in range(10000)]
+        new_lines = list(lines)
+        for index in sorted(rng.sample(range(10000), 5)):
+            new_lines[index] = 'changed {}\n'.format(index)
+        old, new = ''.join(lines), ''.join(new_lines)
+        edits = compute_edits(old, new)
+        self.assertEqual(apply_edits(old, edits), new)
+        self.assertLess(sum(len(e.replacement) for e in edits), 200)
+
+    def test_random_changes(self):
+        rng = random.Random(1)
+        old = ''.join(rng.choice('ab\n') for _ in range(3000))
+        for _ in range(20):
+            new = list(old)
+            for _ in range(rng.randrange(1, 10)):
+                position = rng.randrange(len(new))
+                new[position:position + rng.randrange(50)] = (
+                    rng.choice('abc\n') * rng.randrange(50))
+            new = ''.join(new)
+            self.assertEqual(apply_edits(old, compute_edits(old, new)), new)
+            old = new
+
+
+class OverlayManagerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = ManualEventLoop()
+        self.das = RecordingServer(event_loop=self.loop)
+        self.sent = self.das.sent
+        self.overlays = OverlayManager(self.das)
+
+    def files(self):
+        return self.sent[-1]['params']['files']
+
+    def test_coalesce(self):
+        self.overlays.update('/a.dart', 'main() {}')
+        self.loop.run_timers()
+        self.assertEqual(self.files(), {
+            '/a.dart': {'type': 'add', 'content': 'main() {}'}})
+
+        self.overlays.update('/a.dart', 'main() {p}')
+        self.overlays.update('/a.dart', 'main() {pr}')
+        self.overlays.update('/b.dart', 'b')
+        self.assertEqual(len(self.loop.timers), 1)
+        self.loop.run_timers()
+        self.assertEqual(len(self.sent), 2)
+        self.assertEqual(self.files(), {
+            '/a.dart': {'type': 'change', 'edits': [
+                {'offset': 8, 'length': 0, 'replacement': 'pr'}]},
+            '/b.dart': {'type': 'add', 'content': 'b'},
+        })
+
+    def test_unchanged_content(self):
+        self.overlays.update('/a.dart', 'a')
+        self.overlays.flush()
+        self.overlays.update('/a.dart', 'a')
+        self.assertIsNone(self.overlays.flush())
+        self.assertEqual(len(self.sent), 1)
+
+    def test_remove(self):
+        self.overlays.update('/a.dart', 'a')
+        self.overlays.flush()
+        self.overlays.remove('/a.dart')
+        self.assertEqual(self.files(), {'/a.dart': {'type': 'remove'}})
+        self.assertIsNone(self.overlays.content('/a.dart'))
@@ -0,0 +1,227 @@
+import asyncio
+import json
+import unittest
+
+from das import fake
+from das.pool import DartAnalysisServerPool
+from das.server import AsyncioDartAnalysisServer
+from test.tools import ImmediateEventLoop, RecordingServer
+
+
+class DartAnalysisServerPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = DartAnalysisServerPool(
+            'dart', 'das', ImmediateEventLoop(), 2,
+            server_class=RecordingServer)
+        self.pool.start()
+        self.pool.analysis.set_analysis_roots(
+            ['/a', '/b', '/b/nested'], ['/a/build'], None)
+
+    def sent(self, index):
+        return self.pool.servers[index].sent
+
+    def test_shard_roots(self):
+        self.assertEqual(self.sent(0)[0]['params']['included'],
+                         ['/a', '/b/nested'])
+        self.assertEqual(self.sent(0)[0]['params']['excluded'], ['/a/build'])
+        self.assertEqual(self.sent(1)[0]['params']['included'], ['/b'])
+        self.assertEqual(self.sent(1)[0]['params']['excluded'], [])
+
+    def test_route_by_file(self):
+        self.assertEqual(self.pool.owner('/a/lib/main.dart'), 0)
+        self.assertEqual(self.pool.owner('/b/lib/main.dart'), 1)
+        self.assertEqual(self.pool.owner('/b/nested/main.dart'), 0)
+        self.assertEqual(self.pool.owner('/bc/main.dart'),
+                         self.pool.owner('/bc/main.dart'))
+
+        self.pool.analysis.get_hover('/b/lib/main.dart', 10)
+        self.assertEqual(self.sent(1)[-1]['method'], 'analysis.getHover')
+        self.assertEqual(len(self.sent(0)), 1)
+
+    def test_split_update_content(self):
+        self.pool.analysis.update_content({
+            '/a/main.dart': {'type': 'remove'},
+            '/b/main.dart': {'type': 'remove'},
+        })
+        self.assertEqual(list(self.sent(0)[-1]['params']['files']),
+                         ['/a/main.dart'])
+        self.assertEqual(list(self.sent(1)[-1]['params']['files']),
+                         ['/b/main.dart'])
+
+    def test_gather(self):
+        for index in range(2):
+            self.pool.servers[index].respond()
+        future = self.pool.analysis.set_priority_files(['/a/main.dart'])
+        self.assertEqual(self.sent(1)[-1]['params'], {'files': []})
+        self.pool.servers[0].respond()
+        self.assertFalse(future.done())
+        self.pool.servers[1].respond()
+        self.assertEqual(future.result(), {})
+
+    def search_results(self, index, search_id, count, is_last):
+        result = {
+            'location': {'file': '/a.dart', 'offset': 0, 'length': 1,
+                         'startLine': 1, 'startColumn': 1},
+            'kind': 'REFERENCE', 'isPotential': False, 'path': [],
+        }
+        self.pool.servers[index]._handle_message(json.dumps({
+            'event': 'search.results',
+            'params': {'id': search_id, 'results': [result] * count,
+                       'isLast': is_last},
+        }).encode('utf-8'))
+
+    def test_workspace_search(self):
+        for index in range(2):
+            self.pool.servers[index].respond()
+        received = []
+        self.pool.notification(
+            'search.results',
+            callback=lambda e, p: received.append(
+                (p['id'], len(p['results']), p['isLast'])))
+        future = self.pool.search.find_member_references('build')
+        self.assertEqual(self.sent(0)[-1]['method'],
+                         'search.findMemberReferences')
+        self.assertEqual(self.sent(1)[-1]['method'],
+                         'search.findMemberReferences')
+        self.pool.servers[1].respond({'id': 's1'})
+        search_id = future.result()['id']
+        self.search_results(1, 's1', 2, True)
+        self.pool.servers[0].respond({'id': 's1'})
+        self.search_results(0, 's1', 1, False)
+        self.search_results(0, 's1', 3, True)
+        self.assertEqual(received, [(search_id, 2, False),
+                                    (search_id, 1, False),
+                                    (search_id, 3, True)])
+
+    def test_search_abandoned_on_restart(self):
+        for index in range(2):
+            self.pool.servers[index].respond()
+        received = []
+        self.pool.notification(
+            'search.results',
+            callback=lambda e, p: received.append(p['isLast']))
+        self.pool.search.find_top_level_declarations('A.*')
+        self.pool.servers[0].respond({'id': 's1'})
+        self.pool.servers[1].respond({'id': 's1'})
+        self.search_results(0, 's1', 1, True)
+        self.pool.servers[1].stop()
+        self.pool._health_check()
+        self.assertEqual(received, [False, True])
+
+    def test_completion_ids(self):
+        for index in range(2):
+            self.pool.servers[index].respond()
+        received = []
+        self.pool.notification(
+            'completion.results',
+            callback=lambda e, p: received.append((p['id'], p['isLast'])))
+        first = self.pool.completion.get_suggestions('/a/main.dart', 0)
+        second = self.pool.completion.get_suggestions('/b/main.dart', 0)
+        # Both servers use the same ids.
+        self.pool.servers[0].respond({'id': '0'})
+        self.pool.servers[1].respond({'id': '0'})
+        first_id = first.result()['id']
+        second_id = second.result()['id']
+        self.assertNotEqual(first_id, second_id)
+        for index in (1, 0):
+            self.pool.servers[index]._handle_message(json.dumps({
+                'event': 'completion.results',
+                'params': {'id': '0', 'replacementOffset': 0,
+                           'replacementLength': 0, 'results': [],
+                           'isLast': True},
+            }).encode('utf-8'))
+        self.assertEqual(received, [(second_id, True), (first_id, True)])
+
+    def test_execution_contexts(self):
+        for index in range(2):
+            self.pool.servers[index].respond()
+        first = self.pool.execution.create_context('/a')
+        second = self.pool.execution.create_context('/b')
+        self.pool.servers[0].respond({'id': '0'})
+        self.pool.servers[1].respond({'id': '0'})
+        first_id = first.result()['id']
+        second_id = second.result()['id']
+        self.assertNotEqual(first_id, second_id)
+
+        self.pool.execution.map_uri(second_id, '/a/main.dart', None)
+        self.assertEqual(self.sent(1)[-1]['method'], 'execution.mapUri')
+        self.assertEqual(self.sent(1)[-1]['params']['id'], '0')
+        self.pool.execution.delete_context(first_id)
+        self.assertEqual(self.sent(0)[-1]['method'],
+                         'execution.deleteContext')
+        self.assertEqual(self.sent(0)[-1]['params'], {'id': '0'})
+        future = self.pool.execution.delete_context(first_id)
+        self.assertEqual(future.exception().code, 'INVALID_EXECUTION_CONTEXT')
+
+        # The contexts of a restarted server are gone.
+        self.pool.servers[1].stop()
+        self.pool._health_check()
+        future = self.pool.execution.map_uri(second_id, None, 'dart:core')
+        self.assertEqual(future.exception().code, 'INVALID_EXECUTION_CONTEXT')
+
+    def test_merged_library_dependencies(self):
+        for index in range(2):
+            self.pool.servers[index].respond()
+        future = self.pool.analysis.get_library_dependencies()
+        self.pool.servers[0].respond({
+            'libraries': ['/a/a.dart', '/sdk/core.dart'],
+            'packageMap': {'/a': {'a': ['/a/lib']}}})
+        self.pool.servers[1].respond({
+            'libraries': ['/b/b.dart', '/sdk/core.dart'],
+            'packageMap': {'/b': {'b': ['/b/lib']}}})
+        self.assertEqual(future.result(), {
+            'libraries': ['/a/a.dart', '/sdk/core.dart', '/b/b.dart'],
+            'packageMap': {'/a': {'a': ['/a/lib']},
+                           '/b': {'b': ['/b/lib']}}})
+
+    def test_restart(self):
+        received = []
+        self.pool.analysis.on_errors(callback=lambda e, p: received.append(p))
+        self.pool.server.set_subscriptions(['STATUS'])
+        self.pool.analysis.set_priority_files(['/b/main.dart'])
+        self.pool.analysis.update_content({
+            '/b/main.dart': {'type': 'add', 'content': 'main() {}'}})
+        crashed = self.pool.servers[1]
+        future = self.pool.analysis.get_hover('/b/main.dart', 0)
+        crashed.stop()
+
+        self.pool._health_check()
+        self.assertEqual(future.exception().code, 'CLIENT_SERVER_EXITED')
+        self.assertEqual(self.pool.restarts, 1)
+        server = self.pool.servers[1]
+        self.assertIsNot(server, crashed)
+        self.assertEqual([body['method'] for body in server.sent], [
+            'server.setSubscriptions', 'analysis.setAnalysisRoots',
+            'analysis.updateContent', 'analysis.setPriorityFiles'])
+        self.assertEqual(server.sent[1]['params']['included'], ['/b'])
+        self.assertEqual(server.sent[3]['params']['files'], ['/b/main.dart'])
+
+        server._handle_message(json.dumps({
+            'event': 'analysis.errors',
+            'params': {'file': '/b/main.dart', 'errors': []},
+        }).encode('utf-8'))
+        self.assertEqual(len(received), 1)
+
+
+class AsyncioPoolTest(unittest.TestCase):
+
+    def test_start_and_stop(self):
+        async def run():
+            pool = DartAnalysisServerPool(
+                event_loop=asyncio.get_running_loop(), size=2,
+                server_class=AsyncioDartAnalysisServer,
+                health_check_interval=0, **fake.launch_options())
+            started = pool.start()
+            # Sent once the servers are started.
+            future = pool.server.get_version()
+            await started
+            self.assertEqual((await future)['version'], fake.VERSION)
+            pool.restart(0)
+            version = await asyncio.wait_for(
+                pool.servers[0].server.get_version(), 5)
+            self.assertEqual(version['version'], fake.VERSION)
+            await pool.stop()
+            self.assertFalse(any(server.running for server in pool.servers))
+
+        asyncio.run(asyncio.wait_for(run(), 10))
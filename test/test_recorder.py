@@ -0,0 +1,81 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from das.api import DartAnalysisServer
+from das.recorder import RECEIVED, SENT, Recorder, Replayer, read_log
+from das.server import AsyncioDartAnalysisServer
+from test.tools import ImmediateEventLoop
+
+
+def message(**body):
+    return json.dumps(body).encode('utf-8') + b'\n'
+
+
+class RecorderTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'session.log.gz')
+
+    def record_session(self):
+        with Recorder(self.path) as recorder:
+            das = DartAnalysisServer('dart', 'das', ImmediateEventLoop(),
+                                     recorder=recorder)
+            das._process = mock.Mock()
+            das._write = lambda data: None
+            das.server.get_version()
+            das._handle_message(message(event='server.status',
+                                        params={'analysis': {}}))
+            das._handle_message(message(id='0', result={'version': '1.2'}))
+
+    def test_record(self):
+        self.record_session()
+        entries = list(read_log(self.path))
+        self.assertEqual([entry.direction for entry in entries],
+                         [SENT, RECEIVED, RECEIVED])
+        self.assertEqual(json.loads(entries[0].message)['method'],
+                         'server.getVersion')
+        self.assertEqual(json.loads(entries[2].message)['id'], '0')
+        times = [entry.time for entry in entries]
+        self.assertEqual(times, sorted(times))
+
+    def test_replay(self):
+        self.record_session()
+        replayer = Replayer(self.path, speed=None)
+        self.assertEqual(list(replayer.recorded_latencies()), ['0'])
+
+        async def replay():
+            das = AsyncioDartAnalysisServer('dart', 'das')
+            das._process = mock.Mock()
+
+            def respond(data):
+                body = json.loads(data)
+                das._event_loop.call_soon(das._handle_message, message(
+                    id=body['id'], result={'version': '1.3'}))
+
+            das._write = respond
+            return await replayer.replay(das)
+
+        report = asyncio.run(replay())
+        self.assertEqual(len(report), 1)
+        self.assertEqual(report[0]['method'], 'server.getVersion')
+        self.assertIsNone(report[0]['error'])
+        self.assertGreaterEqual(report[0]['recorded'], 0)
+        self.assertGreaterEqual(report[0]['replayed'], 0)
+
+    def test_feed(self):
+        self.record_session()
+        das = DartAnalysisServer('dart', 'das', ImmediateEventLoop())
+        das._process = mock.Mock()
+        received = []
+        das.notification('server.status',
+                         callback=lambda event, params: received.append(event))
+        asyncio.run(Replayer(self.path, speed=None).feed(das))
+        self.assertEqual(received, ['server.status'])
+        self.assertEqual(das.stats.messages_in, 2)
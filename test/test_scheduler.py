@@ -0,0 +1,117 @@
+import asyncio
+import json
+import unittest
+
+from das.scheduler import (BULK, INTERACTIVE, QueueFullError,
+                           RequestScheduler)
+from das.streams import SearchStreams
+from test.tools import RecordingServer
+
+
+class RequestSchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.das = RecordingServer()
+        self.sent = self.das.sent
+        self.scheduler = RequestScheduler(self.das, bulk_limit=2,
+                                          max_queued=2)
+
+    def methods(self):
+        return [body['method'] for body in self.sent]
+
+    def respond(self, method, result=None):
+        body = next(body for body in self.sent if body['method'] == method
+                    and body['id'] in self.das._request_callbacks)
+        message = {'id': body['id'], 'result': result or {}}
+        self.das._handle_message(json.dumps(message).encode('utf-8'))
+
+    def test_bulk_limit(self):
+        errors = [self.scheduler.analysis.get_errors('/{}.dart'.format(i))
+                  for i in range(4)]
+        hover = self.scheduler.analysis.get_hover('/a.dart', 1)
+        # The hover is not stuck behind the queued bulk requests.
+        self.assertEqual(self.methods(), ['analysis.getErrors'] * 2 +
+                         ['analysis.getHover'])
+        self.assertEqual(self.scheduler.queued(BULK), 2)
+
+        self.respond('analysis.getErrors', {'errors': []})
+        self.assertEqual(errors[0].result(), {'errors': []})
+        self.assertEqual(len(self.sent), 4)
+        self.respond('analysis.getHover', {'hovers': []})
+        self.assertTrue(hover.done())
+        self.assertEqual(len(self.sent), 4)
+
+    def test_queue_full(self):
+        for i in range(4):
+            self.scheduler.edit.format('/a.dart', 0, 0, 80)
+        failed = []
+        future = self.scheduler.edit.format(
+            '/a.dart', 0, 0, 80, errback=lambda method, error: failed.append(
+                error))
+        self.assertIsInstance(future.exception(), QueueFullError)
+        self.assertEqual(failed[0].code, 'CLIENT_QUEUE_FULL')
+        self.assertEqual(self.scheduler.get_stats()[BULK]['rejected'], 1)
+
+    def test_capacity(self):
+        for i in range(4):
+            self.scheduler.edit.format('/a.dart', 0, 0, 80)
+        capacity = self.scheduler.capacity()
+        self.assertFalse(capacity.done())
+        self.respond('edit.format')
+        self.assertTrue(capacity.done())
+
+    def test_capacity_reserved(self):
+        scheduler = RequestScheduler(self.das, bulk_limit=1, max_queued=1)
+        waiters = [scheduler.capacity() for _ in range(10)]
+        completed = []
+        while len(completed) < 10:
+            ready = [waiter for waiter in waiters if waiter.done()]
+            # Never more producers woken than room in the queue.
+            self.assertLessEqual(len(ready), 1)
+            for waiter in ready:
+                waiters.remove(waiter)
+                completed.append(scheduler.edit.format('/a.dart', 0, 0, 80))
+            if not ready:
+                self.respond('edit.format')
+        self.assertEqual(scheduler.rejected, 0)
+
+    def test_priority_argument(self):
+        self.scheduler.limits[INTERACTIVE] = 1
+        self.scheduler.analysis.get_hover('/a.dart', 1)
+        self.scheduler.analysis.get_navigation('/a.dart', 1, 1)
+        self.scheduler.analysis.get_errors('/a.dart', priority=INTERACTIVE)
+        self.assertEqual(self.methods(), ['analysis.getHover'])
+        self.respond('analysis.getHover')
+        self.assertEqual(self.methods(), ['analysis.getHover',
+                                          'analysis.getNavigation'])
+        self.assertEqual(self.scheduler.get_stats()[INTERACTIVE], {
+            'in_flight': 1, 'queued': 1, 'limit': 1})
+
+    def test_state_requests_not_queued(self):
+        self.scheduler.limits[INTERACTIVE] = 1
+        self.scheduler.analysis.get_hover('/a.dart', 1)
+        self.scheduler.analysis.get_navigation('/a.dart', 1, 1)
+        self.scheduler.analysis.update_content({
+            '/a.dart': {'type': 'add', 'content': 'main() {}'}})
+        self.assertEqual(self.methods(), ['analysis.getHover',
+                                          'analysis.updateContent'])
+        self.assertEqual(self.scheduler.get_stats()[INTERACTIVE]['in_flight'],
+                         1)
+
+    def test_results_right_after_response(self):
+        # The response completes the request before the notifications read
+        # with it are delivered, also on an asyncio loop.
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        das = RecordingServer(event_loop=loop)
+        searches = SearchStreams(RequestScheduler(das))
+        stream = searches.find_member_references('build')
+        das.receive(id=das.sent[-1]['id'], result={'id': 's1'})
+        das.receive(event='search.results',
+                    params={'id': 's1', 'results': [], 'isLast': True})
+
+        async def collect():
+            return [params async for params in stream]
+
+        items = loop.run_until_complete(asyncio.wait_for(collect(), 1))
+        self.assertEqual(len(items), 1)
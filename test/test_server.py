@@ -1,18 +1,27 @@
+import asyncio
 import unittest
 import os
 
 from das.api import DartAnalysisServer
-from test.tools import DummyEventLoop, on_connected
+from das.loop import EventLoop
+from das.server import (AsyncioDartAnalysisServer, RequestError,
+                        RequestTimeoutError)
+from test.tools import on_connected
+
+
+def sdk_paths():
+    dart_sdk_path = os.environ['DART_SDK_PATH']
+    dart_path = os.path.join(dart_sdk_path, 'bin', 'dart')
+    das_path = os.path.join(dart_sdk_path, 'bin', 'snapshots',
+                            'analysis_server.dart.snapshot')
+    return dart_path, das_path
 
 
 class DartAnalysisServerTest(unittest.TestCase):
 
     def setUp(self):
-        dart_sdk_path = os.environ['DART_SDK_PATH']
-        dart_path = os.path.join(dart_sdk_path, 'bin', 'dart')
-        das_path = os.path.join(dart_sdk_path, 'bin', 'snapshots',
-                                'analysis_server.dart.snapshot')
-        self.loop = DummyEventLoop()
+        dart_path, das_path = sdk_paths()
+        self.loop = EventLoop()
         self.das = DartAnalysisServer(dart_path, das_path, self.loop)
 
     def tearDown(self):
@@ -78,6 +87,21 @@ class DartAnalysisServerTest(unittest.TestCase):
         self.das.request('server.setSubscriptions',
                          callback=on_success, errback=on_error)
 
+    @on_connected
+    def test_request_burst(self):
+        responses = []
+
+        def on_subscribed(method):
+            responses.append(method)
+            if len(responses) == 100:
+                self.assertEqual(self.das.pending_requests, 0)
+                self.loop.stop()
+
+        # Identical getVersion requests would be coalesced into one.
+        for _ in range(100):
+            self.das.server.set_subscriptions(['STATUS'],
+                                              callback=on_subscribed)
+
     @on_connected
     def test_generated_request(self):
         def on_version(method, version):
@@ -97,3 +121,86 @@ class DartAnalysisServerTest(unittest.TestCase):
         self.das.start()
 
         self._run_loop()
+
+
+class AsyncioDartAnalysisServerTest(unittest.TestCase):
+
+    def setUp(self):
+        dart_path, das_path = sdk_paths()
+        self.loop = asyncio.new_event_loop()
+        self.das = AsyncioDartAnalysisServer(dart_path, das_path, self.loop)
+
+    def tearDown(self):
+        if self.das._process is not None:
+            self.loop.run_until_complete(self.das.stop())
+        self.loop.close()
+
+    def _run_until_connected(self):
+        connected = self.loop.create_future()
+
+        def on_connected(event, version):
+            connected.set_result(event)
+
+        self.das.server.on_connected(callback=on_connected)
+        self.loop.run_until_complete(self.das.start())
+        return self.loop.run_until_complete(asyncio.wait_for(connected, 2))
+
+    def test_on_connected(self):
+        self.assertEqual(self._run_until_connected(), 'server.connected')
+
+    def test_generated_request(self):
+        self._run_until_connected()
+        done = self.loop.create_future()
+
+        def on_version(method, version):
+            done.set_result((method, version))
+
+        self.das.server.get_version(callback=on_version)
+        method, version = self.loop.run_until_complete(
+            asyncio.wait_for(done, 2))
+        self.assertEqual(method, 'server.getVersion')
+        self.assertTrue(self.das.check_version(version))
+
+    def test_default_loop_request_before_start(self):
+        async def run():
+            das = AsyncioDartAnalysisServer(*sdk_paths())
+            future = das.server.get_version()
+            self.assertIsInstance(future, asyncio.Future)
+            await das.start()
+            try:
+                return await asyncio.wait_for(future, 2)
+            finally:
+                await das.stop()
+
+        result = self.loop.run_until_complete(run())
+        self.assertTrue(self.das.check_version(result['version']))
+
+    def test_awaitable_request(self):
+        self._run_until_connected()
+        result = self.loop.run_until_complete(
+            asyncio.wait_for(self.das.server.get_version(), 2))
+        self.assertTrue(self.das.check_version(result['version']))
+
+    def test_awaitable_request_error(self):
+        self._run_until_connected()
+        future = self.das.request('server.setSubscriptions')
+        with self.assertRaises(RequestError) as context:
+            self.loop.run_until_complete(asyncio.wait_for(future, 2))
+        self.assertEqual(context.exception.code, 'INVALID_PARAMETER')
+
+    def test_request_timeout(self):
+        self._run_until_connected()
+        future = self.das.server.get_version(timeout=0)
+        self.assertEqual(self.das.pending_requests, 1)
+        with self.assertRaises(RequestTimeoutError):
+            self.loop.run_until_complete(future)
+        self.assertEqual(self.das.pending_requests, 0)
+
+    def test_pending_requests_released(self):
+        self._run_until_connected()
+        futures = [self.das.server.set_subscriptions(['STATUS'])
+                   for _ in range(10)]
+        self.assertEqual(self.das.pending_requests, 10)
+        self.loop.run_until_complete(
+            asyncio.wait_for(asyncio.gather(*futures), 2))
+        self.assertEqual(self.das.pending_requests, 0)
@@ -0,0 +1,85 @@
+import json
+import unittest
+
+from das.api import (AddContentOverlay, AnalysisError, DartAnalysisServer,
+                     Location, NavigationRegion, Outline)
+from das.spec import decoder, encode_object
+
+
+LOCATION = {
+    'file': '/project/lib/main.dart',
+    'offset': 10,
+    'length': 4,
+    'startLine': 2,
+    'startColumn': 3,
+}
+
+
+class SpecObjectTest(unittest.TestCase):
+
+    def test_from_json(self):
+        error = AnalysisError.from_json({
+            'severity': 'ERROR',
+            'type': 'SYNTACTIC_ERROR',
+            'location': LOCATION,
+            'message': 'Expected to find ;',
+        })
+        self.assertEqual(error.severity, 'ERROR')
+        self.assertIsInstance(error.location, Location)
+        self.assertEqual(error.location.start_line, 2)
+        self.assertIsNone(error.correction)
+
+    def test_nested_lists(self):
+        outline = Outline.from_json({
+            'element': {'kind': 'CLASS', 'name': 'A', 'flags': 0},
+            'offset': 0,
+            'length': 20,
+            'children': [{
+                'element': {'kind': 'METHOD', 'name': 'm', 'flags': 0},
+                'offset': 10,
+                'length': 5,
+            }],
+        })
+        self.assertEqual(outline.children[0].element.name, 'm')
+        self.assertIsNone(outline.children[0].children)
+
+    def test_no_instance_dict(self):
+        region = NavigationRegion(offset=1, length=2, targets=[0])
+        with self.assertRaises(AttributeError):
+            region.__dict__
+
+    def test_encode(self):
+        overlay = AddContentOverlay(content='main() {}')
+        data = json.dumps({'files': {'a.dart': overlay}},
+                          default=encode_object)
+        self.assertEqual(json.loads(data), {
+            'files': {'a.dart': {'type': 'add', 'content': 'main() {}'}}})
+
+    def test_unknown_field(self):
+        with self.assertRaises(TypeError):
+            Location(path='a.dart')
+
+    def test_decoder(self):
+        self.assertIsNone(decoder('[FilePath]'))
+        self.assertIsNone(decoder('{str: [FilePath]}'))
+        decode = decoder('{str: [Location]}')
+        locations = decode({'a': [LOCATION]})
+        self.assertEqual(locations['a'][0], Location.from_json(LOCATION))
+
+
+class DecodeTypesTest(unittest.TestCase):
+
+    def test_decode_result(self):
+        server = DartAnalysisServer('dart', 'das', None)
+        result = server._decode('analysis.getHover', {
+            'hovers': [{'offset': 1, 'length': 2}],
+        }, server.result_types)
+        self.assertEqual(result['hovers'][0].offset, 1)
+
+    def test_decode_disabled(self):
+        server = DartAnalysisServer('dart', 'das', None, decode_types=False)
+        params = server._decode('analysis.errors', {
+            'file': 'a.dart',
+            'errors': [],
+        }, server.event_types)
+        self.assertEqual(params, {'file': 'a.dart', 'errors': []})
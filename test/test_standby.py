@@ -0,0 +1,86 @@
+import asyncio
+import time
+import unittest
+
+from das import fake
+from das.loop import EventLoop
+from das.server import AsyncioDartAnalysisServer
+from das.standby import WarmStandby
+
+
+class WarmStandbyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = EventLoop()
+        self.standby = WarmStandby(event_loop=self.loop, size=1,
+                                   **fake.launch_options())
+        self.addCleanup(self.standby.stop)
+
+    def acquire(self):
+        server = self.standby.acquire()
+        self.addCleanup(server.stop)
+        return server
+
+    def run_until(self, condition, timeout=5):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            self.loop.call_later(0.01, self.loop.stop)
+            self.loop.run_forever()
+        self.assertTrue(condition())
+
+    def test_acquire_ready(self):
+        self.standby.start()
+        self.run_until(lambda: self.standby.ready == 1)
+        server = self.acquire()
+        self.assertEqual(self.standby.ready, 0)
+        version = self.loop.run_until_complete(server.server.get_version(),
+                                               5)
+        self.assertEqual(version['version'], fake.VERSION)
+
+        # The standby slot is filled again.
+        self.run_until(lambda: self.standby.ready == 1)
+        stats = self.standby.get_stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['startup']['count'], 2)
+        self.assertGreater(stats['startup']['min'], 0)
+
+    def test_acquire_before_ready(self):
+        server = self.acquire()
+        version = self.loop.run_until_complete(server.server.get_version(),
+                                               5)
+        self.assertEqual(version['version'], fake.VERSION)
+        self.assertEqual(self.standby.get_stats()['misses'], 1)
+        # The startup of the server handed out is measured too.
+        self.assertEqual(self.standby.startup.count, 1)
+
+    def test_replace_dead_server(self):
+        self.standby.start()
+        self.run_until(lambda: self.standby.ready == 1)
+        dead = self.standby._ready[0]
+        dead._process.kill()
+        self.run_until(lambda: self.standby.ready == 1 and
+                       self.standby._ready[0] is not dead)
+        dead.stop()
+
+
+class AsyncioWarmStandbyTest(unittest.TestCase):
+
+    def test_acquire_and_stop(self):
+        async def run():
+            standby = WarmStandby(event_loop=asyncio.get_running_loop(),
+                                  size=2,
+                                  server_class=AsyncioDartAnalysisServer,
+                                  **fake.launch_options())
+            standby.start()
+            while standby.ready < 2:
+                await asyncio.sleep(0.01)
+            server = standby.acquire()
+            # Stopped while the replacement is still starting.
+            await asyncio.sleep(0)
+            self.assertEqual(standby.get_stats()['starting'], 1)
+            await standby.stop()
+            version = await server.server.get_version()
+            self.assertEqual(version['version'], fake.VERSION)
+            await server.stop()
+
+        asyncio.run(asyncio.wait_for(run(), 10))
@@ -0,0 +1,78 @@
+import json
+import unittest
+from unittest import mock
+
+from das.api import DartAnalysisServer
+from das.stats import Histogram, StatsHook
+from test.tools import ImmediateEventLoop
+
+
+class HistogramTest(unittest.TestCase):
+
+    def test_empty(self):
+        histogram = Histogram()
+        self.assertIsNone(histogram.percentile(50))
+        self.assertEqual(histogram.as_dict()['count'], 0)
+
+    def test_percentiles(self):
+        histogram = Histogram()
+        for i in range(1, 101):
+            histogram.record(i / 1000)
+        self.assertEqual(histogram.count, 100)
+        self.assertEqual(histogram.min, 0.001)
+        self.assertEqual(histogram.max, 0.1)
+        # Buckets are powers of two, so percentiles are within a factor 2.
+        self.assertTrue(0.05 <= histogram.percentile(50) <= 0.1)
+        self.assertEqual(histogram.percentile(100), 0.1)
+
+
+class ServerStatsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.das = DartAnalysisServer('dart', 'das', ImmediateEventLoop())
+        self.das._process = mock.Mock()
+        self.das._write = mock.Mock()
+
+    def respond(self, **body):
+        self.das._handle_message(json.dumps(body).encode('utf-8'))
+
+    def test_request_stats(self):
+        self.das.analysis.get_hover('a.dart', 1)
+        self.assertEqual(self.das.get_stats()['in_flight'], 1)
+        self.respond(id='0', result={'hovers': []})
+        self.das.analysis.get_hover('a.dart', 2)
+        self.respond(id='1', error={'code': 'X', 'message': 'x'})
+
+        stats = self.das.get_stats()
+        hover = stats['methods']['analysis.getHover']
+        self.assertEqual(stats['in_flight'], 0)
+        self.assertEqual(hover['requests'], 2)
+        self.assertEqual(hover['errors'], 1)
+        self.assertEqual(hover['latency']['count'], 2)
+        self.assertGreater(hover['bytes_out'], 0)
+        self.assertEqual(stats['dispatch_delay']['count'], 2)
+
+    def test_notification_stats(self):
+        self.das.notification('analysis.errors',
+                              callback=lambda e, p: p['file'])
+        self.respond(event='analysis.errors',
+                     params={'file': 'a.dart', 'errors': []})
+        self.respond(event='analysis.outline', params={})
+        events = self.das.get_stats()['events']
+        self.assertEqual(events['analysis.errors']['count'], 1)
+        self.assertEqual(events['analysis.errors']['decode']['count'], 1)
+        self.assertEqual(events['analysis.outline']['decode']['count'], 0)
+        self.assertEqual(self.das.get_stats()['messages_in'], 2)
+
+    def test_hooks(self):
+        hook = mock.Mock(spec=StatsHook)
+        self.das.stats.add_hook(hook)
+        self.das.server.get_version()
+        self.respond(id='0', result={'version': '1.9.0'})
+        hook.on_request.assert_called_once_with('server.getVersion',
+                                                mock.ANY)
+        method, latency, size, decode_time, error = (
+            hook.on_response.call_args[0])
+        self.assertEqual(method, 'server.getVersion')
+        self.assertFalse(error)
+        hook.on_dispatch.assert_called_once()
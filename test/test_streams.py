@@ -0,0 +1,178 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from das.api import CompletionSuggestion
+from das.streams import CompletionStreams, SearchStreams
+from test.tools import RecordingServer
+
+
+class ImmediateAsyncioLoop:
+    """Wraps an asyncio loop, running threadsafe callbacks right away."""
+
+    def __init__(self, loop):
+        self._loop = loop
+
+    def call_soon_threadsafe(self, callback, *args):
+        callback(*args)
+
+    def call_later(self, delay, callback, *args):
+        return self._loop.call_later(delay, callback, *args)
+
+    def create_future(self):
+        return self._loop.create_future()
+
+
+def suggestion(completion):
+    return {
+        'kind': 'INVOCATION', 'relevance': 1000, 'completion': completion,
+        'selectionOffset': 0, 'selectionLength': 0, 'isDeprecated': False,
+        'isPotential': False,
+    }
+
+
+class StreamTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.das = RecordingServer(event_loop=ImmediateAsyncioLoop(self.loop))
+        self.sent = self.das.sent
+
+    def tearDown(self):
+        self.loop.close()
+
+    def run_loop(self):
+        self.loop.run_until_complete(asyncio.sleep(0))
+
+    def collect(self, stream):
+        async def collect():
+            return [params async for params in stream]
+        return self.loop.run_until_complete(asyncio.wait_for(collect(), 1))
+
+
+class CompletionStreamsTest(StreamTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.completions = CompletionStreams(self.das)
+
+    def results(self, completion_id, names, is_last):
+        self.das.receive(event='completion.results', params={
+            'id': completion_id, 'replacementOffset': 0,
+            'replacementLength': 0,
+            'results': [suggestion(name) for name in names],
+            'isLast': is_last})
+
+    def test_stream(self):
+        stream = self.completions.get_suggestions('/a.dart', 10)
+        self.das.receive(id=self.sent[-1]['id'], result={'id': 'c1'})
+        self.run_loop()
+        self.results('c1', ['foo'], False)
+        self.results('c2', ['other'], True)
+        self.results('c1', ['bar', 'baz'], True)
+        items = self.collect(stream)
+        self.assertEqual(len(items), 2)
+        self.assertIsInstance(items[0]['results'][0], CompletionSuggestion)
+        self.assertEqual(stream.id, 'c1')
+        self.assertTrue(stream.done)
+
+    def test_results_right_after_response(self):
+        # On an asyncio loop, the response and the results read together
+        # are dispatched in the order they were received.
+        self.das._event_loop = self.loop
+        stream = self.completions.get_suggestions('/a.dart', 10)
+        self.das.receive(id=self.sent[-1]['id'], result={'id': 'c1'})
+        self.results('c1', ['foo'], True)
+        self.assertEqual(len(self.collect(stream)), 1)
+        self.assertEqual(stream.id, 'c1')
+
+    def test_newer_completion_cancels_older(self):
+        first = self.completions.get_suggestions('/a.dart', 10)
+        self.das.receive(id=self.sent[-1]['id'], result={'id': 'c1'})
+        self.run_loop()
+        second = self.completions.get_suggestions('/a.dart', 11)
+        self.das.receive(id=self.sent[-1]['id'], result={'id': 'c2'})
+        self.run_loop()
+        self.assertTrue(first.cancelled)
+
+        with mock.patch.object(self.das.codec, 'loads',
+                               wraps=self.das.codec.loads) as loads:
+            self.results('c1', ['foo'], True)
+            loads.assert_not_called()
+        self.results('c2', ['bar'], True)
+        self.assertEqual(self.collect(first), [])
+        self.assertEqual(len(self.collect(second)), 1)
+
+    def test_request_error(self):
+        stream = self.completions.get_suggestions('/a.dart', 10)
+        self.das.receive(id=self.sent[-1]['id'],
+                         error={'code': 'INVALID_FILE', 'message': 'x'})
+        self.run_loop()
+        with self.assertRaises(Exception) as context:
+            self.collect(stream)
+        self.assertEqual(context.exception.code, 'INVALID_FILE')
+
+
+class SearchStreamsTest(StreamTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.searches = SearchStreams(self.das)
+
+    def results(self, search_id, count, is_last):
+        result = {
+            'location': {'file': '/a.dart', 'offset': 0, 'length': 1,
+                         'startLine': 1, 'startColumn': 1},
+            'kind': 'REFERENCE', 'isPotential': False, 'path': [],
+        }
+        self.das.receive(event='search.results', params={
+            'id': search_id, 'results': [result] * count, 'isLast': is_last})
+
+    def start(self, search_id):
+        stream = self.searches.find_member_references('build')
+        self.das.receive(id=self.sent[-1]['id'], result={'id': search_id})
+        self.run_loop()
+        return stream
+
+    def test_concurrent_searches(self):
+        first = self.start('s1')
+        second = self.start('s2')
+        self.results('s2', 1, False)
+        self.results('s1', 2, True)
+        self.results('s2', 3, True)
+        self.assertEqual([len(p['results']) for p in self.collect(first)],
+                         [2])
+        self.assertEqual([len(p['results']) for p in self.collect(second)],
+                         [1, 3])
+
+    def test_results_right_after_response(self):
+        self.das._event_loop = self.loop
+        stream = self.searches.find_member_references('build')
+        self.das.receive(id=self.sent[-1]['id'], result={'id': 's1'})
+        self.results('s1', 2, False)
+        self.results('s1', 1, True)
+        self.assertEqual([len(p['results']) for p in self.collect(stream)],
+                         [2, 1])
+
+    def test_early_termination(self):
+        stream = self.start('s1')
+        self.results('s1', 100, False)
+
+        async def first_batch():
+            async with stream:
+                async for results in stream.batches():
+                    return results
+
+        results = self.loop.run_until_complete(first_batch())
+        self.assertEqual(len(results), 100)
+        self.assertTrue(stream.cancelled)
+        with mock.patch.object(self.das.codec, 'loads') as loads:
+            self.results('s1', 100, True)
+            loads.assert_not_called()
+
+    def test_no_element(self):
+        stream = self.searches.find_element_references('/a.dart', 0, False)
+        self.das.receive(id=self.sent[-1]['id'], result={})
+        self.run_loop()
+        self.assertEqual(self.collect(stream), [])
+        self.assertEqual(stream.result, {})
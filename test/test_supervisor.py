@@ -0,0 +1,179 @@
+import asyncio
+import time
+import unittest
+
+from das import fake
+from das.api import AddContentOverlay, ChangeContentOverlay, SourceEdit
+from das.loop import EventLoop
+from das.server import AsyncioDartAnalysisServer, ServerExitedError
+from das.streams import CompletionStreams
+from das.supervisor import ServerState, SupervisedServer
+from test.tools import RecordingServer
+
+
+class ServerStateTest(unittest.TestCase):
+
+    def test_overlays(self):
+        state = ServerState()
+        state.record('analysis.updateContent', {'files': {
+            '/a.dart': AddContentOverlay(content='main() {}'),
+            '/b.dart': {'type': 'add', 'content': 'b'},
+        }})
+        state.record('analysis.updateContent', {'files': {
+            '/a.dart': ChangeContentOverlay(edits=[
+                SourceEdit(offset=8, length=0, replacement='print(1);'),
+                SourceEdit(offset=0, length=4, replacement='void main')]),
+            '/b.dart': {'type': 'remove'},
+        }})
+        self.assertEqual(state.overlays,
+                         {'/a.dart': 'void main() {print(1);}'})
+
+    def test_overlay_utf16_offsets(self):
+        state = ServerState()
+        state.record('analysis.updateContent', {'files': {
+            '/a.dart': {'type': 'add', 'content': "'\U0001f600' + 1;"}}})
+        state.record('analysis.updateContent', {'files': {
+            '/a.dart': {'type': 'change', 'edits': [
+                {'offset': 7, 'length': 1, 'replacement': '2'}]}}})
+        self.assertEqual(state.overlays, {'/a.dart': "'\U0001f600' + 2;"})
+
+    def test_requests(self):
+        state = ServerState()
+        state.record('analysis.setPriorityFiles', {'files': ['/a.dart']})
+        state.record('analysis.setAnalysisRoots',
+                     {'included': ['/a'], 'excluded': []})
+        state.record('analysis.updateOptions',
+                     {'options': {'enableAsync': True}})
+        state.record('analysis.updateOptions',
+                     {'options': {'generateHints': False}})
+        state.record('analysis.updateContent', {'files': {
+            '/a.dart': {'type': 'add', 'content': 'a'}}})
+        state.record('analysis.getHover', {'file': '/a.dart', 'offset': 1})
+        self.assertEqual(state.requests(), [
+            ('analysis.updateOptions',
+             {'options': {'enableAsync': True, 'generateHints': False}}),
+            ('analysis.setAnalysisRoots',
+             {'included': ['/a'], 'excluded': []}),
+            ('analysis.updateContent',
+             {'files': {'/a.dart': {'type': 'add', 'content': 'a'}}}),
+            ('analysis.setPriorityFiles', {'files': ['/a.dart']}),
+        ])
+
+
+class SupervisedServerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = EventLoop()
+
+    def supervise(self, **options):
+        launch_options = fake.launch_options(
+            delays={'analysis.getHover': 0.3})
+        server = SupervisedServer(event_loop=self.loop, max_restarts=2,
+                                  **launch_options, **options)
+        self.addCleanup(server.stop)
+        server.start()
+        return server
+
+    def crash(self, server, timeout=5):
+        process = server.current._process
+        process.kill()
+        process.wait()
+        deadline = time.monotonic() + timeout
+        restarts = server.restarts
+        while server.restarts == restarts and time.monotonic() < deadline:
+            self.loop.call_later(0.01, self.loop.stop)
+            self.loop.run_forever()
+
+    def test_restore_state(self):
+        server = self.supervise()
+        server.analysis.set_analysis_roots(['/project'], [], {})
+        server.analysis.update_content(
+            {'/project/a.dart': AddContentOverlay(content='a')})
+        server.analysis.set_priority_files(['/project/a.dart'])
+        received = []
+        server.server.on_connected(
+            callback=lambda event, params: received.append(event))
+        self.loop.run_until_complete(server.server.get_version(), 5)
+        old_server = server.current
+
+        self.crash(server)
+        self.assertEqual(server.restarts, 1)
+        self.assertIsNot(server.current, old_server)
+        version = self.loop.run_until_complete(server.server.get_version(),
+                                               5)
+        self.assertEqual(version['version'], fake.VERSION)
+        self.assertEqual(set(server.current.stats.methods), {
+            'analysis.setAnalysisRoots', 'analysis.updateContent',
+            'analysis.setPriorityFiles', 'server.getVersion'})
+        # Subscriptions carry over to the new process.
+        self.assertEqual(received, ['server.connected'] * 2)
+
+    def test_fail_waiting_requests(self):
+        server = self.supervise()
+        hover = server.analysis.get_hover('/a.dart', 1)
+        self.crash(server)
+        with self.assertRaises(ServerExitedError):
+            self.loop.run_until_complete(hover, 5)
+
+    def test_retry(self):
+        server = self.supervise(retry=True)
+        hover = server.analysis.get_hover('/a.dart', 1)
+        roots = server.analysis.set_analysis_roots(['/project'], [], {})
+        self.crash(server)
+        result = self.loop.run_until_complete(hover, 5)
+        self.assertIn('hovers', result)
+        self.assertEqual(self.loop.run_until_complete(roots, 5), {})
+
+    def test_give_up(self):
+        server = self.supervise()
+        self.crash(server)
+        self.crash(server)
+        self.crash(server, timeout=0.5)
+        self.assertEqual(server.restarts, 2)
+        self.assertTrue(server.gave_up)
+
+    def test_results_right_after_response(self):
+        # The response completes the request before the notifications read
+        # with it are delivered, also on an asyncio loop.
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        server = SupervisedServer('dart', 'das', loop,
+                                  server_class=RecordingServer)
+        das = server.current
+        completions = CompletionStreams(server)
+        stream = completions.get_suggestions('/a.dart', 1)
+        das.receive(id=das.sent[-1]['id'], result={'id': 'c1'})
+        das.receive(event='completion.results',
+                    params={'id': 'c1', 'replacementOffset': 1,
+                            'replacementLength': 0, 'results': [],
+                            'isLast': True})
+
+        async def collect():
+            return [params async for params in stream]
+
+        items = loop.run_until_complete(asyncio.wait_for(collect(), 1))
+        self.assertEqual(len(items), 1)
+
+
+class AsyncioSupervisedServerTest(unittest.TestCase):
+
+    def test_restart(self):
+        async def run():
+            server = SupervisedServer(
+                event_loop=asyncio.get_running_loop(),
+                server_class=AsyncioDartAnalysisServer,
+                **fake.launch_options())
+            await server.start()
+            server.analysis.set_analysis_roots(['/project'], [], {})
+            old_server = server.current
+            old_server._process.kill()
+            while server.current is old_server:
+                await asyncio.sleep(0.01)
+            version = await server.server.get_version()
+            self.assertEqual(version['version'], fake.VERSION)
+            self.assertIn('analysis.setAnalysisRoots',
+                          server.current.stats.methods)
+            await server.stop()
+            self.assertFalse(server.current.running)
+
+        asyncio.run(asyncio.wait_for(run(), 10))
@@ -1,41 +1,8 @@
-import time
-import queue
 import functools
+import json
+from unittest import mock
 
-
-class DummyEventLoop:
-    def __init__(self):
-        self._queue = queue.Queue()
-
-    def run_forever(self):
-        self._running = True
-        callbacks = []
-
-        while True:
-            try:
-                item = self._queue.get(True, 0.01)
-                callbacks.append(item)
-            except queue.Empty:
-                if not self._running:
-                    break
-
-            new_callbacks = []
-            for added_at, delay, callback, args, kwargs in callbacks:
-                if time.time() - added_at >= delay:
-                    callback(*args, **kwargs)
-                else:
-                    new_callbacks.append(
-                        (added_at, delay, callback, args, kwargs))
-            callbacks = new_callbacks
-
-    def stop(self):
-        self._running = False
-
-    def call_soon_threadsafe(self, callback, *args, **kwargs):
-        self._queue.put((time.time(), 0, callback, args, kwargs))
-
-    def call_later(self, delay, callback, *args, **kwargs):
-        self._queue.put((time.time(), delay, callback, args, kwargs))
+from das.api import DartAnalysisServer
 
 
 def on_connected(test_function):
@@ -52,3 +19,48 @@ def on_connected(test_function):
         self._run_loop()
 
     return new_test_function
+
+
+class ImmediateEventLoop:
+    """Event loop stand-in running callbacks as soon as they are scheduled."""
+
+    def call_soon_threadsafe(self, callback, *args):
+        callback(*args)
+
+    def call_later(self, delay, callback, *args):
+        pass
+
+
+class RecordingServer(DartAnalysisServer):
+    """Server keeping the requests it sends in ``sent`` instead of writing
+    them to a process, and receiving the messages given to :meth:`receive`.
+
+    Runs callbacks right away unless another event loop is given.
+    """
+
+    def __init__(self, dart_path='dart', das_path='das', event_loop=None,
+                 **kwargs):
+        if event_loop is None:
+            event_loop = ImmediateEventLoop()
+        super().__init__(dart_path, das_path, event_loop, **kwargs)
+        self._process = mock.Mock()
+        self._process.poll.return_value = None
+        self.sent = []
+
+    def start(self):
+        self._process.poll.return_value = None
+
+    def stop(self, timeout=0):
+        self._process.poll.return_value = 0
+
+    def _write(self, data):
+        self.sent.append(json.loads(data))
+
+    def receive(self, **body):
+        self._handle_message(json.dumps(body).encode('utf-8'))
+
+    def respond(self, result=None):
+        """Answer all the requests sent so far with the same result."""
+        sent, self.sent[:] = list(self.sent), []
+        for body in sent:
+            self.receive(id=body['id'], result=result or {})